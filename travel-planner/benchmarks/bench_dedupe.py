@@ -0,0 +1,158 @@
+"""Benchmark: attraction dedupe, exact normalized names vs EntityIndex
+
+Generates thousands of distinct places and lists each under several of the
+names agents use for it ("Vilaro Museum", "Musée du Vilaro", "The Vilaro
+Museum", "Vilarro Museum", "VILARO"). Reports names/sec and how many of the
+repeated mentions each method catches (recall) and how many of its matches
+are right (precision). Exits non-zero when EntityIndex recall or precision
+is under budget or it processes fewer names/sec than --min-rate.
+
+Usage (from travel-planner/):
+    python benchmarks/bench_dedupe.py [--places 2000] [--mentions 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.plan_ir import normalize_name
+from src.utils.entity_dedupe import EntityIndex, deletions, name_key
+
+# Consonant-vowel(-consonant) syllables for made-up place names
+SYLLABLES = tuple(
+    onset + vowel + coda
+    for onset in ("b", "c", "d", "f", "g", "h", "k", "l", "m", "n", "p", "r", "s", "t", "v", "z", "br", "ch", "st", "tr")
+    for vowel in ("a", "e", "i", "o", "u")
+    for coda in ("", "", "n", "r", "l")
+)
+
+# Type word: English name and local-language forms
+TYPES = {
+    "Museum": ("Musée du {}", "Museo {}", "{} Museum"),
+    "Park": ("Parc {}", "Parque {}", "{} Park"),
+    "Cathedral": ("Duomo di {}", "Catedral de {}", "{} Cathedral"),
+    "Palace": ("Palais du {}", "Palazzo {}", "{} Palace"),
+    "Market": ("Marché {}", "Mercado de {}", "{} Market"),
+    "Gardens": ("Jardin du {}", "Giardino {}", "{} Gardens"),
+    "": ("The {}", "{}", "{}"),
+}
+
+
+def make_places(count: int, rng: random.Random):
+    """
+    Distinct (core, type) pairs
+
+    Cores are kept more than one typo apart (no shared single-character
+    deletion), so every misspelt mention has one right answer
+    """
+    places, taken = [], set()
+    while len(places) < count:
+        words = [
+            "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+            for _ in range(rng.choice((1, 1, 2)))
+        ]
+        core = " ".join(words)
+        variants = deletions(core.lower())
+        if variants & taken:
+            continue
+        taken |= variants
+        places.append((core, rng.choice(list(TYPES))))
+    return places
+
+
+def typo(word: str, rng: random.Random) -> str:
+    """One doubled, dropped or swapped letter"""
+    index = rng.randrange(1, len(word) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return word[:index] + word[index] + word[index:]
+    if kind == 1:
+        return word[:index] + word[index + 1:]
+    return word[:index] + word[index + 1] + word[index] + word[index + 2:]
+
+
+def mention(core: str, place_type: str, rng: random.Random) -> str:
+    """One way an agent might name a place"""
+    roll = rng.random()
+    if roll < 0.15:
+        core = typo(core, rng)
+    elif roll < 0.25:
+        core = core.upper()
+    elif roll < 0.3:
+        core = core.replace("e", "é", 1)
+    if place_type and rng.random() < 0.2:
+        return core  # Type left out ("Louvre")
+    return rng.choice(TYPES[place_type]).format(core)
+
+
+def score(flags, correct, truth):
+    """(precision, recall) of duplicate flags against the true repeats"""
+    flagged, right, repeats = sum(flags), sum(correct), sum(truth)
+    return right / flagged if flagged else 1.0, right / repeats if repeats else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--places", type=int, default=2000)
+    parser.add_argument("--mentions", type=int, default=3, help="Names per place")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--min-recall", type=float, default=0.9)
+    parser.add_argument("--min-precision", type=float, default=0.98)
+    parser.add_argument("--min-rate", type=float, default=20000, help="Names/sec")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    places = make_places(args.places, rng)
+    names = [(place, mention(*places[place], rng)) for place in range(len(places)) for _ in range(args.mentions)]
+    rng.shuffle(names)
+
+    # A name is a true repeat if its place was mentioned earlier, under any name
+    truth, mentioned = [], set()
+    for place, _ in names:
+        truth.append(place in mentioned)
+        mentioned.add(place)
+    print(f"{len(names)} names, {len(places)} places, {sum(truth)} repeats")
+
+    # A match is only right if it's to an earlier name of the same place
+    started = time.perf_counter()
+    seen, exact_flags = {}, []
+    for _, name in names:
+        key = normalize_name(name)
+        exact_flags.append(seen.get(key))
+        seen.setdefault(key, len(exact_flags) - 1)
+    exact_rate = len(names) / (time.perf_counter() - started)
+    exact = [match is not None for match in exact_flags]
+    exact_correct = [match is not None and names[match][0] == place for match, (place, _) in zip(exact_flags, names)]
+
+    # Cold cache: name_key is memoized across calls
+    name_key.cache_clear()
+    index = EntityIndex()
+    started = time.perf_counter()
+    added = [index.add(name) for _, name in names]
+    fuzzy_rate = len(names) / (time.perf_counter() - started)
+    fuzzy = [duplicate for _, duplicate in added]
+    fuzzy_correct = [duplicate and names[cluster][0] == place for (cluster, duplicate), (place, _) in zip(added, names)]
+
+    exact_precision, exact_recall = score(exact, exact_correct, truth)
+    fuzzy_precision, fuzzy_recall = score(fuzzy, fuzzy_correct, truth)
+    print(f"  exact normalized: {exact_rate:10.0f} names/sec  recall {exact_recall:6.1%}  precision {exact_precision:6.1%}")
+    print(f"  EntityIndex:      {fuzzy_rate:10.0f} names/sec  recall {fuzzy_recall:6.1%}  precision {fuzzy_precision:6.1%}")
+    print(f"  {len(index.clusters())} clusters for {len(places)} places")
+
+    failures = []
+    if fuzzy_recall < args.min_recall:
+        failures.append(f"recall {fuzzy_recall:.1%} < {args.min_recall:.0%}")
+    if fuzzy_precision < args.min_precision:
+        failures.append(f"precision {fuzzy_precision:.1%} < {args.min_precision:.0%}")
+    if fuzzy_rate < args.min_rate:
+        failures.append(f"{fuzzy_rate:.0f} names/sec < {args.min_rate:.0f}")
+    print("FAIL: " + "; ".join(failures) if failures else "OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
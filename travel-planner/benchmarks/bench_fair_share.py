@@ -0,0 +1,136 @@
+"""Benchmark: interactive plans while a batch job floods the LLM
+
+Runs a cache warm-up style batch (several threads generating plans back to
+back as source="warmup") against the stub OpenAI server, and while it runs,
+a few interactive users each generate plans. The call scheduler is capped
+at --concurrency calls in flight (and --tpm tokens per minute), so the two
+compete for capacity. The same load runs twice:
+
+- fifo: batch plans are submitted as interactive too (one class, one queue)
+- priority: batch runs in the batch class, interactive users in theirs
+
+Reports interactive plan latency and queue wait, batch plans completed and
+the scheduler's per-class queue waits. Exits non-zero if priority doesn't
+lower the interactive p95, or if the batch is starved (no plans).
+
+Usage (from travel-planner/):
+    python benchmarks/bench_fair_share.py [--batch-threads 6] [--users 3] [--plans-per-user 2]
+                                          [--concurrency 4] [--tpm 0] [--latency-ms 300]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.load_test import RequestFactory, percentile
+from benchmarks.stub_openai import StubOpenAIServer
+
+
+def run_mode(mode: str, args, requests: RequestFactory) -> dict:
+    """Batch flood plus interactive users under one scheduler; returns measurements"""
+    from src.planner import create_travel_plan, get_swarm_client
+    from src.utils.call_scheduler import CallScheduler, parse_shares
+    from src.utils.config import Config
+
+    scheduler = CallScheduler(tpm=args.tpm, shares=parse_shares(Config.LLM_SHARES), max_concurrency=args.concurrency)
+    get_swarm_client().client.chat.completions.scheduler = scheduler
+
+    stop = threading.Event()
+    batch_done = []
+    batch_source = "user" if mode == "fifo" else "warmup"
+
+    def batch_worker():
+        while not stop.is_set():
+            create_travel_plan(requests.next(), source=batch_source, tenant="warmup")
+            batch_done.append(1)
+
+    latencies, queued = [], []
+
+    def interactive_user(index: int):
+        for _ in range(args.plans_per_user):
+            started = time.perf_counter()
+            result = create_travel_plan(requests.next(), source="user", tenant=f"session-{index}")
+            latencies.append(time.perf_counter() - started)
+            queued.append(result.metrics["llm_calls"]["queue_seconds"])
+
+    batch = [threading.Thread(target=batch_worker, daemon=True) for _ in range(args.batch_threads)]
+    for thread in batch:
+        thread.start()
+    time.sleep(args.ramp_seconds)  # Let the batch fill the queue first
+
+    users = [threading.Thread(target=interactive_user, args=(index,)) for index in range(args.users)]
+    started = time.perf_counter()
+    for thread in users:
+        thread.start()
+    for thread in users:
+        thread.join()
+    seconds = time.perf_counter() - started
+    stop.set()
+    for thread in batch:
+        thread.join()
+
+    return {
+        "mode": mode,
+        "latency_p50": percentile(latencies, 0.5),
+        "latency_p95": percentile(latencies, 0.95),
+        "queue_p95": percentile(queued, 0.95),
+        "batch_plans": len(batch_done),
+        "seconds": seconds,
+        "scheduler": scheduler.as_dict(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-threads", type=int, default=6)
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--plans-per-user", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=4, help="LLM calls in flight (LLM_MAX_CONCURRENCY)")
+    parser.add_argument("--tpm", type=int, default=0, help="Tokens per minute (LLM_TPM, 0 = no limit)")
+    parser.add_argument("--latency-ms", type=float, default=300, help="Median stub latency per LLM call")
+    parser.add_argument("--ramp-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(latency_ms=args.latency_ms, jitter=0.2).start()
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    from src.utils.config import Config
+    Config.OPENAI_BASE_URL = server.url
+    Config.PLAN_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="fair-share-"), "plans.db")
+    Config.PLAN_CACHE_WARM_LIMIT = 0
+
+    print(
+        f"Fair share: {args.batch_threads} batch thread(s) vs {args.users} interactive user(s) x "
+        f"{args.plans_per_user} plan(s), {args.concurrency} calls in flight, "
+        f"TPM {args.tpm or 'unlimited'}, stub latency {args.latency_ms:g} ms"
+    )
+    requests = RequestFactory()
+    results = [run_mode(mode, args, requests) for mode in ("fifo", "priority")]
+    server.stop()
+
+    print("  mode      plan p50/p95 s   queue p95 s  batch plans   interactive / batch wait p95 s")
+    for result in results:
+        classes = result["scheduler"]
+        print(
+            f"  {result['mode']:<8} {result['latency_p50']:>6.1f} {result['latency_p95']:>6.1f}  "
+            f"{result['queue_p95']:>11.1f}  {result['batch_plans']:>11}   "
+            f"{classes['interactive']['wait_p95']:>8.2f} / {classes['batch']['wait_p95']:.2f}"
+        )
+
+    fifo, priority = results
+    if priority["batch_plans"] == 0:
+        print("FAIL: batch was starved (no plans completed)")
+        sys.exit(1)
+    if priority["latency_p95"] >= fifo["latency_p95"]:
+        print(f"FAIL: interactive p95 {priority['latency_p95']:.1f}s with priority vs {fifo['latency_p95']:.1f}s fifo")
+        sys.exit(1)
+    print(f"Interactive p95 {fifo['latency_p95']:.1f}s -> {priority['latency_p95']:.1f}s with priority classes")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
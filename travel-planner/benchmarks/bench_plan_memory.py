@@ -0,0 +1,150 @@
+"""Benchmark: memory per 1,000 cached plans, plain vs interned and compressed
+
+Fills a SimpleCache with --plans plan results (PlanResult.to_dict() shape:
+four sections plus the agent messages they were written from), of which
+--distinct are different trips and the rest repeats served under other
+keys, as when popular requests are cached per variant of their inputs.
+Then puts the plans on --sessions session screens (TravelPlan vs
+PackedPlan). Reports retained memory (tracemalloc) for each, cache lookup
+time, and cache key time with and without the precomputed UserInput key.
+Exits non-zero when compression saves less than --min-reduction.
+
+Usage (from travel-planner/):
+    python benchmarks/bench_plan_memory.py [--plans 1000] [--distinct 250] [--sessions 1000]
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.sample_plans import make_section_texts, make_supervisor_response
+from src.models import TravelPlan, UserInput
+from src.utils.blob_store import get_blob_store
+from src.utils.cache import SimpleCache
+from src.utils.plan_store import key_hash
+
+
+def make_result(trip: int) -> dict:
+    """A fresh copy of one trip's PlanResult.to_dict() data"""
+    days = 3 + trip % 12
+    sections = make_section_texts(days=days, seed=trip)
+    messages = [
+        {"role": "user", "content": f"Plan a {days}-day trip #{trip}"},
+        *({"role": "assistant", "sender": agent, "content": make_supervisor_response(days=days, seed=trip * 7 + index)}
+          for index, agent in enumerate(("Research Agent", "Recommendation Agent", "Budget Agent"))),
+        {"role": "assistant", "sender": "Supervisor Agent", "content": make_supervisor_response(days=days, seed=trip)},
+    ]
+    return {
+        "plan": {**sections, "degradation": []},
+        "messages": messages,
+        "parse_log": [f"Parsed {len(sections)} sections"],
+        "flagged": [],
+        "empty_sections": [],
+        "metrics": {"total_seconds": 21.4, "days": days},
+        "plan_id": f"{trip:032x}",
+    }
+
+
+def retained(build) -> tuple:
+    """(bytes still allocated after build() returns, what it built)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, built
+
+
+def fill_cache(compress: bool, plans: int, distinct: int) -> SimpleCache:
+    cache = SimpleCache(compress=compress)
+    for index in range(plans):
+        cache.set(f"plan:{index:08d}", make_result(index % distinct))
+    return cache
+
+
+def fill_sessions(packed: bool, sessions: int, distinct: int) -> list:
+    screens = []
+    for index in range(sessions):
+        plan = TravelPlan(**make_result(index % distinct)["plan"])
+        screens.append(plan.packed() if packed else plan)
+    return screens
+
+
+def per_call_us(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plans", type=int, default=1000)
+    parser.add_argument("--distinct", type=int, default=250, help="Different trips among the cached plans")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--min-reduction", type=float, default=4.0, help="Plain / compressed cache memory")
+    args = parser.parse_args()
+    per_thousand = 1000 / args.plans
+
+    get_blob_store().clear_hot()
+    plain_bytes, plain = retained(lambda: fill_cache(False, args.plans, args.distinct))
+    packed_bytes, packed = retained(lambda: fill_cache(True, args.plans, args.distinct))
+    reduction = plain_bytes / max(1, packed_bytes)
+    stats = get_blob_store().stats()
+    print(f"{args.plans} cached plans ({args.distinct} distinct trips)")
+    print(f"  plain:      {plain_bytes * per_thousand / 2**20:8.1f} MB per 1,000 plans")
+    print(f"  compressed: {packed_bytes * per_thousand / 2**20:8.1f} MB per 1,000 plans "
+          f"({reduction:.1f}x less; {stats['blobs']} blobs, {stats['raw_bytes'] / 2**20:.1f} MB of text "
+          f"stored in {stats['stored_bytes'] / 2**20:.1f} MB)")
+
+    key = f"plan:{args.plans - 1:08d}"
+    plain_get = per_call_us(lambda: plain.get(key), 200)
+    get_blob_store().clear_hot()
+    cold_get = per_call_us(lambda: (packed.get(key), get_blob_store().clear_hot()), 50)
+    hot_get = per_call_us(lambda: packed.get(key), 200)
+    print(f"  lookup: plain {plain_get:.1f} µs, compressed {hot_get:.1f} µs hot / {cold_get:.0f} µs cold")
+    del plain, packed
+
+    plain_screens, _ = retained(lambda: fill_sessions(False, args.sessions, args.distinct))
+    packed_screens, screens = retained(lambda: fill_sessions(True, args.sessions, args.distinct))
+    print(f"{args.sessions} sessions showing a plan")
+    print(f"  TravelPlan: {plain_screens / 2**20:8.1f} MB")
+    print(f"  PackedPlan: {packed_screens / 2**20:8.1f} MB ({plain_screens / max(1, packed_screens):.1f}x less)")
+    render_us = per_call_us(lambda: screens[0].itinerary, 200)
+    print(f"  reading a section on rerun: {render_us:.1f} µs")
+
+    user_input = UserInput(
+        destination="Lisbon", start_date=date(2026, 5, 1), end_date=date(2026, 5, 7), budget_range=(1500, 3000),
+        pace="moderate", food_preferences=["Seafood"], activities=["Museums", "Food Tours"],
+        content_filter="family_friendly",
+    )
+
+    def old_key():
+        # What every get/set did before: dump and hash the request, then serialize and MD5 the key dict
+        data = user_input.model_dump(mode="json")
+        data["destination"] = data["destination"].strip().lower()
+        del data["legs"]
+        return hashlib.md5(json.dumps({"plan": key_hash(data)}, sort_keys=True).encode()).hexdigest()
+
+    print(f"cache key: {per_call_us(old_key, 2000):.1f} µs re-serialized, "
+          f"{per_call_us(lambda: user_input.cache_key, 2000):.2f} µs precomputed")
+
+    if reduction < args.min_reduction:
+        print(f"FAIL: cache memory reduced {reduction:.1f}x < {args.min_reduction:.1f}x")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""Benchmark: post-processing throughput
+
+Measures plans/sec for postprocess() (parse_plan_sections + filter +
+dedupe + empty-section check), which runs in-thread. Exits non-zero below
+--min-rate.
+
+Usage (from travel-planner/):
+    python benchmarks/bench_postprocess.py [--plans 400] [--min-rate 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.sample_plans import make_supervisor_response
+from src.utils.postprocess import postprocess
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plans", type=int, default=400)
+    parser.add_argument("--min-rate", type=float, default=50, help="Plans/sec")
+    args = parser.parse_args()
+
+    # Mix of trip lengths, 3-20 days
+    texts = [make_supervisor_response(days=3 + index % 18, seed=index) for index in range(args.plans)]
+    size_kb = sum(len(text) for text in texts) / len(texts) / 1024
+    print(f"{args.plans} responses, avg {size_kb:.1f} KB")
+
+    # Warm up imports and compiled patterns
+    postprocess(texts[0], "family_friendly")
+
+    started = time.perf_counter()
+    results = [postprocess(text, "family_friendly") for text in texts]
+    elapsed = time.perf_counter() - started
+    rate = args.plans / elapsed
+    print(f"  in-thread: {rate:8.1f} plans/sec ({elapsed / args.plans * 1000:.1f} ms per plan)")
+
+    flagged = sum(len(result.flagged) for result in results)
+    print(f"  content filter removed {flagged} items across {len(results)} plans")
+
+    if rate < args.min_rate:
+        print(f"FAIL: {rate:.1f} plans/sec < {args.min_rate:.0f}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""Benchmark: LLM call policy against a fault-injecting stub server
+
+Sends the same stream of chat completions through a bare OpenAI client
+(no retries) and through ResilientClient, against benchmarks/stub_openai.py
+injecting 500s, 429s and slow tail responses. Reports success rate and
+latency percentiles for both; exits non-zero if the policy lets more than
+1% of calls fail.
+
+With --pipeline it also runs create_travel_plan end to end against the
+stub (needs swarm installed).
+
+Usage (from travel-planner/):
+    python benchmarks/bench_resilience.py [--calls 200] [--concurrency 8] [--pipeline]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.stub_openai import StubOpenAIServer
+from src.utils.resilience import CallPolicy, LatencyTracker, ResilientClient, call_label, track_calls
+
+MAX_FAILURE_RATE = 0.01
+
+MESSAGES = [
+    {"role": "system", "content": "You are a travel research specialist."},
+    {"role": "user", "content": "Destination: Paris\nTravel Dates: 2025-06-01 to 2025-06-05 (5 days)"},
+]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+def run_calls(client, calls: int, concurrency: int):
+    """Make calls through a client; returns (latencies of successes, failures)"""
+    def one(_):
+        started = time.perf_counter()
+        try:
+            with call_label("bench"):
+                client.chat.completions.create(model="stub", messages=MESSAGES)
+        except Exception:
+            return None
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(copy_context().run, one, index) for index in range(calls)]
+        results = [future.result() for future in futures]
+    latencies = [result for result in results if result is not None]
+    return latencies, calls - len(latencies)
+
+
+def report(name: str, latencies, failures: int, calls: int, elapsed: float):
+    print(
+        f"  {name:<12} success {100 * (calls - failures) / calls:5.1f}%  "
+        f"p50 {percentile(latencies, 0.5) * 1000:6.0f} ms  "
+        f"p95 {percentile(latencies, 0.95) * 1000:6.0f} ms  "
+        f"p99 {percentile(latencies, 0.99) * 1000:6.0f} ms  "
+        f"({elapsed:.1f}s)"
+    )
+
+
+def run_pipeline(server: StubOpenAIServer):
+    """Generate one plan end to end through the real pipeline"""
+    from datetime import date, timedelta
+
+    from src.models import UserInput
+    from src.planner import create_travel_plan
+
+    start = date.today() + timedelta(days=30)
+    user_input = UserInput(
+        destination="Paris",
+        start_date=start,
+        end_date=start + timedelta(days=4),
+        budget_range=(1500, 3000),
+        pace="moderate",
+        content_filter="family_friendly",
+    )
+    started = time.perf_counter()
+    result = create_travel_plan(user_input)
+    print(f"  pipeline     {time.perf_counter() - started:.1f}s  stages {result.metrics['stage_seconds']}")
+    print(f"               calls {result.metrics['llm_calls']}  empty sections: {result.empty_sections or 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.05)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--pipeline", action="store_true")
+    args = parser.parse_args()
+
+    from openai import OpenAI
+
+    server = StubOpenAIServer(
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        slow_rate=args.slow_rate,
+    ).start()
+    print(
+        f"{args.calls} calls x{args.concurrency} against {server.url} "
+        f"({args.error_rate:.0%} 500s, {args.rate_limit_rate:.0%} 429s, {args.slow_rate:.0%} slow)"
+    )
+
+    bare = OpenAI(base_url=server.url, api_key="stub", max_retries=0, timeout=30)
+    started = time.perf_counter()
+    latencies, failures = run_calls(bare, args.calls, args.concurrency)
+    report("bare", latencies, failures, args.calls, time.perf_counter() - started)
+
+    policy = CallPolicy(timeout=30, max_retries=4, backoff_base=0.05, backoff_max=1.0,
+                        hedge_min_delay=0.05, hedge_min_samples=20)
+    resilient = ResilientClient(bare, policy, LatencyTracker())
+    started = time.perf_counter()
+    with track_calls() as stats:
+        latencies, failures = run_calls(resilient, args.calls, args.concurrency)
+    report("resilient", latencies, failures, args.calls, time.perf_counter() - started)
+    print(f"               {stats.as_dict()}")
+    print(f"  server       {server.counts}")
+
+    if args.pipeline:
+        os.environ["OPENAI_BASE_URL"] = server.url
+        from src.utils.config import Config
+        Config.OPENAI_BASE_URL = server.url
+        run_pipeline(server)
+
+    server.stop()
+
+    failure_rate = failures / args.calls
+    if failure_rate > MAX_FAILURE_RATE:
+        print(f"FAIL: {failure_rate:.1%} of calls failed with the policy (budget {MAX_FAILURE_RATE:.0%})")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark: itinerary scheduler on a 30-day trip with 200 candidates
+
+Usage (from travel-planner/):
+    python benchmarks/bench_scheduler.py
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.scheduler import Activity, build_schedule
+
+NUM_DAYS = 30
+NUM_ACTIVITIES = 200
+ITERATIONS = 50
+BUDGET_MS = 100.0
+
+
+def make_activities(count: int, seed: int = 42):
+    """Generate candidates with mixed durations, windows and areas"""
+    rng = random.Random(seed)
+    areas = [f"district-{i}" for i in range(12)]
+    activities = []
+    for i in range(count):
+        opens = rng.choice([0, 8 * 60, 9 * 60, 10 * 60, 11 * 60, 17 * 60])
+        duration = rng.choice([45, 60, 90, 120, 180, 240])
+        closes = min(24 * 60, opens + rng.choice([6, 8, 10, 14]) * 60) if opens else 24 * 60
+        closed = frozenset(rng.sample(range(7), rng.choice([0, 0, 1])))
+        activities.append(Activity(
+            name=f"Attraction {i}",
+            duration=duration,
+            opens=opens,
+            closes=closes,
+            area=rng.choice(areas),
+            closed_days=closed,
+        ))
+    return activities
+
+
+def main():
+    activities = make_activities(NUM_ACTIVITIES)
+
+    timings = []
+    for pace in ("relaxed", "moderate", "packed"):
+        for _ in range(ITERATIONS):
+            started = time.perf_counter()
+            schedule = build_schedule(activities, NUM_DAYS, pace=pace, start_date=date(2025, 6, 1))
+            timings.append((time.perf_counter() - started) * 1000)
+
+        scheduled = sum(day.activity_count for day in schedule.days)
+        print(f"{pace:>9}: {scheduled} scheduled, {len(schedule.unscheduled)} unscheduled")
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"\n{NUM_DAYS} days x {NUM_ACTIVITIES} activities ({len(timings)} runs)")
+    print(f"  mean: {statistics.mean(timings):.2f} ms")
+    print(f"  p95:  {p95:.2f} ms")
+    print(f"  max:  {timings[-1]:.2f} ms  (budget {BUDGET_MS:.0f} ms)")
+
+    if timings[-1] > BUDGET_MS:
+        print("FAIL: over budget")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
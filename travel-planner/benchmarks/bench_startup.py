@@ -0,0 +1,112 @@
+"""Benchmark: Streamlit app cold start and per-rerun time
+
+Runs the app headless with Streamlit's testing API in a fresh process,
+profiles the import graph of the first run, and checks that heavy
+modules (swarm, openai) are not loaded until a plan is generated.
+
+Usage (from travel-planner/):
+    python benchmarks/bench_startup.py
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+APP_PATH = os.path.join(ROOT, 'src', 'ui', 'app.py')
+
+RERUNS = 20
+COLD_START_BUDGET_MS = 1000.0
+RERUN_BUDGET_MS = 100.0
+LAZY_MODULES = ("swarm", "openai")
+
+# Executed in a fresh interpreter so the first run is a true cold start
+_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+before = set(sys.modules)
+app = AppTest.from_file({app_path!r}, default_timeout=60)
+started = time.perf_counter()
+app.run()
+cold = (time.perf_counter() - started) * 1000
+loaded = sorted(name for name in set(sys.modules) - before if "." not in name)
+
+reruns = []
+for _ in range({reruns}):
+    started = time.perf_counter()
+    app.run()
+    reruns.append((time.perf_counter() - started) * 1000)
+
+print(json.dumps({{"cold": cold, "reruns": reruns, "loaded": loaded,
+                  "exception": [str(e.value) for e in app.exception]}}))
+"""
+
+
+def run_probe(importtime: bool = False):
+    """Run the app in a fresh interpreter; returns (result, stderr)"""
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "sk-benchmark"))
+    command = [sys.executable]
+    if importtime:
+        command.append("-X")
+        command.append("importtime")
+    command += ["-c", _PROBE.format(app_path=APP_PATH, reruns=RERUNS)]
+
+    completed = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def import_profile(stderr: str, top: int = 12):
+    """Top-level packages by cumulative import time (ms)"""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        try:
+            self_us = int(parts[0].split(":")[1])
+        except ValueError:
+            continue  # header line
+        package = parts[2].strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return sorted(((us / 1000, name) for name, us in totals.items()), reverse=True)[:top]
+
+
+def main():
+    profiled, stderr = run_probe(importtime=True)
+    print("Import graph (first run, cumulative self time by package):")
+    for ms, name in import_profile(stderr):
+        print(f"  {ms:8.1f} ms  {name}")
+
+    # Timings come from a separate run without -X importtime overhead
+    result, _ = run_probe()
+    if result["exception"]:
+        print(f"FAIL: app raised {result['exception']}")
+        return 1
+
+    reruns = sorted(result["reruns"])
+    print(f"\nCold start (first script run): {result['cold']:.1f} ms  (budget {COLD_START_BUDGET_MS:.0f} ms)")
+    print(f"Rerun: mean {statistics.mean(reruns):.1f} ms, max {reruns[-1]:.1f} ms  (budget {RERUN_BUDGET_MS:.0f} ms)")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in profiled["loaded"]]
+    if eager:
+        print(f"FAIL: imported before first plan generation: {', '.join(eager)}")
+        failed = True
+    if result["cold"] > COLD_START_BUDGET_MS:
+        print("FAIL: cold start over budget")
+        failed = True
+    if statistics.mean(reruns) > RERUN_BUDGET_MS:
+        print("FAIL: rerun over budget")
+        failed = True
+
+    if failed:
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
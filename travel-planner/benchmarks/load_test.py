@@ -0,0 +1,267 @@
+"""Load test: concurrent planning sessions against the stub OpenAI server
+
+Simulates N users, each doing what an app session does: submit a plan job
+to the job queue, poll it until it finishes, think for a while, and plan
+again. LLM calls go to benchmarks/stub_openai.py with log-normal latency,
+so the whole pipeline (research, specialists, section writers, validation,
+post-processing, plan store) runs for real except the model. Plans the
+planner degraded under overload (see src/utils/degradation.py) are counted
+per level.
+
+The user count is swept to produce a capacity curve: throughput, queueing
+delay, end-to-end latency, error rate, memory growth and search_cache
+growth per level. Exits non-zero if any level fails more than 1% of plans.
+
+Usage (from travel-planner/):
+    python benchmarks/load_test.py [--users 1 2 4 8 16] [--workers 2] [--plans-per-user 2]
+                                   [--latency-ms 800] [--csv capacity.csv]
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.stub_openai import StubOpenAIServer
+
+MAX_ERROR_RATE = 0.01
+
+DESTINATIONS = [
+    "Paris", "Tokyo", "Rome", "Barcelona", "Lisbon", "New York", "London", "Kyoto",
+    "Amsterdam", "Prague", "Vienna", "Istanbul", "Bangkok", "Sydney", "Cape Town", "Mexico City",
+]
+
+
+@dataclass
+class LevelResult:
+    """Measurements for one user count"""
+
+    users: int
+    plans: int
+    failed: int
+    degraded: int
+    seconds: float
+    plans_per_min: float
+    queue_p50: float
+    queue_p95: float
+    latency_p50: float
+    latency_p95: float
+    llm_calls: int
+    max_in_flight: int
+    rss_mb: float
+    rss_growth_mb: float
+    cache_entries: int
+    cache_growth: int
+    cache_kb: float
+
+    @property
+    def error_rate(self) -> float:
+        return self.failed / self.plans if self.plans else 0.0
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak RSS where /proc isn't available)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def cache_kb(cache) -> float:
+    """Serialized size of everything in a SimpleCache"""
+    from src.utils.blob_store import unpack
+
+    return sum(len(json.dumps(unpack(value), default=str)) for _, value in list(cache.cache.values())) / 1024
+
+
+class RequestFactory:
+    """Unique trip requests, so no run is served from an earlier one's cache"""
+
+    def __init__(self):
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def next(self):
+        from src.models import UserInput
+
+        with self._lock:
+            index = self._count
+            self._count += 1
+        # A new month per pass over the destinations keeps research keys unique too
+        start = date.today() + timedelta(days=30 + 31 * (index // len(DESTINATIONS)))
+        return UserInput(
+            destination=DESTINATIONS[index % len(DESTINATIONS)],
+            start_date=start,
+            end_date=start + timedelta(days=2 + index % 5),
+            budget_range=(1000, 3000),
+            pace=("relaxed", "moderate", "packed")[index % 3],
+            content_filter=("family_friendly", "adults_only")[index % 2],
+        )
+
+
+def run_user(queue, requests: RequestFactory, plans: int, think_seconds: float, rng: random.Random, jobs: list,
+             tenant: str = ""):
+    """One simulated session: submit, poll until finished, think, repeat"""
+    for _ in range(plans):
+        job_id = queue.submit("plan", {**requests.next().model_dump(mode="json"), "tenant": tenant})
+        while True:
+            job = queue.get(job_id)
+            if job is None or job.finished:
+                break
+            time.sleep(0.05)
+        jobs.append(job)
+        if think_seconds:
+            time.sleep(rng.expovariate(1 / think_seconds))
+
+
+def run_level(users: int, args, server: StubOpenAIServer, requests: RequestFactory, baseline_rss: float) -> LevelResult:
+    from src.utils.cache import search_cache
+    from src.utils.jobs import JOB_DONE, JobQueue, MemoryJobBackend
+
+    queue = JobQueue(MemoryJobBackend(), workers=args.workers)
+    cache_before = search_cache.size()
+    requests_before = server.counts["requests"]
+    server.counts["max_in_flight"] = 0
+
+    jobs = []
+    threads = [
+        threading.Thread(
+            target=run_user,
+            args=(queue, requests, args.plans_per_user, args.think_seconds, random.Random(index), jobs, f"user-{index}"),
+        )
+        for index in range(users)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+    queue.stop()
+
+    done = [job for job in jobs if job and job.status == JOB_DONE]
+    queued = [job.queue_seconds for job in done]
+    latency = [job.finished_at - job.created_at for job in done]
+    rss = rss_mb()
+    return LevelResult(
+        users=users,
+        plans=len(jobs),
+        failed=len(jobs) - len(done),
+        degraded=sum(1 for job in done if job.result["metrics"].get("degradation")),
+        seconds=round(seconds, 2),
+        plans_per_min=round(60 * len(done) / seconds, 1),
+        queue_p50=round(percentile(queued, 0.5), 2),
+        queue_p95=round(percentile(queued, 0.95), 2),
+        latency_p50=round(percentile(latency, 0.5), 2),
+        latency_p95=round(percentile(latency, 0.95), 2),
+        llm_calls=server.counts["requests"] - requests_before,
+        max_in_flight=server.counts["max_in_flight"],
+        rss_mb=round(rss, 1),
+        rss_growth_mb=round(rss - baseline_rss, 1),
+        cache_entries=search_cache.size(),
+        cache_growth=search_cache.size() - cache_before,
+        cache_kb=round(cache_kb(search_cache), 1),
+    )
+
+
+def print_level(result: LevelResult):
+    print(
+        f"  {result.users:>5}  {result.plans_per_min:>8.1f}  {result.queue_p50:>6.2f} {result.queue_p95:>6.2f}  "
+        f"{result.latency_p50:>6.2f} {result.latency_p95:>6.2f}  {result.error_rate:>6.1%} {result.degraded:>8}  "
+        f"{result.llm_calls:>5} {result.max_in_flight:>4}  {result.rss_mb:>7.1f} {result.rss_growth_mb:>+7.1f}  "
+        f"{result.cache_entries:>6} {result.cache_kb:>8.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--workers", type=int, default=2, help="Planner workers (PLANNER_WORKERS)")
+    parser.add_argument("--plans-per-user", type=int, default=2)
+    parser.add_argument("--think-seconds", type=float, default=0.5, help="Mean pause between a user's plans")
+    parser.add_argument("--latency-ms", type=float, default=800, help="Median stub latency per LLM call")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Log-normal sigma of stub latency")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--slo-factor", type=float, default=2.0,
+                        help="Capacity = most users whose p95 latency stays within this factor of the first level's")
+    parser.add_argument("--csv", help="Write the capacity curve to this CSV file")
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(
+        latency_ms=args.latency_ms,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+    ).start()
+
+    # Point the app at the stub and a throwaway plan store
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    from src.utils.config import Config
+    Config.OPENAI_BASE_URL = server.url
+    Config.PLAN_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="load-test-"), "plans.db")
+    Config.PLAN_CACHE_WARM_LIMIT = 0
+    import src.planner  # noqa: F401 - registers the "plan" job handler
+
+    print(
+        f"Load test: {args.workers} planner worker(s), {args.plans_per_user} plan(s) per user, "
+        f"stub latency {args.latency_ms:g} ms (sigma {args.jitter:g}) at {server.url}"
+    )
+    print("  users  plans/min  queue p50/p95 s  e2e p50/p95 s  errors degraded  calls  max   RSS MB  growth  cache entries/KB")
+
+    # One plan first, so lazy imports (swarm, openai) don't count as growth
+    requests = RequestFactory()
+    src.planner.create_travel_plan(requests.next())
+    baseline_rss = rss_mb()
+    results = []
+    for users in args.users:
+        result = run_level(users, args, server, requests, baseline_rss)
+        results.append(result)
+        print_level(result)
+    server.stop()
+
+    slo = results[0].latency_p95 * args.slo_factor
+    within = [result for result in results if result.latency_p95 <= slo and result.error_rate <= MAX_ERROR_RATE]
+    if within:
+        best = max(within, key=lambda result: result.users)
+        print(
+            f"Capacity with {args.workers} worker(s): ~{best.users} concurrent users at "
+            f"{best.plans_per_min:.1f} plans/min (p95 {best.latency_p95:.1f}s <= {slo:.1f}s)"
+        )
+    growth = results[-1].cache_entries / max(sum(result.plans for result in results), 1)
+    print(f"search_cache: {results[-1].cache_entries} entries ({growth:.1f} per plan), {results[-1].cache_kb:.0f} KB")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=[*asdict(results[0]), "error_rate", "workers"])
+            writer.writeheader()
+            for result in results:
+                writer.writerow({**asdict(result), "error_rate": round(result.error_rate, 4), "workers": args.workers})
+        print(f"Capacity curve written to {args.csv}")
+
+    worst = max(results, key=lambda result: result.error_rate)
+    if worst.error_rate > MAX_ERROR_RATE:
+        print(f"FAIL: {worst.error_rate:.1%} of plans failed at {worst.users} users (budget {MAX_ERROR_RATE:.0%})")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Synthetic supervisor responses shaped like real agent output
+
+Shared by the benchmarks and the stub OpenAI server.
+"""
+
+import random
+
+_HOTEL_TIERS = [("$", "Budget", 80, 140), ("$$", "Mid-range", 180, 320), ("$$$", "Luxury", 450, 900)]
+_AREAS = ["Old Town", "Riverside", "Museum Quarter", "Harbour", "Market District", "University Hill"]
+_KINDS = ["Museum", "Landmark", "Park", "Market", "Tour", "Gallery", "Cathedral", "Garden"]
+_ADULT_ITEMS = ["Rooftop Bar Crawl", "Grand Casino Night", "Jazz Club Evening", "Wine Tasting Cellar"]
+
+
+def make_section_texts(days: int = 5, seed: int = 0, adult_items: int = 2) -> dict:
+    """
+    Build the four section bodies for a synthetic plan
+
+    Args:
+        days: Trip length (itinerary days)
+        seed: Random seed
+        adult_items: Number of activities a family-friendly filter should remove
+
+    Returns:
+        Dict of TravelPlan field name to markdown
+    """
+    rng = random.Random(seed)
+
+    hotels = []
+    for index in range(5):
+        symbol, tier, low, high = _HOTEL_TIERS[index % 3]
+        hotels.append(
+            f"**{index + 1}. Hotel {rng.choice(_AREAS)} {index + 1}** - {symbol} ({tier})\n"
+            f"- Location: {rng.choice(_AREAS)}\n"
+            f"- Price: ${low}-{high} per night\n"
+            f"- Why: Close to the main sights with good transport links\n"
+            f"- Amenities: WiFi, breakfast, 24h reception"
+        )
+
+    activities = []
+    names = [f"{rng.choice(_AREAS)} {rng.choice(_KINDS)} {index}" for index in range(12 - adult_items)]
+    names += _ADULT_ITEMS[:adult_items]
+    rng.shuffle(names)
+    for index, name in enumerate(names):
+        activities.append(
+            f"**{index + 1}. {name}**\n"
+            f"- Description: One of the most popular things to do, with great views and history\n"
+            f"- Duration: {rng.choice(['1-2', '2-3', '3'])} hours\n"
+            f"- Cost: ${rng.randint(0, 40)}-{rng.randint(41, 90)}\n"
+            f"- Best time: {rng.choice(['Morning', 'Afternoon', 'Evening'])}\n"
+            f"- Why recommended: Highly rated by visitors"
+        )
+
+    transportation = (
+        "**Getting There:**\n\n*Major Airports:*\n"
+        "- **Central International Airport (CIA)**: Main international airport, 25 km from city center\n"
+        "  - Transport to city: Train ($12, 30 min), Taxi ($55, 45 min), Bus ($6, 60 min)\n"
+        "- **City Airport (CTY)**: Secondary airport, 12 km from city center\n"
+        "  - Transport to city: Shuttle ($10, 25 min)\n\n"
+        "**Getting Around:**\n"
+        "- **Metro**: $2.50 per ride, $9 day pass\n"
+        "- **Bus**: Extensive network, same pricing as metro\n"
+        "- **Taxis**: Meter starts at $4, average ride $15-25\n"
+        "- **Bikes**: Bike share $3 per hour"
+    )
+
+    itinerary = []
+    for day in range(1, days + 1):
+        itinerary.append(
+            f"### Day {day} - 2025-06-{day:02d}\n\n"
+            f"**Morning (9:00 AM - 12:00 PM)**\n"
+            f"- Activity: {rng.choice(names)}\n- Location: {rng.choice(_AREAS)}\n- Duration: 2 hours\n\n"
+            f"**Afternoon (12:00 PM - 6:00 PM)**\n"
+            f"- Lunch: Local bistro in {rng.choice(_AREAS)}\n- Activity: {rng.choice(names)}\n"
+            f"- Travel: 20 min by metro\n\n"
+            f"**Evening (6:00 PM - 10:00 PM)**\n"
+            f"- Dinner: Family restaurant near the hotel\n- Activity: Evening stroll along the river"
+        )
+
+    return {
+        "places_to_stay": "Here are the best places to stay:\n\n" + "\n\n".join(hotels),
+        "activities": "\n\n".join(activities),
+        "transportation": transportation,
+        "itinerary": "\n\n".join(itinerary),
+    }
+
+
+def make_supervisor_response(days: int = 5, seed: int = 0, adult_items: int = 2) -> str:
+    """A full supervisor response with section markers"""
+    sections = make_section_texts(days, seed, adult_items)
+    markers = [
+        ("PLACES TO STAY", "places_to_stay"),
+        ("ACTIVITIES", "activities"),
+        ("TRANSPORTATION", "transportation"),
+        ("ITINERARY", "itinerary"),
+    ]
+    return "\n\n".join(
+        f"=== SECTION START: {marker} ===\n{sections[key]}\n=== SECTION END: {marker} ==="
+        for marker, key in markers
+    )
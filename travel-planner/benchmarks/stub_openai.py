@@ -0,0 +1,284 @@
+"""Local fault-injecting stub of the OpenAI chat completions API
+
+Answers POST /v1/chat/completions with synthetic agent output (see
+sample_plans.py) after a configurable latency, and injects 500s, 429s
+(with Retry-After) and slow tail responses at configurable rates. Point the
+app or a benchmark at it with OPENAI_BASE_URL.
+
+Like the real API it reports prompt caching: prompts sharing a prefix of
+at least 1024 tokens with an earlier request get the shared part (in
+128-token steps) back as usage.prompt_tokens_details.cached_tokens. It also
+honours max_tokens (4 characters per token): longer output is cut off with
+finish_reason "length", and a follow-up that replays the partial answer as
+an assistant message gets the rest.
+
+Usage (from travel-planner/):
+    python benchmarks/stub_openai.py [--port 8808] [--latency-ms 300] [--error-rate 0.1]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.sample_plans import make_section_texts, make_supervisor_response
+
+# Provider prompt caching: minimum cacheable prefix and cache granularity
+CACHE_MIN_TOKENS = 1024
+CACHE_STEP_TOKENS = 128
+
+_DAYS = re.compile(r"\((\d+) days\)")
+_WRITER_SECTION = re.compile(r"Write the (.+?) section")
+_COUNT = re.compile(r"Write (\d+) MORE")
+_MISSING_DAYS = re.compile(r"Day (\d+)")
+_WRITER_SECTIONS = ("PLACES TO STAY", "ACTIVITIES", "TRANSPORTATION", "ITINERARY")
+
+
+class StubOpenAIServer:
+    """Stub chat completions server running on a background thread"""
+
+    def __init__(self, port: int = 0, latency_ms: float = 300, jitter: float = 0.3,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 slow_rate: float = 0.0, slow_factor: float = 10.0, seed: int = 0):
+        """
+        Configure the stub
+
+        Args:
+            port: Port to listen on (0 picks a free one)
+            latency_ms: Median response latency
+            jitter: Log-normal sigma of the latency
+            error_rate: Fraction of requests answered with HTTP 500
+            rate_limit_rate: Fraction of requests answered with HTTP 429
+            slow_rate: Fraction of requests that take slow_factor times longer
+            slow_factor: Latency multiplier for slow requests
+            seed: Random seed for fault injection
+        """
+        self.latency = latency_ms / 1000
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.slow_rate = slow_rate
+        self.slow_factor = slow_factor
+        self.counts = {"requests": 0, "errors": 0, "rate_limited": 0, "slow": 0, "in_flight": 0, "max_in_flight": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._prefixes = set()  # Hashes of prompt prefixes seen, at cache step boundaries
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as OPENAI_BASE_URL"""
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def start(self) -> "StubOpenAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, name: str, delta: int = 1):
+        with self._lock:
+            self.counts[name] += delta
+            self.counts["max_in_flight"] = max(self.counts["max_in_flight"], self.counts["in_flight"])
+
+    def _fault(self):
+        """Pick the outcome of a request: (status, delay seconds)"""
+        with self._lock:
+            roll = self._rng.random()
+            delay = self.latency * math.exp(self._rng.gauss(0, self.jitter)) if self.jitter else self.latency
+        if roll < self.error_rate:
+            self._count("errors")
+            return 500, delay / 4
+        if roll < self.error_rate + self.rate_limit_rate:
+            self._count("rate_limited")
+            return 429, 0.0
+        if roll < self.error_rate + self.rate_limit_rate + self.slow_rate:
+            self._count("slow")
+            return 200, delay * self.slow_factor
+        return 200, delay
+
+    def cached_prefix(self, request: dict) -> int:
+        """Tokens of this prompt's prefix already seen in an earlier request (0 below 1024)"""
+        prompt = json.dumps(request.get("tools", []), sort_keys=True) + "".join(
+            f"{m.get('role')}:{m.get('content') or ''}\n" for m in request.get("messages", [])
+        )
+        step = CACHE_STEP_TOKENS * 4
+        digest = hashlib.blake2b(digest_size=16)
+        cached = 0
+        with self._lock:
+            for end in range(step, len(prompt) + 1, step):
+                digest.update(prompt[end - step:end].encode("utf-8"))
+                key = digest.copy().hexdigest()
+                if key in self._prefixes and end // 4 >= CACHE_MIN_TOKENS:
+                    cached = end // 4
+                self._prefixes.add(key)
+        return cached
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: dict = None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client gave up (timeout or hedge won)
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, {"error": {"message": "not found"}})
+                    return
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                stub._count("requests")
+                stub._count("in_flight")
+                try:
+                    status, delay = stub._fault()
+                    time.sleep(delay)
+                    if status == 429:
+                        self._send(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                                   {"Retry-After": "0.2"})
+                    elif status >= 500:
+                        self._send(status, {"error": {"message": "Injected server error", "type": "server_error"}})
+                    else:
+                        response = completion(request)
+                        cached = stub.cached_prefix(request)
+                        response["usage"]["prompt_tokens_details"] = {"cached_tokens": min(cached, response["usage"]["prompt_tokens"])}
+                        self._send(200, response)
+                finally:
+                    stub._count("in_flight", -1)
+
+        return Handler
+
+
+def correction(user: str, seed: int) -> str:
+    """Answer a corrective request (more hotels/activities, airports, missing days)"""
+    count = _COUNT.search(user)
+    count = int(count.group(1)) if count else 1
+    missing_days = [int(number) for number in _MISSING_DAYS.findall(user.split("Write ONLY", 1)[0])]
+    sections = make_section_texts(days=max(missing_days, default=1), seed=seed + 1, adult_items=0)
+    if "MORE hotel" in user:
+        return "\n\n".join(sections["places_to_stay"].split("\n\n")[1:count + 1])
+    if "MORE specific attractions" in user:
+        return "\n\n".join(sections["activities"].split("\n\n")[:count])
+    if "Major Airports" in user:
+        return sections["transportation"].split("\n\n")[1].split("\n- **City Airport")[0]
+    if missing_days:
+        days = sections["itinerary"].split("\n\n### ")
+        return "\n\n".join(
+            ("" if day.startswith("### ") else "### ") + day
+            for day in days
+            if int(_MISSING_DAYS.match(day.lstrip("# ")).group(1)) in missing_days
+        )
+    return ""
+
+
+def generate(messages: list) -> str:
+    """Full answer for a conversation"""
+    system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+    user = "\n".join(m.get("content") or "" for m in messages if m.get("role") == "user")
+    match = _DAYS.search(user)
+    days = int(match.group(1)) if match else 5
+    seed = len(user)
+
+    if system.startswith("You are the travel planning supervisor"):
+        content = make_supervisor_response(days=days, seed=seed)
+    elif system.startswith("You are a travel plan writer"):
+        # Section writers: the one section named in the request
+        sections = dict(zip(_WRITER_SECTIONS, make_section_texts(days=days, seed=seed).values()))
+        match = _WRITER_SECTION.search(user)
+        content = sections.get(match.group(1), "") if match else correction(user, seed)
+    else:
+        # Specialists: findings shaped like the sections they feed
+        sections = make_section_texts(days=days, seed=seed)
+        content = "\n\n".join(sections.values())
+    return content
+
+
+def completion(request: dict) -> dict:
+    """Build a chat completion response for a request"""
+    messages = request.get("messages", [])
+    if len(messages) >= 2 and messages[-1].get("role") == "user" and messages[-2].get("role") == "assistant":
+        # Continuation of a cut-off answer: the rest of what it would have said
+        partial = messages[-2].get("content") or ""
+        content = generate(messages[:-2])[len(partial):]
+    else:
+        content = generate(messages)
+
+    finish_reason = "stop"
+    max_tokens = request.get("max_tokens")
+    if max_tokens and len(content) > max_tokens * 4:
+        content = content[:max_tokens * 4]
+        finish_reason = "length"
+
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": finish_reason,
+        }],
+        "usage": {
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (prompt_chars + len(content)) // 4,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        slow_rate=args.slow_rate,
+    ).start()
+    print(f"Stub OpenAI server on {server.url} - set OPENAI_BASE_URL={server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
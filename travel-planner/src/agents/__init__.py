@@ -5,6 +5,7 @@ from src.agents.research import create_research_agent
 from src.agents.budget import create_budget_agent
 from src.agents.itinerary import create_itinerary_agent
 from src.agents.recommendation import create_recommendation_agent
+from src.agents.section_writer import create_section_writer_agent
 
 __all__ = [
     "create_supervisor_agent",
@@ -12,5 +13,6 @@ __all__ = [
     "create_budget_agent",
     "create_itinerary_agent",
     "create_recommendation_agent",
+    "create_section_writer_agent",
 ]
 
@@ -1,7 +1,49 @@
 """Itinerary Agent - Creates day-by-day schedules"""
 
+import json
+from datetime import date
+
 from swarm import Agent
 from src.utils.config import Config
+from src.utils.scheduler import Activity, build_schedule, parse_clock, parse_weekdays
+
+
+def schedule_activities(activities: str, context_variables: dict) -> str:
+    """
+    Pack candidate activities into Morning/Afternoon/Evening blocks
+
+    Args:
+        activities: JSON list of objects with "name", "duration_hours" and
+            optional "opens", "closes" (e.g. "09:00", "5:30 PM"), "area"
+            and "closed_days" (e.g. ["Monday"]), most important first
+
+    Returns:
+        Day-by-day schedule skeleton to describe
+    """
+    try:
+        items = json.loads(activities)
+        candidates = [
+            Activity(
+                name=str(item["name"]),
+                duration=max(15, int(float(item.get("duration_hours", 2)) * 60)),
+                opens=parse_clock(item["opens"]) if item.get("opens") else 0,
+                closes=parse_clock(item["closes"]) if item.get("closes") else 24 * 60,
+                area=str(item.get("area", "")).strip().lower(),
+                closed_days=parse_weekdays(item.get("closed_days", [])),
+            )
+            for item in items
+        ]
+    except (ValueError, KeyError, TypeError) as e:
+        return f"Could not schedule activities: {e}. Pass a JSON list of activity objects."
+
+    start_date = context_variables.get("start_date")
+    schedule = build_schedule(
+        candidates,
+        num_days=int(context_variables.get("duration_days") or 1),
+        pace=context_variables.get("pace") or "moderate",
+        start_date=date.fromisoformat(start_date) if start_date else None,
+    )
+    return schedule.to_prompt()
 
 
 def create_itinerary_agent():
@@ -19,6 +61,13 @@ def create_itinerary_agent():
 
 Your task is to create a detailed day-by-day schedule:
 
+**Scheduling (do this first):**
+Call `schedule_activities` with a JSON list of the candidate attractions, most important first.
+For each one give "name", "duration_hours", "opens", "closes", "area" (neighborhood) and "closed_days".
+The function returns a day-by-day schedule that already respects opening hours, travel buffers
+and the user's pace. Keep its days, times and order; your job is to describe each slot and add
+lunch/dinner suggestions.
+
 **Time Blocks:**
 - Morning: 9:00 AM - 12:00 PM
 - Afternoon: 12:00 PM - 6:00 PM (include lunch)
@@ -57,6 +106,7 @@ Your task is to create a detailed day-by-day schedule:
 - Consider opening hours and typical visit durations
 
 When done, say "TRANSFER_TO_SUPERVISOR" to hand back control.
-"""
+""",
+        functions=[schedule_activities]
     )
 
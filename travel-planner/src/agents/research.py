@@ -22,7 +22,7 @@ Your task is to provide comprehensive destination information using your built-i
 1. **Top Attractions** - List at least 10-15 specific must-see places (museums, landmarks, parks, markets, etc.)
 2. **Airports & Getting There** - Major airports serving the destination with their 3-letter codes (e.g., JFK, CDG, NRT)
 3. **Local Transportation** - Metro/subway systems, buses, taxis, bike shares with typical costs
-4. **Accommodation Areas** - Best neighborhoods to stay in with 3-5 specific hotel examples
+4. **Accommodation Areas** - Best neighborhoods to stay in with 3-5 specific hotel examples across price levels (budget, mid-range, luxury)
 5. **Local Tips** - Customs, safety, best times to visit attractions
 6. **Weather** - Expected conditions during travel dates
 7. **Popular Events** - Common festivals or special happenings
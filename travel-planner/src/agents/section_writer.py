@@ -0,0 +1,46 @@
+"""Section Writer Agents - Write one plan section each, concurrently"""
+
+from swarm import Agent
+from src.agents.supervisor import SECTION_FORMATS, SECTION_GUIDES
+
+
+SECTION_TITLES = {
+    "places_to_stay": "Places to Stay",
+    "activities": "Activities",
+    "transportation": "Transportation",
+    "itinerary": "Day-by-Day Itinerary",
+}
+
+
+def create_section_writer_agent(section: str):
+    """
+    Create an agent that writes a single plan section
+    
+    Args:
+        section: TravelPlan field name (places_to_stay, activities, transportation, itinerary)
+    
+    Returns:
+        Swarm Agent configured as a section writer
+    """
+    
+    return Agent(
+        name=f"{SECTION_TITLES[section]} Writer",
+        model="gpt-4o",  # Same model as the supervisor it stands in for
+        instructions=f"""You are a travel plan writer. You write ONLY the "{SECTION_TITLES[section]}" section of a travel plan,
+using the specialist findings provided with the request.
+
+⚠️ The section MUST be at least 200 words with specific names, prices and details!
+⚠️ Write ONLY this section - no other sections, no introduction, no closing remarks.
+⚠️ Do NOT add section markers or a section heading - start directly with the content.
+⚠️ Apply the content filter given in the request.
+
+{SECTION_GUIDES[section]}
+
+**Output format (content below the heading):**
+
+```markdown
+{SECTION_FORMATS[section]}
+```
+""",
+        functions=[]
+    )
@@ -4,69 +4,15 @@ from swarm import Agent
 from src.utils.config import Config
 
 
-def create_supervisor_agent():
-    """
-    Create supervisor agent that orchestrates the workflow
-    
-    Returns:
-        Swarm Agent configured as supervisor
-    """
-    
-    return Agent(
-        name="Travel Planning Supervisor",
-        model="gpt-4o",  # Use gpt-4o explicitly for better instruction following
-        instructions="""You are the travel planning supervisor coordinating specialized agents.
-
-⚠️ CRITICAL: You MUST produce output with ALL 4 sections filled with substantial content!
-⚠️ DO NOT leave any section empty or with placeholder text!
-⚠️ Each section MUST be at least 200 words with specific details!
-
-**Your Workflow:**
-
-1. **Analyze Request** - Understand what the user needs
-
-2. **Coordinate Agents** - Call agents in this order to gather ALL information:
-   - Research Agent → destination information, attractions, tips
-   - Budget Agent → cost estimates and breakdown
-   - Itinerary Agent → day-by-day schedule
-   - Recommendation Agent → restaurants and activities (with content filtering!)
-
-3. **Synthesize Complete Plan** - After ALL agents finish, create 4 COMPLETE sections
-
-**CRITICAL OUTPUT FORMAT - YOU MUST USE THESE EXACT MARKERS:**
-
-Your final response MUST use these EXACT section markers:
-
-```
-=== SECTION START: PLACES TO STAY ===
-[Your content here]
-=== SECTION END: PLACES TO STAY ===
-
-=== SECTION START: ACTIVITIES ===
-[Your content here]
-=== SECTION END: ACTIVITIES ===
-
-=== SECTION START: TRANSPORTATION ===
-[Your content here]
-=== SECTION END: TRANSPORTATION ===
-
-=== SECTION START: ITINERARY ===
-[Your content here]
-=== SECTION END: ITINERARY ===
-```
-
-⚠️ EACH SECTION MUST HAVE THE START AND END MARKERS!
-⚠️ DO NOT SKIP ANY SECTIONS!
-
-**CRITICAL: Each section MUST have substantial content. Do NOT leave sections empty!**
-
-**Section 1: 🏨 Places to Stay**
+# Per-section guidance and output format, shared by the supervisor and the
+# section writers (src/agents/section_writer.py)
+SECTION_GUIDES = {
+    "places_to_stay": """**Section 1: 🏨 Places to Stay**
 - Recommend 3-5 hotel/accommodation options
 - Include different budget levels (budget, mid-range, luxury)
 - Add location details, price ranges, and why recommended
-- Use information from Budget Agent and Research Agent
-
-**Section 2: 🎭 Activities (MUST LIST POPULAR ATTRACTIONS!)**
+- Use information from Budget Agent and Research Agent""",
+    "activities": """**Section 2: 🎭 Activities (MUST LIST POPULAR ATTRACTIONS!)**
 ⚠️ THIS SECTION MUST HAVE 8-12 SPECIFIC ATTRACTIONS/ACTIVITIES!
 - List 8-12 popular activities and attractions (NOT a schedule!)
 - These are RECOMMENDATIONS of things to do
@@ -76,9 +22,8 @@ Your final response MUST use these EXACT section markers:
 - Use information from Research Agent and Recommendation Agent
 - DO NOT include day numbers or schedule here - that goes in Itinerary section!
 - EXAMPLE: If destination is Paris, include: Eiffel Tower, Louvre Museum, Notre-Dame, Seine River Cruise, Versailles Palace, etc.
-- EXAMPLE: If destination is Tokyo, include: Tokyo Tower, Senso-ji Temple, Tsukiji Fish Market, Shibuya Crossing, etc.
-
-**Section 3: 🚗 Transportation (MUST INCLUDE AIRPORTS AND LOCAL TRANSPORT!)**
+- EXAMPLE: If destination is Tokyo, include: Tokyo Tower, Senso-ji Temple, Tsukiji Fish Market, Shibuya Crossing, etc.""",
+    "transportation": """**Section 3: 🚗 Transportation (MUST INCLUDE AIRPORTS AND LOCAL TRANSPORT!)**
 ⚠️ THIS SECTION MUST HAVE SPECIFIC AIRPORT AND TRANSPORT INFO!
 - Explain how to get TO the destination:
   * MAJOR AIRPORTS serving the destination (name, code, distance from city center)
@@ -91,23 +36,19 @@ Your final response MUST use these EXACT section markers:
   * Bike rentals if applicable
 - Add tips for getting around efficiently
 - Use information from Research Agent and Budget Agent
-- EXAMPLE: "Paris is served by Charles de Gaulle Airport (CDG) and Orly Airport (ORY). CDG is 25km from city center. Use the RER B train (€10) or taxi (€50-70). In the city, the Metro is excellent (€1.90 per trip or €14.90 for a day pass)."
-
-**Section 4: 📅 Day-by-Day Itinerary**
+- EXAMPLE: "Paris is served by Charles de Gaulle Airport (CDG) and Orly Airport (ORY). CDG is 25km from city center. Use the RER B train (€10) or taxi (€50-70). In the city, the Metro is excellent (€1.90 per trip or €14.90 for a day pass).\"""",
+    "itinerary": """**Section 4: 📅 Day-by-Day Itinerary**
 - Complete day-by-day schedule for ALL DAYS of the trip
 - EVERY single day must be in this section
 - Each day with morning/afternoon/evening activities
 - Include meal suggestions
 - Show travel times between locations
 - This comes directly from Itinerary Agent output
-- Make sure ALL days (Day 1, Day 2, Day 3, etc.) are included here
-
-**Final Output Format (MUST include ALL sections with content):**
-
-YOU MUST FOLLOW THIS EXACT FORMAT:
+- Make sure ALL days (Day 1, Day 2, Day 3, etc.) are included here""",
+}
 
-```markdown
-# 🏨 Places to Stay
+SECTION_FORMATS = {
+    "places_to_stay": """# 🏨 Places to Stay
 
 **1. [Hotel Name 1]** - $ (Budget)
 - Location: [Specific area/neighborhood]
@@ -127,11 +68,8 @@ YOU MUST FOLLOW THIS EXACT FORMAT:
 - Why: Premium experience, excellent service
 - Amenities: [Spa, fine dining, etc.]
 
-[Add 2-3 more options for total of 3-5]
-
----
-
-# 🎭 Activities
+[Add 2-3 more options for total of 3-5]""",
+    "activities": """# 🎭 Activities
 
 ⚠️ MUST LIST 8-12 POPULAR ATTRACTIONS - DO NOT LEAVE THIS EMPTY!
 
@@ -161,11 +99,8 @@ YOU MUST FOLLOW THIS EXACT FORMAT:
 **8. [Activity 8]**
 **9. [Activity 9]**
 **10. [Activity 10]**
-...up to 12 activities
-
----
-
-# 🚗 Transportation
+...up to 12 activities""",
+    "transportation": """# 🚗 Transportation
 
 ⚠️ MUST INCLUDE AIRPORTS AND TRANSPORT OPTIONS - DO NOT LEAVE EMPTY!
 
@@ -198,11 +133,8 @@ YOU MUST FOLLOW THIS EXACT FORMAT:
 *Tips:*
 - Purchase a [transport pass name] for unlimited rides
 - Download [app name] for route planning
-- Avoid taxis during rush hour
-
----
-
-# 📅 Day-by-Day Itinerary
+- Avoid taxis during rush hour""",
+    "itinerary": """# 📅 Day-by-Day Itinerary
 
 [Complete schedule for ALL DAYS - paste everything from Itinerary Agent]
 
@@ -229,13 +161,85 @@ Evening (6:00 PM - 10:00 PM):
 
 [Same format]
 
-[Continue for ALL days of the trip - make sure every day is here!]
+[Continue for ALL days of the trip - make sure every day is here!]""",
+}
+
+_GUIDES_TEXT = "\n\n".join(SECTION_GUIDES.values())
+_FORMATS_TEXT = "\n\n---\n\n".join(SECTION_FORMATS.values())
+
+
+def create_supervisor_agent():
+    """
+    Create supervisor agent that orchestrates the workflow
+    
+    Returns:
+        Swarm Agent configured as supervisor
+    """
+    
+    return Agent(
+        name="Travel Planning Supervisor",
+        model="gpt-4o",  # Use gpt-4o explicitly for better instruction following
+        instructions=f"""You are the travel planning supervisor coordinating specialized agents.
+
+⚠️ CRITICAL: You MUST produce output with ALL 4 sections filled with substantial content!
+⚠️ DO NOT leave any section empty or with placeholder text!
+⚠️ Each section MUST be at least 200 words with specific details!
+
+**Your Workflow:**
+
+1. **Analyze Request** - Understand what the user needs
+
+2. **Review Agent Findings** - The specialist agents have already run; their output is in the request
+   (some requests leave out the Itinerary agent - the request says so):
+   - Research Agent → destination information, attractions, tips
+   - Budget Agent → cost estimates and breakdown
+   - Itinerary Agent → day-by-day schedule
+   - Recommendation Agent → restaurants and activities (with content filtering!)
+
+3. **Synthesize Complete Plan** - From the findings in the request, create 4 COMPLETE sections
+
+**CRITICAL OUTPUT FORMAT - YOU MUST USE THESE EXACT MARKERS:**
+
+Your final response MUST use these EXACT section markers:
+
+```
+=== SECTION START: PLACES TO STAY ===
+[Your content here]
+=== SECTION END: PLACES TO STAY ===
+
+=== SECTION START: ACTIVITIES ===
+[Your content here]
+=== SECTION END: ACTIVITIES ===
+
+=== SECTION START: TRANSPORTATION ===
+[Your content here]
+=== SECTION END: TRANSPORTATION ===
+
+=== SECTION START: ITINERARY ===
+[Your content here]
+=== SECTION END: ITINERARY ===
+```
+
+⚠️ EACH SECTION MUST HAVE THE START AND END MARKERS!
+⚠️ DO NOT SKIP ANY SECTIONS!
+
+**CRITICAL: Each section MUST have substantial content. Do NOT leave sections empty!**
+
+{_GUIDES_TEXT}
+
+**Final Output Format (MUST include ALL sections with content):**
+
+YOU MUST FOLLOW THIS EXACT FORMAT:
+
+```markdown
+{_FORMATS_TEXT}
 ```
 
 **MANDATORY REQUIREMENTS - YOU WILL BE PENALIZED FOR NOT FOLLOWING THESE:**
 
-1. You MUST call ALL agents in sequence: Research → Budget → Itinerary → Recommendation
-2. You MUST wait for each agent to finish and collect their output
+1. You MUST use the findings of EVERY agent in the request (Research, Budget, Itinerary and Recommendation
+   when all ran); if Budget or Itinerary findings are missing, work out the costs and day-by-day schedule yourself
+2. You MUST NOT drop details the agents provided (names, prices, times)
 3. You MUST create ALL 4 sections with at least 200 words each
 4. You MUST use the exact format shown above with # headers and emojis
 5. You MUST separate sections with --- 
@@ -277,8 +281,8 @@ FORMAT:
 
 ⚠️ If ANY answer is NO, GO BACK AND FIX IT NOW! Do NOT submit an incomplete plan!
 
-Start by calling the Research Agent to gather destination information.
+Start by reading the specialist findings provided with the request.
 """,
-        functions=[]  # Supervisor will call other agents via Swarm
+        functions=[]  # Specialist agents run before the supervisor (see src/planner.py)
     )
 
@@ -1,12 +1,44 @@
 """Data models for travel planner"""
 
-from pydantic import BaseModel, Field, validator
-from typing import List, Tuple, Literal, Optional
-from datetime import date
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, validator
+from typing import Any, Dict, List, Tuple, Literal, Optional, Sequence
+from datetime import date, timedelta
+from functools import cached_property
+
+from src.plan_ir import PlanIR, parse_plan
+from src.utils.gazetteer import City, canonical_destination
+
+
+class TripLeg(BaseModel):
+    """One destination of a multi-city trip"""
+    
+    model_config = ConfigDict(frozen=True)
+    
+    destination: str = Field(..., min_length=2, description="Destination")
+    start_date: date = Field(..., description="Arrival date")
+    end_date: date = Field(..., description="Last day before moving on")
+    
+    @validator("destination")
+    def canonicalize_destination(cls, v):
+        """Known cities get their canonical name, so legs share per-destination caches"""
+        return canonical_destination(v)[0]
+    
+    @validator("end_date")
+    def end_after_start(cls, v, values):
+        """Validate end date is not before start date"""
+        if "start_date" in values and v < values["start_date"]:
+            raise ValueError("Leg end date must not be before its start date")
+        return v
+    
+    @property
+    def duration_days(self) -> int:
+        return (self.end_date - self.start_date).days + 1
 
 
 class UserInput(BaseModel):
-    """User input with validation"""
+    """User input with validation (immutable, so keys derived from it stay valid)"""
+    
+    model_config = ConfigDict(frozen=True)
     
     destination: str = Field(..., min_length=2, description="Destination")
     start_date: date = Field(..., description="Trip start date")
@@ -19,7 +51,16 @@ class UserInput(BaseModel):
         ..., 
         description="Content filtering mode"
     )
+    legs: List[TripLeg] = Field(
+        default=[],
+        description="Destinations in visiting order for a multi-city trip (empty for one destination)"
+    )
     
+    @validator("destination")
+    def canonicalize_destination(cls, v):
+        """Known cities get their canonical name, so every spelling shares cache keys"""
+        return canonical_destination(v)[0]
+
     @validator("end_date")
     def end_after_start(cls, v, values):
         """Validate end date is after start date"""
@@ -36,22 +77,98 @@ class UserInput(BaseModel):
             raise ValueError("Budget must be positive")
         return v
     
+    @validator("legs")
+    def legs_cover_trip(cls, v, values):
+        """Validate legs follow each other day by day (no overlaps or gaps) and span the trip dates"""
+        if not v:
+            return v
+        for previous, leg in zip(v, v[1:]):
+            if leg.start_date != previous.end_date + timedelta(days=1):
+                raise ValueError(f"{leg.destination} must start the day after {previous.destination} ends")
+        if "start_date" in values and v[0].start_date != values["start_date"]:
+            raise ValueError("The first leg must start on the trip start date")
+        if "end_date" in values and v[-1].end_date != values["end_date"]:
+            raise ValueError("The last leg must end on the trip end date")
+        return v
+    
     @property
     def duration_days(self) -> int:
         """Calculate trip duration in days"""
         return (self.end_date - self.start_date).days + 1
+
+    @cached_property
+    def cache_key(self) -> str:
+        """Stable hash of the request (same trip details -> same key), computed once"""
+        from src.utils.plan_store import key_hash
+
+        data = self.model_dump(mode="json")
+        data["destination"] = data["destination"].strip().lower()
+        if not data["legs"]:
+            del data["legs"]  # Single-destination keys stay as they were before multi-city trips
+        return key_hash(data)
+
+    @property
+    def city(self) -> Optional[City]:
+        """Gazetteer city of the destination (None if it isn't a known city)"""
+        return canonical_destination(self.destination)[1]
+
+    @property
+    def destination_id(self) -> str:
+        """Stable gazetteer ID of the destination (empty if it isn't a known city)"""
+        city = self.city
+        return city.id if city else ""
+
+    @property
+    def coordinates(self) -> Optional[Tuple[float, float]]:
+        """(latitude, longitude) of the destination, if known"""
+        city = self.city
+        return city.coordinates if city else None
+    
+    @property
+    def is_multi_city(self) -> bool:
+        return len(self.legs) > 1
     
-    def to_prompt_context(self) -> str:
-        """Format as context for agents"""
-        return f"""
-Destination: {self.destination}
-Travel Dates: {self.start_date} to {self.end_date} ({self.duration_days} days)
-Budget: ${self.budget_range[0]:,.0f} - ${self.budget_range[1]:,.0f}
-Pace: {self.pace}
-Food Preferences: {', '.join(self.food_preferences) if self.food_preferences else 'No specific preferences'}
-Activities: {', '.join(self.activities) if self.activities else 'Open to all'}
-Content Filter: {self.content_filter} ← CRITICAL: Apply this filter!
-"""
+    def leg_inputs(self) -> List["UserInput"]:
+        """
+        One single-destination request per leg
+        
+        Preferences are shared; the budget is split by each leg's share of
+        the trip's days.
+        """
+        inputs = []
+        for leg in self.legs:
+            share = leg.duration_days / self.duration_days
+            inputs.append(UserInput(
+                **self.model_dump(exclude={"destination", "start_date", "end_date", "budget_range", "legs"}),
+                destination=leg.destination,
+                start_date=leg.start_date,
+                end_date=leg.end_date,
+                budget_range=(round(self.budget_range[0] * share), round(self.budget_range[1] * share)),
+            ))
+        return inputs
+
+    def to_prompt_context(self, fields: Optional[Sequence[str]] = None) -> str:
+        """
+        Format as context for agents
+        
+        Args:
+            fields: Only these lines, by name: "destination", "month", "dates",
+                "budget", "pace", "food_preferences", "activities", "content_filter"
+                (default: all but "month")
+        """
+        lines = {
+            "destination": f"Destination: {self.destination}",
+            "month": f"Travel Month: {self.start_date:%B %Y}",
+            "dates": f"Travel Dates: {self.start_date} to {self.end_date} ({self.duration_days} days)",
+            "budget": f"Budget: ${self.budget_range[0]:,.0f} - ${self.budget_range[1]:,.0f}",
+            "pace": f"Pace: {self.pace}",
+            "food_preferences": f"Food Preferences: {', '.join(self.food_preferences) if self.food_preferences else 'No specific preferences'}",
+            "activities": f"Activities: {', '.join(self.activities) if self.activities else 'Open to all'}",
+            "content_filter": f"Content Filter: {self.content_filter} ← CRITICAL: Apply this filter!",
+        }
+        if fields is None:
+            fields = [name for name in lines if name != "month"]
+        return "\n" + "\n".join(lines[name] for name in fields) + "\n"
 
 
 class TravelPlan(BaseModel):
@@ -61,12 +178,42 @@ class TravelPlan(BaseModel):
     activities: str = Field(..., description="Things to do and attractions")
     transportation: str = Field(..., description="How to get around")
     itinerary: str = Field(..., description="Day-by-day schedule")
+    degradation: List[str] = Field(
+        default_factory=list,
+        description="Degraded-mode steps applied under overload (empty for a full plan)"
+    )
+    
+    # Parsed once on first access; re-parsed only if a section string changes
+    _ir: Optional[PlanIR] = PrivateAttr(default=None)
+    _ir_source: Tuple[str, ...] = PrivateAttr(default=())
+    
+    @classmethod
+    def from_ir(cls, ir: PlanIR) -> "TravelPlan":
+        """Build a plan from its structured representation"""
+        plan = cls(**ir.render_sections())
+        plan._ir = ir
+        plan._ir_source = plan._sections()
+        return plan
+    
+    def _sections(self) -> Tuple[str, ...]:
+        return (self.places_to_stay, self.activities, self.transportation, self.itinerary)
+    
+    @property
+    def ir(self) -> PlanIR:
+        """Structured representation of the plan (parsed lazily)"""
+        sections = self._sections()
+        if self._ir is None or any(a is not b for a, b in zip(sections, self._ir_source)):
+            self._ir = parse_plan(*sections)
+            self._ir_source = sections
+        return self._ir
     
     def to_markdown(self) -> str:
         """Convert to markdown format"""
         sections = []
         
         sections.append("# Your Travel Plan\n")
+        if self.degradation:
+            sections.append(f"> ⚡ Generated in reduced mode under high demand ({', '.join(self.degradation)})\n\n")
         sections.append("## 🏨 Places to Stay\n")
         sections.append(self.places_to_stay)
         sections.append("\n\n---\n\n")
@@ -83,4 +230,50 @@ class TravelPlan(BaseModel):
         sections.append(self.itinerary)
         
         return "".join(sections)
+    
+    def packed(self) -> "PackedPlan":
+        """Compressed copy whose sections are decompressed when read"""
+        return PackedPlan(self)
+
+
+class PackedPlan:
+    """
+    A TravelPlan held interned and compressed (see utils/blob_store)
+    
+    Reads like a TravelPlan: each section is decompressed when it's
+    accessed, so a session keeps only the section on screen as text, and
+    sessions holding the same plan share one compressed copy.
+    """
+    
+    SECTIONS = ("places_to_stay", "activities", "transportation", "itinerary")
+    
+    def __init__(self, plan: TravelPlan):
+        from src.utils.blob_store import get_blob_store
+        
+        store = get_blob_store()
+        self._blobs = {name: store.intern(getattr(plan, name)) for name in self.SECTIONS}
+        self.degradation = list(plan.degradation)
+        self._ir: Optional[PlanIR] = None
+    
+    def __getattr__(self, name: str) -> str:
+        if name in PackedPlan.SECTIONS:
+            return self._blobs[name].text
+        raise AttributeError(name)
+    
+    def unpack(self) -> TravelPlan:
+        """Full TravelPlan"""
+        return TravelPlan(**{name: blob.text for name, blob in self._blobs.items()}, degradation=self.degradation)
+    
+    @property
+    def ir(self) -> PlanIR:
+        """Structured representation of the plan (parsed once, on first access)"""
+        if self._ir is None:
+            self._ir = self.unpack().ir
+        return self._ir
+    
+    def to_markdown(self) -> str:
+        return self.unpack().to_markdown()
+    
+    def model_dump(self) -> Dict[str, Any]:
+        return self.unpack().model_dump()
 
@@ -0,0 +1,490 @@
+"""Structured intermediate representation of a travel plan
+
+Agent output is parsed once into typed records (hotels, attractions,
+transport options, itinerary days and their time slots). Every record
+keeps the markdown it was parsed from, so rendering back to markdown is a
+cheap join and round-trips the agent's formatting exactly.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+
+# A new item starts at a numbered entry, a heading or a bold title line
+_ITEM_START = re.compile(r"^\s*(?:\*\*\s*\d+\.|\d+\.\s|#{1,6}\s|\*\*[^*\n]+\*\*\s*(?:[-–—].*)?$)")
+_DAY_START = re.compile(r"^\s*(?:#{1,6}\s*)?(?:\*\*)?\s*Day\s+(\d+)\b", re.IGNORECASE)
+_BLOCK_START = re.compile(r"^\s*(?:#{1,6}\s*)?(?:\*\*)?\s*(Morning|Afternoon|Evening)\b", re.IGNORECASE)
+_BULLET = re.compile(r"^[-*•]\s")
+
+_NAME_CLEANUP = re.compile(r"^\s*(?:#{1,6}\s*)?(?:\*\*)?\s*(?:\d+\.\s*)?(?:\*\*)?\s*")
+_PRICE = re.compile(r"[$€£¥]\s?(\d[\d,]*(?:\.\d+)?)(?:\s*(?:-|–|to)\s*[$€£¥]?\s?(\d[\d,]*(?:\.\d+)?))?")
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(?:\s*-\s*(\d+(?:\.\d+)?))?\s*(hours?|hrs?|h|minutes?|mins?)\b", re.IGNORECASE)
+_FIELD = re.compile(r"^\s*[-*•]?\s*\*{0,2}([A-Za-z ]+?)\*{0,2}\s*:\s*\*{0,2}\s*(.+)$")
+# "Charles de Gaulle Airport (CDG)", "IATA: CDG", "airport code CDG"
+_IATA = re.compile(r"(\w+)?\W*\(([A-Z]{3})\)|\b(IATA|[Cc]ode)\s*:?\s*([A-Z]{3})\b")
+_AIRPORT_CONTEXT = re.compile(r"\b(?:airports?|a[eé]roport|aeropuerto|aeroporto|flughafen|IATA)\b", re.IGNORECASE)
+_AIRPORT_WORD = re.compile(r"airports?|a[eé]roport|aeropuerto|aeroporto|flughafen", re.IGNORECASE)
+
+# ISO 4217 codes agents put in parentheses ("$12 (USD)"); only an airport's name right
+# before them ("Madrid-Barajas Airport (MAD)") makes them an IATA code
+CURRENCY_CODES = frozenset((
+    "USD EUR GBP JPY CNY AUD CAD CHF INR MXN BRL THB SGD HKD NZD KRW SEK NOK DKK ISK CZK PLN HUF RON "
+    "BGN HRK TRY AED SAR QAR ILS EGP MAD ZAR KES IDR MYR PHP VND TWD ARS CLP COP PEN RUB UAH"
+).split())
+_TIER = re.compile(r"\b(budget|mid[- ]range|luxury)\b", re.IGNORECASE)
+
+SECTION_NAMES = ("places_to_stay", "activities", "transportation", "itinerary")
+
+# Sections with fewer structured items and this little text count as empty
+MIN_SECTION_CHARS = 50
+
+
+@dataclass(slots=True)
+class Note:
+    """Free text between items (intro lines, sub-headings)"""
+
+    raw: str
+
+
+@dataclass(slots=True)
+class Hotel:
+    """An accommodation option"""
+
+    name: str
+    raw: str
+    tier: str = ""
+    price_low: Optional[float] = None
+    price_high: Optional[float] = None
+    location: str = ""
+
+
+@dataclass(slots=True)
+class Attraction:
+    """A recommended activity or attraction"""
+
+    name: str
+    raw: str
+    duration_minutes: Optional[int] = None
+    cost_low: Optional[float] = None
+    cost_high: Optional[float] = None
+    best_time: str = ""
+
+
+@dataclass(slots=True)
+class TransportOption:
+    """A way to get to or around the destination"""
+
+    name: str
+    raw: str
+    airport_code: str = ""
+    cost_low: Optional[float] = None
+
+
+@dataclass(slots=True)
+class DaySlot:
+    """One time block (Morning/Afternoon/Evening) of an itinerary day"""
+
+    block: str
+    raw: str
+
+
+@dataclass(slots=True)
+class ItineraryDay:
+    """A day of the itinerary, split into time-block slots"""
+
+    number: int
+    heading: str
+    slots: List[DaySlot] = field(default_factory=list)
+    intro: Optional[str] = None
+
+    @property
+    def raw(self) -> str:
+        """Markdown for the whole day"""
+        parts = [self.heading]
+        if self.intro is not None:
+            parts.append(self.intro)
+        parts.extend(slot.raw for slot in self.slots)
+        return "\n".join(parts)
+
+    def renumbered(self, number: int) -> "ItineraryDay":
+        """The same day under another day number (heading rewritten)"""
+        match = _DAY_START.match(self.heading)
+        heading = f"{self.heading[:match.start(1)]}{number}{self.heading[match.end(1):]}" if match else self.heading
+        return ItineraryDay(number=number, heading=heading, slots=list(self.slots), intro=self.intro)
+
+
+Record = Union[Note, Hotel, Attraction, TransportOption, ItineraryDay]
+
+
+@dataclass(slots=True)
+class PlanSection:
+    """Ordered blocks of one plan section"""
+
+    name: str
+    blocks: List[Record] = field(default_factory=list)
+    _markdown: Optional[str] = field(default=None, repr=False, compare=False)
+
+    @property
+    def items(self) -> List[Record]:
+        """Structured records (everything except free text)"""
+        return [block for block in self.blocks if not isinstance(block, Note)]
+
+    def replace_blocks(self, blocks: List[Record]):
+        """Replace the section's blocks and invalidate rendered markdown"""
+        self.blocks = blocks
+        self._markdown = None
+
+    def is_empty(self) -> bool:
+        """True if the section has no items and almost no text"""
+        if self.items:
+            return False
+        return len(self.to_markdown().strip()) < MIN_SECTION_CHARS
+
+    def to_markdown(self) -> str:
+        """Render the section (cached until blocks change)"""
+        if self._markdown is None:
+            self._markdown = "\n".join(block.raw for block in self.blocks).strip()
+        return self._markdown
+
+
+@dataclass(slots=True)
+class PlanIR:
+    """Typed representation of all four plan sections"""
+
+    places_to_stay: PlanSection
+    activities: PlanSection
+    transportation: PlanSection
+    itinerary: PlanSection
+
+    @property
+    def hotels(self) -> List[Hotel]:
+        return [block for block in self.places_to_stay.blocks if isinstance(block, Hotel)]
+
+    @property
+    def attractions(self) -> List[Attraction]:
+        return [block for block in self.activities.blocks if isinstance(block, Attraction)]
+
+    @property
+    def transport_options(self) -> List[TransportOption]:
+        return [block for block in self.transportation.blocks if isinstance(block, TransportOption)]
+
+    @property
+    def days(self) -> List[ItineraryDay]:
+        return [block for block in self.itinerary.blocks if isinstance(block, ItineraryDay)]
+
+    def copy(self) -> "PlanIR":
+        """Copy with independent section block lists (records are shared)"""
+        return PlanIR(*(PlanSection(section.name, list(section.blocks)) for section in self.sections()))
+
+    def sections(self) -> Iterator[PlanSection]:
+        """Iterate sections in display order"""
+        for name in SECTION_NAMES:
+            yield getattr(self, name)
+
+    def empty_sections(self) -> List[str]:
+        """Names of sections with no usable content"""
+        return [section.name for section in self.sections() if section.is_empty()]
+
+    def airport_codes(self) -> List[str]:
+        """Distinct IATA codes mentioned in the transportation section (options and notes)"""
+        codes = []
+        under_airports = False
+        for block in self.transportation.blocks:
+            if isinstance(block, Note) and block.raw.strip():
+                # Headings and intro lines set the topic of the bullets after them
+                under_airports = bool(_AIRPORT_CONTEXT.search(block.raw))
+            for code in _airport_codes(block.raw, under_airports):
+                if code not in codes:
+                    codes.append(code)
+        return codes
+
+    def dedupe_attractions(self) -> int:
+        """
+        Drop attractions already listed under the same or a similar name (in place)
+
+        Returns:
+            Number of attractions removed
+        """
+        from src.utils.entity_dedupe import EntityIndex
+
+        seen = EntityIndex()
+        kept = []
+        removed = 0
+        for block in self.activities.blocks:
+            if isinstance(block, Attraction) and block.name.strip():
+                if seen.seen(block.name):
+                    removed += 1
+                    continue
+            kept.append(block)
+
+        if removed:
+            self.activities.replace_blocks(kept)
+        return removed
+
+    def hotels_over_budget(self, max_budget: float, nights: int) -> List[Hotel]:
+        """
+        Hotels whose cheapest nightly rate alone exceeds the trip budget
+
+        Args:
+            max_budget: Upper end of the user's budget
+            nights: Number of nights
+
+        Returns:
+            Hotels that cannot fit the budget
+        """
+        return [
+            hotel for hotel in self.hotels
+            if hotel.price_low is not None and hotel.price_low * max(nights, 1) > max_budget
+        ]
+
+    def render_sections(self) -> Dict[str, str]:
+        """Render every section to markdown, keyed by TravelPlan field name"""
+        return {section.name: section.to_markdown() for section in self.sections()}
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation for name comparison"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    ascii_name = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", ascii_name.lower()).split())
+
+
+def split_items(text: str) -> List[str]:
+    """
+    Split section markdown into items (numbered entries, headings, bold titles)
+
+    Args:
+        text: Section markdown
+
+    Returns:
+        Item blocks; text before the first item is its own block
+    """
+    items = []
+    current = []
+    for line in text.split("\n"):
+        if current and _ITEM_START.match(line):
+            items.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        items.append("\n".join(current))
+    return items
+
+
+def item_title(block: str) -> str:
+    """Extract the display name from an item's first line"""
+    first_line = block.strip().split("\n", 1)[0]
+    name = _NAME_CLEANUP.sub("", first_line)
+    name = re.split(r"\*\*|\s[-–—]\s", name, maxsplit=1)[0]
+    return name.strip(" *:#")
+
+
+def _fields(block: str) -> dict:
+    """Collect "Key: value" lines of an item (lowercased keys)"""
+    values = {}
+    for line in block.split("\n")[1:]:
+        match = _FIELD.match(line)
+        if match:
+            values.setdefault(match.group(1).strip().lower(), match.group(2).strip())
+    return values
+
+
+def _price(text: str) -> Tuple[Optional[float], Optional[float]]:
+    """First price or price range in text"""
+    match = _PRICE.search(text)
+    if not match:
+        return None, None
+    low = float(match.group(1).replace(",", ""))
+    high = float(match.group(2).replace(",", "")) if match.group(2) else low
+    return low, high
+
+
+def _duration_minutes(text: str) -> Optional[int]:
+    """Lower bound of a duration such as "2-3 hours" or "45 min" """
+    match = _DURATION.search(text)
+    if not match:
+        return None
+    value = float(match.group(1))
+    return int(value if match.group(3).lower().startswith("m") else value * 60)
+
+
+def _is_item(block: str) -> bool:
+    return bool(block.strip()) and bool(_ITEM_START.match(block)) and not block.lstrip().startswith("#")
+
+
+def _parse_hotels(text: str) -> PlanSection:
+    section = PlanSection("places_to_stay")
+    for block in split_items(text):
+        if not _is_item(block):
+            section.blocks.append(Note(block))
+            continue
+        values = _fields(block)
+        low, high = _price(values.get("price", block))
+        tier = _TIER.search(block.split("\n", 1)[0])
+        section.blocks.append(Hotel(
+            name=item_title(block),
+            raw=block,
+            tier=tier.group(1).lower() if tier else "",
+            price_low=low,
+            price_high=high,
+            location=values.get("location", ""),
+        ))
+    return section
+
+
+def _parse_attractions(text: str) -> PlanSection:
+    section = PlanSection("activities")
+    for block in split_items(text):
+        if not _is_item(block):
+            section.blocks.append(Note(block))
+            continue
+        values = _fields(block)
+        low, high = _price(values.get("cost", ""))
+        section.blocks.append(Attraction(
+            name=item_title(block),
+            raw=block,
+            duration_minutes=_duration_minutes(values.get("duration", "")),
+            cost_low=low,
+            cost_high=high,
+            best_time=values.get("best time", ""),
+        ))
+    return section
+
+
+def _airport_codes(text: str, under_airports: bool = False) -> List[str]:
+    """
+    IATA codes in text, in order
+
+    A code counts only on a line about airports (or under a heading about
+    them), so "(USD)" next to a price isn't taken for one. Currency codes
+    also need the airport named right before them; "IATA: XXX" always counts.
+
+    Args:
+        text: Markdown lines
+        under_airports: Text is listed under an airports heading
+    """
+    codes = []
+    for line in text.split("\n"):
+        if not under_airports and not _AIRPORT_CONTEXT.search(line):
+            continue
+        for match in _IATA.finditer(line):
+            word, code = (match.group(1), match.group(2)) if match.group(2) else (match.group(3), match.group(4))
+            if code in CURRENCY_CODES and word != "IATA" and not (word and _AIRPORT_WORD.fullmatch(word)):
+                continue
+            codes.append(code)
+    return codes
+
+
+def _parse_transport(text: str) -> PlanSection:
+    section = PlanSection("transportation")
+    blocks = []
+    for line in text.split("\n"):
+        # Indented lines belong to the preceding bullet
+        if blocks and line[:1] in (" ", "\t") and line.strip():
+            blocks[-1].append(line)
+        else:
+            blocks.append([line])
+
+    for lines in blocks:
+        raw = "\n".join(lines)
+        if not _BULLET.match(lines[0]):
+            section.blocks.append(Note(raw))
+            continue
+        codes = _airport_codes(lines[0])
+        name = re.split(r":|\s[-–—]\s", _BULLET.sub("", lines[0]), maxsplit=1)[0]
+        section.blocks.append(TransportOption(
+            name=name.strip(" *"),
+            raw=raw,
+            airport_code=codes[0] if codes else "",
+            cost_low=_price(raw)[0],
+        ))
+    return section
+
+
+def _parse_itinerary(text: str) -> PlanSection:
+    section = PlanSection("itinerary")
+    preamble: List[str] = []
+    day: Optional[ItineraryDay] = None
+    slot_lines: List[str] = []
+    intro_lines: List[str] = []
+
+    def close_slot():
+        if day is not None and slot_lines:
+            day.slots.append(DaySlot(block=_BLOCK_START.match(slot_lines[0]).group(1).title(),
+                                     raw="\n".join(slot_lines)))
+
+    def close_day():
+        if day is not None:
+            close_slot()
+            day.intro = "\n".join(intro_lines) if intro_lines else None
+            section.blocks.append(day)
+
+    for line in text.split("\n"):
+        day_match = _DAY_START.match(line)
+        if day_match:
+            if day is None and preamble:
+                section.blocks.append(Note("\n".join(preamble)))
+            close_day()
+            day = ItineraryDay(number=int(day_match.group(1)), heading=line)
+            slot_lines, intro_lines = [], []
+        elif day is None:
+            preamble.append(line)
+        elif _BLOCK_START.match(line):
+            close_slot()
+            slot_lines = [line]
+        elif slot_lines:
+            slot_lines.append(line)
+        else:
+            intro_lines.append(line)
+
+    if day is None:
+        if preamble:
+            section.blocks.append(Note("\n".join(preamble)))
+    else:
+        close_day()
+    return section
+
+
+_SECTION_PARSERS = {
+    "places_to_stay": _parse_hotels,
+    "activities": _parse_attractions,
+    "transportation": _parse_transport,
+    "itinerary": _parse_itinerary,
+}
+
+
+def parse_section(name: str, text: str) -> PlanSection:
+    """
+    Parse a single section's markdown
+
+    Args:
+        name: TravelPlan field name
+        text: Section markdown
+
+    Returns:
+        PlanSection with typed records
+    """
+    return _SECTION_PARSERS[name](text)
+
+
+def parse_plan(places_to_stay: str, activities: str, transportation: str, itinerary: str) -> PlanIR:
+    """
+    Parse the four section markdown strings into a PlanIR
+
+    Args:
+        places_to_stay: Places to Stay markdown
+        activities: Activities markdown
+        transportation: Transportation markdown
+        itinerary: Day-by-day itinerary markdown
+
+    Returns:
+        PlanIR with typed records for every section
+    """
+    return PlanIR(
+        places_to_stay=_parse_hotels(places_to_stay),
+        activities=_parse_attractions(activities),
+        transportation=_parse_transport(transportation),
+        itinerary=_parse_itinerary(itinerary),
+    )
@@ -0,0 +1,1376 @@
+"""Planning pipeline - runs the agents and post-processes their output
+
+This module has no Streamlit dependency so plans can be generated from
+background workers, batch jobs and benchmarks as well as from the UI.
+"""
+
+import hashlib
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from src.models import PackedPlan, TravelPlan, UserInput
+from src.plan_ir import Attraction, Hotel, ItineraryDay, Note, Record, parse_section
+from src.utils.cache import search_cache
+from src.utils.call_scheduler import PRIORITY_BY_SOURCE, get_call_scheduler, scheduling
+from src.utils.config import Config
+from src.utils.jobs import register_handler
+from src.utils.plan_store import get_plan_store, input_key
+from src.utils.postprocess import postprocess
+from src.utils.history_compaction import compact_history
+from src.utils.output_sizing import output_sizer
+from src.utils.resilience import ResilientClient, call_label, output_limit, track_calls
+from src.utils.speculation import join_speculative_research
+from src.utils.context_pruning import estimate_tokens, prune_context
+from src.utils.degradation import MAX_DAY_DIFFERENCE, get_overload_monitor
+from src.utils.multi_city import merge_leg_plans, plan_transfers
+from src.utils.variants import variant_inputs
+from src.utils.validation import ADD_RULES, MAX_ACTIVITIES, PlanDefect, build_correction_request, validate_plan
+from src.utils.content_filter import (
+    ITEM_SECTIONS,
+    FlaggedItem,
+    build_regeneration_request,
+    filter_text,
+)
+
+
+SECTION_TITLES = {
+    'places_to_stay': "Places to Stay",
+    'activities': "Activities",
+    'transportation': "Transportation",
+    'itinerary': "Itinerary"
+}
+
+# Pattern: === SECTION START: NAME === content === SECTION END: NAME ===
+SECTION_PATTERNS = {
+    'places_to_stay': re.compile(r'===\s*SECTION START:\s*PLACES TO STAY\s*===\s*(.+?)\s*===\s*SECTION END:\s*PLACES TO STAY\s*===', re.DOTALL | re.IGNORECASE),
+    'activities': re.compile(r'===\s*SECTION START:\s*ACTIVITIES\s*===\s*(.+?)\s*===\s*SECTION END:\s*ACTIVITIES\s*===', re.DOTALL | re.IGNORECASE),
+    'transportation': re.compile(r'===\s*SECTION START:\s*TRANSPORTATION\s*===\s*(.+?)\s*===\s*SECTION END:\s*TRANSPORTATION\s*===', re.DOTALL | re.IGNORECASE),
+    'itinerary': re.compile(r'===\s*SECTION START:\s*ITINERARY\s*===\s*(.+?)\s*===\s*SECTION END:\s*ITINERARY\s*===', re.DOTALL | re.IGNORECASE)
+}
+
+# Specialist agents run before the supervisor writes the final plan. Research
+# goes first; the others only need its findings and run concurrently.
+SPECIALIST_STAGES = ("research", "budget", "itinerary", "recommendation")
+
+STAGE_TASKS = {
+    "research": "Research the destination for the trip below.",
+    "budget": "Estimate the costs of the trip below and break them down by category.",
+    "itinerary": "Create the day-by-day schedule for ALL days of the trip below.",
+    "recommendation": "Recommend restaurants, activities and experiences for the trip below.",
+}
+
+# Trip details each stage's prompt may see: only what its cache key holds (see
+# stage_cache_key), so cached output is never written for someone else's budget or
+# pace. Stages not listed see the whole request.
+STAGE_CONTEXT = {
+    "research": ("destination", "month"),
+    "recommendation": ("destination", "month", "food_preferences", "activities", "content_filter"),
+}
+
+# Itinerary calls schedule_activities before answering
+STAGE_MAX_TURNS = {"itinerary": 4}
+
+# Static head of the supervisor's message: byte-identical across requests so
+# the provider can serve it from its prompt cache
+SUPERVISOR_FORMAT = """
+Create a COMPLETE travel plan. The specialist agents have already run - their findings follow these instructions.
+Create the final plan using ALL the information gathered. The trip details are at the end of this message.
+
+FINAL OUTPUT MUST HAVE EXACTLY 4 SECTIONS WITH THESE EXACT HEADERS:
+
+=== SECTION START: PLACES TO STAY ===
+[Write 3-5 hotel recommendations here with names, prices, locations]
+=== SECTION END: PLACES TO STAY ===
+
+=== SECTION START: ACTIVITIES ===
+[Write 8-12 specific attraction/activity recommendations here - NO day numbers, just a list!]
+Examples: "Eiffel Tower", "Louvre Museum", "Seine River Cruise", etc.
+=== SECTION END: ACTIVITIES ===
+
+=== SECTION START: TRANSPORTATION ===
+[Write complete transportation guide here]
+MUST include: Airport names with codes (e.g., "JFK", "CDG"), how to get from airport to city, local transport options with costs
+=== SECTION END: TRANSPORTATION ===
+
+=== SECTION START: ITINERARY ===
+[Write complete day-by-day schedule for ALL days here]
+Day 1: [morning, afternoon, evening]
+Day 2: [morning, afternoon, evening]
+[etc. for ALL days]
+=== SECTION END: ITINERARY ===
+
+⚠️ CRITICAL: DO NOT SKIP ANY SECTION! Each section MUST have real content!
+⚠️ Use EXACT section markers: "=== SECTION START: [NAME] ===" and "=== SECTION END: [NAME] ==="
+"""
+
+# Plan variants skip the itinerary agent (see create_plan_variants)
+VARIANT_NOTE = (
+    "The Itinerary agent didn't run for this plan: write the day-by-day itinerary for the pace above yourself, "
+    "within the Budget agent's cost estimate"
+)
+
+# Writer output sometimes repeats what the supervisor format asked for
+_WRITER_NOISE = re.compile(r"^\s*(?:===\s*SECTION (?:START|END):.*===|.*TRANSFER_TO_SUPERVISOR.*)\s*$\n?", re.MULTILINE | re.IGNORECASE)
+_LEADING_HEADING = re.compile(r"^\s*(?:```(?:markdown)?\s*\n)?#{1,2}\s[^\n]*\n")
+
+# Progress callback: (fraction complete 0-1, status message)
+ProgressCallback = Callable[[float, str], None]
+
+PARSE_FAILED = "⚠️ Parsing failed - no sections found! Using fallback."
+
+
+def is_complete(result: Dict[str, Any]) -> bool:
+    """
+    Whether a plan is worth saving and serving again for the same request
+
+    A plan with empty sections, defects validation couldn't fix, or the
+    parse-error fallback is a bad generation: the next request should get a
+    new plan rather than the same one for PLAN_CACHE_WARM_AGE.
+
+    Args:
+        result: PlanResult.to_dict() data (or a stored plan's result and metrics)
+    """
+    return not (
+        result.get("empty_sections")
+        or result.get("metrics", {}).get("defects_remaining")
+        or any(line.endswith(PARSE_FAILED) for line in result.get("parse_log", []))
+    )
+
+
+@dataclass
+class PlanResult:
+    """Outcome of one planning run"""
+
+    plan: Union[TravelPlan, PackedPlan]  # PackedPlan once it's on a session's screen
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    parse_log: List[str] = field(default_factory=list)
+    flagged: List[FlaggedItem] = field(default_factory=list)
+    empty_sections: List[str] = field(default_factory=list)
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    plan_id: str = ""  # ID in the plan store ("" if not persisted)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to JSON-compatible data (for job stores)"""
+        return {
+            "plan": self.plan.model_dump(),
+            "messages": self.messages,
+            "parse_log": self.parse_log,
+            "flagged": [asdict(item) for item in self.flagged],
+            "empty_sections": self.empty_sections,
+            "metrics": self.metrics,
+            "plan_id": self.plan_id,
+        }
+
+    @property
+    def complete(self) -> bool:
+        """Worth saving and serving again (see is_complete)"""
+        return is_complete({"empty_sections": self.empty_sections, "metrics": self.metrics, "parse_log": self.parse_log})
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlanResult":
+        """Rebuild a result serialized with to_dict"""
+        return cls(
+            plan=TravelPlan(**data["plan"]),
+            messages=data.get("messages", []),
+            parse_log=data.get("parse_log", []),
+            flagged=[
+                FlaggedItem(**{**item, "terms": tuple(item["terms"])})
+                for item in data.get("flagged", [])
+            ],
+            empty_sections=data.get("empty_sections", []),
+            metrics=data.get("metrics", {}),
+            plan_id=data.get("plan_id", ""),
+        )
+
+
+@dataclass
+class PlanVariants:
+    """Plans for the same trip along one dimension (budget tier or pace)"""
+
+    dimension: str
+    variants: Dict[str, PlanResult] = field(default_factory=dict)  # Label to result, in display order
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to JSON-compatible data (for job stores)"""
+        return {
+            "dimension": self.dimension,
+            "variants": [[label, result.to_dict()] for label, result in self.variants.items()],
+            "metrics": self.metrics,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlanVariants":
+        """Rebuild variants serialized with to_dict"""
+        return cls(
+            dimension=data["dimension"],
+            variants={label: PlanResult.from_dict(result) for label, result in data["variants"]},
+            metrics=data.get("metrics", {}),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_swarm_client():
+    """
+    Create the Swarm client once per process
+
+    swarm (and the OpenAI SDK it pulls in) is imported here rather than at
+    module level, so importing the UI doesn't pay for it. Every completion
+    goes through ResilientClient (timeouts, retries, hedging, history
+    compaction between the turns of multi-turn agents) and waits for the
+    process-wide call scheduler.
+    """
+    from openai import OpenAI
+    from swarm import Swarm
+
+    # Retries are handled by ResilientClient, not the SDK
+    openai_client = OpenAI(base_url=Config.OPENAI_BASE_URL or None, max_retries=0)
+    compactor = compact_history if Config.COMPACT_HISTORY else None
+    return Swarm(client=ResilientClient(openai_client, compactor=compactor, scheduler=get_call_scheduler()))
+
+
+@lru_cache(maxsize=1)
+def get_agents() -> Dict[str, Any]:
+    """
+    Build all agent definitions once per process
+
+    Returns:
+        Dict of agent name to Swarm Agent ("section_writers" maps section name to writer)
+    """
+    from src.agents import (
+        create_supervisor_agent,
+        create_research_agent,
+        create_budget_agent,
+        create_itinerary_agent,
+        create_recommendation_agent,
+        create_section_writer_agent
+    )
+
+    return {
+        "supervisor": create_supervisor_agent(),
+        "research": create_research_agent(),
+        "budget": create_budget_agent(),
+        "itinerary": create_itinerary_agent(),
+        "recommendation": create_recommendation_agent(),
+        "section_writers": {name: create_section_writer_agent(name) for name in SECTION_TITLES}
+    }
+
+
+def build_stage_message(stage: str, user_input: UserInput, research: str = "") -> str:
+    """
+    Build a specialist agent's user message
+
+    Ordered from most to least shared (task, research for the destination,
+    then this trip) so requests share the longest possible prompt prefix.
+    Research and recommendation only get the trip details in STAGE_CONTEXT.
+
+    Args:
+        stage: Specialist stage name
+        user_input: UserInput model
+        research: Research Agent output (for stages after research)
+
+    Returns:
+        Message content
+    """
+    parts = [STAGE_TASKS[stage]]
+    if research:
+        parts.append(f"Research Agent findings:\n{research}")
+    parts.append(f"TRIP:\n{user_input.to_prompt_context(STAGE_CONTEXT.get(stage))}")
+    return "\n\n".join(parts)
+
+
+def stage_cache_key(stage: str, user_input: UserInput, research: str = "") -> Dict[str, Any]:
+    """
+    Cache key for a specialist stage's output
+
+    Research only depends on where and which month, and recommendations
+    only on that research and the traveller's tastes (their prompts carry
+    nothing else, see STAGE_CONTEXT), so both are shared across many
+    requests (and can be pre-computed by the warm-up job). Budget and
+    itinerary depend on the whole request.
+    """
+    destination = user_input.destination.strip().lower()
+    month = user_input.start_date.strftime("%Y-%m")
+    if stage == "research":
+        return {"stage": stage, "destination": destination, "month": month}
+
+    research_hash = hashlib.blake2b(research.encode("utf-8"), digest_size=16).hexdigest()
+    if stage == "recommendation":
+        return {
+            "stage": stage,
+            "destination": destination,
+            "month": month,
+            "content_filter": user_input.content_filter,
+            "food_preferences": sorted(user_input.food_preferences),
+            "activities": sorted(user_input.activities),
+            "research": research_hash,
+        }
+    return {"stage": stage, "input": user_input.model_dump(mode="json"), "research": research_hash}
+
+
+def plan_cache_key(user_input: UserInput) -> str:
+    """Cache key for a complete plan (precomputed on the request, not re-serialized per lookup)"""
+    return f"plan:{input_key(user_input)}"
+
+
+def cached_stage(key: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Stage output from the in-memory cache, falling back to the plan store
+
+    Returns:
+        Cached stage messages, or None on a miss
+    """
+    if not Config.ENABLE_CACHE:
+        return None
+    messages = search_cache.get(key)
+    if messages is None:
+        store = get_plan_store()
+        messages = store.get_cached(key, Config.STAGE_CACHE_TTL) if store else None
+        if messages is not None:
+            search_cache.set(key, messages)
+    return messages
+
+
+def cache_stage(key: Dict[str, Any], messages: List[Dict[str, Any]]):
+    """Cache stage output in memory and in the plan store"""
+    if not Config.ENABLE_CACHE:
+        return
+    search_cache.set(key, messages)
+    store = get_plan_store()
+    if store is not None:
+        store.put_cached(key, key["stage"], messages)
+
+
+def cached_plan(user_input: UserInput) -> Optional[Dict[str, Any]]:
+    """
+    A recent plan for exactly this request, from memory or the plan store
+
+    Returns:
+        PlanResult.to_dict() data, or None on a miss
+    """
+    if not Config.ENABLE_CACHE:
+        return None
+    key = plan_cache_key(user_input)
+    data = search_cache.get(key)
+    if data is None:
+        store = get_plan_store()
+        stored = store.find_latest(user_input, Config.PLAN_CACHE_WARM_AGE) if store else None
+        if stored is not None and not stored.metrics.get("degradation"):
+            data = {**stored.result, "metrics": stored.metrics, "plan_id": stored.id}
+            if not is_complete(data):
+                return None  # Saved before incomplete plans were skipped
+            search_cache.set(key, data)
+    return data
+
+
+def similar_plan(user_input: UserInput) -> Optional[PlanResult]:
+    """
+    A saved plan for a similar trip, served when overloaded
+
+    Same destination and content filter, trip length within
+    MAX_DAY_DIFFERENCE days; the closest length, then the same pace, then
+    the newest wins. Plans that were degraded themselves or are incomplete
+    are skipped.
+
+    Returns:
+        PlanResult, or None if there is no similar plan
+    """
+    store = get_plan_store()
+    if store is None:
+        return None
+    candidates = [
+        summary
+        for summary in store.search(destination=user_input.destination, content_filter=user_input.content_filter,
+                                    source=None, limit=50)
+        if abs(summary.duration_days - user_input.duration_days) <= MAX_DAY_DIFFERENCE
+    ]
+    candidates.sort(key=lambda summary: (
+        abs(summary.duration_days - user_input.duration_days), summary.pace != user_input.pace, -summary.created_at
+    ))
+    for summary in candidates:
+        stored = store.get(summary.id)
+        if stored is None or stored.metrics.get("degradation"):
+            continue
+        data = {**stored.result, "metrics": stored.metrics, "plan_id": stored.id}
+        if is_complete(data):
+            return PlanResult.from_dict(data)
+    return None
+
+
+def cache_status(user_input: UserInput) -> Dict[str, bool]:
+    """
+    Which cached entries a request would hit right now
+
+    Returns:
+        Dict of "plan", "research" and "recommendation" to hit/miss
+    """
+    research = cached_stage(stage_cache_key("research", user_input))
+    recommendation = None
+    if research is not None:
+        recommendation = cached_stage(stage_cache_key("recommendation", user_input, research[-1]["content"]))
+    return {
+        "plan": cached_plan(user_input) is not None,
+        "research": research is not None,
+        "recommendation": recommendation is not None,
+    }
+
+
+def warm_plan_cache(limit: Optional[int] = None) -> int:
+    """
+    Load recently generated plans from the plan store into the plan cache
+
+    Args:
+        limit: Maximum number of plans (default: Config.PLAN_CACHE_WARM_LIMIT)
+
+    Returns:
+        Number of plans loaded
+    """
+    store = get_plan_store()
+    if store is None or not Config.ENABLE_CACHE:
+        return 0
+
+    loaded = 0
+    # Oldest first, so the newest plan for a request wins
+    for stored in reversed(store.recent(limit or Config.PLAN_CACHE_WARM_LIMIT, Config.PLAN_CACHE_WARM_AGE)):
+        if stored.metrics.get("degradation"):
+            continue  # Generated under overload; a later request gets a full plan
+        data = {**stored.result, "metrics": stored.metrics, "plan_id": stored.id}
+        if not is_complete(data):
+            continue
+        search_cache.set(plan_cache_key(stored.user_input), data)
+        loaded += 1
+    return loaded
+
+
+@lru_cache(maxsize=1)
+def _warm_plan_cache_once() -> int:
+    return warm_plan_cache()
+
+
+@lru_cache(maxsize=1)
+def _load_output_history_once() -> int:
+    store = get_plan_store()
+    return output_sizer.load_history(store) if store is not None else 0
+
+
+def stage_max_tokens(kind: str, user_input: UserInput) -> Optional[int]:
+    """max_tokens for an LLM call of this kind (None when adaptive sizing is off)"""
+    if not Config.ADAPTIVE_MAX_TOKENS:
+        return None
+    _load_output_history_once()
+    return output_sizer.max_tokens(kind, user_input)
+
+
+def format_findings(stage_outputs: Dict[str, str]) -> str:
+    """Specialist outputs in full, one block per agent"""
+    return "\n\n".join(
+        f"--- {stage.upper()} AGENT ---\n{stage_outputs[stage]}"
+        for stage in SPECIALIST_STAGES
+        if stage_outputs.get(stage)
+    )
+
+
+def build_context_message(user_input: UserInput, findings: str, note: str = "") -> str:
+    """
+    Build the supervisor's user message
+
+    The instructions and output format come first and never change, so
+    they form a prefix the provider can cache; findings and the trip
+    details come last.
+
+    Args:
+        user_input: UserInput model
+        findings: Specialist findings (format_findings or a pruned context)
+        note: Extra instruction after the trip details (e.g. VARIANT_NOTE)
+
+    Returns:
+        Message content
+    """
+    message = f"""{SUPERVISOR_FORMAT}
+SPECIALIST FINDINGS:
+
+{findings}
+
+TRIP:
+{user_input.to_prompt_context()}
+⚠️ Apply {user_input.content_filter} filter
+⚠️ Budget: ${user_input.budget_range[0]:,.0f}-${user_input.budget_range[1]:,.0f}
+"""
+    return f"{message}⚠️ {note}\n" if note else message
+
+
+def build_section_message(user_input: UserInput, section: str, findings: str) -> str:
+    """
+    Build a section writer's user message
+
+    Static per section up to the findings; trip details come last.
+
+    Args:
+        user_input: UserInput model
+        section: TravelPlan field name
+        findings: Specialist findings relevant to the section
+
+    Returns:
+        Message content
+    """
+    extra = ""
+    if section == "itinerary":
+        extra = f"\n⚠️ Include ALL {user_input.duration_days} days (Day 1 to Day {user_input.duration_days})"
+    return f"""
+Write the {SECTION_TITLES[section].upper()} section of the travel plan for the trip at the end of this message.
+
+SPECIALIST FINDINGS:
+
+{findings or "(none - use your own knowledge of the destination)"}
+
+TRIP:
+{user_input.to_prompt_context()}
+⚠️ Apply {user_input.content_filter} filter
+⚠️ Budget: ${user_input.budget_range[0]:,.0f}-${user_input.budget_range[1]:,.0f}{extra}
+"""
+
+
+def clean_section_text(text: str) -> str:
+    """Strip markers, hand-off lines and a leading section heading from writer output"""
+    text = _WRITER_NOISE.sub("", text or "")
+    text = _LEADING_HEADING.sub("", text, count=1)
+    if text.rstrip().endswith("```"):
+        text = text.rstrip()[:-3]
+    return text.strip()
+
+
+def write_sections(client, writers: Dict[str, Any], user_input: UserInput, findings: Dict[str, str],
+                   report: ProgressCallback) -> Tuple[Dict[str, str], List[Dict[str, Any]], List[str]]:
+    """
+    Write the four plan sections with concurrent section-writer calls
+
+    Args:
+        client: Swarm client
+        writers: Section name to writer agent
+        user_input: UserInput model
+        findings: Section name to the specialist findings it needs
+        report: Progress callback (called from this thread only)
+
+    Returns:
+        (section name to text, writer messages in section order, prompts sent)
+    """
+    prompts = {name: build_section_message(user_input, name, findings.get(name, "")) for name in SECTION_TITLES}
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+        futures = {
+            executor.submit(copy_context().run, run_stage, client, writers[name], f"writer:{name}", prompt,
+                            max_tokens=stage_max_tokens(f"writer:{name}", user_input)): name
+            for name, prompt in prompts.items()
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            name = futures[future]
+            results[name] = future.result()
+            report(0.7 + 0.15 * done / len(futures), f"✍️ {SECTION_TITLES[name]} written")
+
+    sections = {name: clean_section_text(results[name][-1]["content"]) for name in SECTION_TITLES}
+    messages = [message for name in SECTION_TITLES for message in results[name]]
+    return sections, messages, list(prompts.values())
+
+
+def parse_plan_sections(plan_text: str, log: Optional[List[str]] = None) -> TravelPlan:
+    """
+    Parse supervisor's output into structured sections
+
+    Args:
+        plan_text: Raw text from supervisor
+        log: Optional list that receives debug notes about the parsing process
+
+    Returns:
+        TravelPlan object with sections
+    """
+    if log is None:
+        log = []
+
+    # Split by section headers
+    sections = {
+        'places_to_stay': '',
+        'activities': '',
+        'transportation': '',
+        'itinerary': ''
+    }
+
+    # Strategy 1: Look for explicit section markers
+    sections_found = []
+    for section_key, pattern in SECTION_PATTERNS.items():
+        match = pattern.search(plan_text)
+        if match:
+            sections[section_key] = match.group(1).strip()
+            sections_found.append(section_key)
+            log.append(f"✅ Found section: {section_key} ({len(sections[section_key])} characters)")
+        else:
+            log.append(f"❌ Missing section: {section_key}")
+
+    # Fallback: If structured markers not found, try old parsing method
+    if len(sections_found) == 0:
+        log.append("⚠️ Structured markers not found, trying fallback parsing...")
+
+        lines = plan_text.split('\n')
+        current_section = None
+        current_content = []
+
+        for line in lines:
+            line_lower = line.lower()
+
+            # Detect section headers (look for emoji or text)
+            if ('places to stay' in line_lower or '🏨' in line):
+                if current_section and current_content:
+                    sections[current_section] = '\n'.join(current_content).strip()
+                current_section = 'places_to_stay'
+                current_content = []
+            elif ('activities' in line_lower or '🎭' in line) and 'day-by-day' not in line_lower and 'itinerary' not in line_lower:
+                if current_section and current_content:
+                    sections[current_section] = '\n'.join(current_content).strip()
+                current_section = 'activities'
+                current_content = []
+            elif ('transportation' in line_lower or '🚗' in line):
+                if current_section and current_content:
+                    sections[current_section] = '\n'.join(current_content).strip()
+                current_section = 'transportation'
+                current_content = []
+            elif ('itinerary' in line_lower or '📅' in line or 'day-by-day' in line_lower):
+                if current_section and current_content:
+                    sections[current_section] = '\n'.join(current_content).strip()
+                current_section = 'itinerary'
+                current_content = []
+            elif line.strip() == '---':
+                if current_section and current_content:
+                    sections[current_section] = '\n'.join(current_content).strip()
+                    current_content = []
+            elif line.strip().startswith('#'):
+                continue
+            else:
+                if current_section:
+                    current_content.append(line)
+
+        if current_section and current_content:
+            sections[current_section] = '\n'.join(current_content).strip()
+
+    log.append("Final section lengths: " + ", ".join(f"{key}: {len(content)}" for key, content in sections.items()))
+
+    # Fallback: if parsing failed, put everything in itinerary
+    if not any([sections['places_to_stay'], sections['activities'], sections['transportation'], sections['itinerary']]):
+        log.append(PARSE_FAILED)
+        sections['itinerary'] = plan_text
+        sections['places_to_stay'] = "⚠️ Parsing error - check debug output"
+        sections['activities'] = "⚠️ Parsing error - check debug output"
+        sections['transportation'] = "⚠️ Parsing error - check debug output"
+
+    return TravelPlan(**sections)
+
+
+def regenerate_filtered_items(client, agent, plan: TravelPlan, user_input: UserInput,
+                              flagged: List[FlaggedItem]) -> TravelPlan:
+    """
+    Ask the recommendation agent to replace only the items the content filter removed
+
+    Args:
+        client: Swarm client
+        agent: Recommendation agent
+        plan: Filtered TravelPlan
+        user_input: UserInput model
+        flagged: Items removed by the content filter
+
+    Returns:
+        TravelPlan with replacement items appended
+    """
+    updates = {}
+    for section in ITEM_SECTIONS:
+        removed = [item for item in flagged if item.section == section and item.whole_item]
+        if not removed:
+            continue
+
+        request = build_regeneration_request(section, removed, user_input.content_filter)
+        response = client.run(
+            agent=agent,
+            messages=[{"role": "user", "content": f"{request}\n\nTRIP:\n{user_input.to_prompt_context()}"}],
+            max_turns=1
+        )
+        if not response or not response.messages:
+            continue
+
+        # Replacements go through the same filter; anything still offending is dropped
+        replacements = filter_text(response.messages[-1]["content"] or "", user_input.content_filter)
+        if replacements:
+            updates[section] = f"{getattr(plan, section)}\n\n{replacements}"
+
+    return plan.model_copy(update=updates) if updates else plan
+
+
+def _insert_days(blocks: List[Record], days: List[ItineraryDay]) -> List[Record]:
+    """Insert itinerary days in day-number order, keeping notes where they are"""
+    blocks = list(blocks)
+    for day in sorted(days, key=lambda day: day.number):
+        position = next(
+            (index for index, block in enumerate(blocks) if isinstance(block, ItineraryDay) and block.number > day.number),
+            None
+        )
+        if position is None:
+            last_day = max((index for index, block in enumerate(blocks) if isinstance(block, ItineraryDay)), default=len(blocks) - 1)
+            position = last_day + 1
+        blocks.insert(position, day)
+    return blocks
+
+
+def correct_plan(client, writers: Dict[str, Any], plan: TravelPlan, user_input: UserInput,
+                 defects: List[PlanDefect], findings: Dict[str, str]) -> Tuple[TravelPlan, List[Dict[str, Any]]]:
+    """
+    Fix validation defects with small targeted calls instead of a re-run
+
+    Extra activities, days beyond the trip and hotels over budget are
+    trimmed in code. Missing
+    hotels, activities, airport codes and days are requested from the
+    section's writer (only what's missing, concurrently); empty sections
+    are rewritten from their findings.
+
+    Args:
+        client: Swarm client
+        writers: Section name to writer agent
+        plan: Validated TravelPlan
+        user_input: UserInput model
+        defects: validate_plan() output
+        findings: Section name to the specialist findings it needs
+
+    Returns:
+        (corrected TravelPlan, messages of the corrective calls)
+    """
+    ir = plan.ir.copy()
+    for defect in defects:
+        if defect.rule == "too_many_activities":
+            kept, attractions = [], 0
+            for block in ir.activities.blocks:
+                if isinstance(block, Attraction):
+                    attractions += 1
+                    if attractions > MAX_ACTIVITIES:
+                        continue
+                kept.append(block)
+            ir.activities.replace_blocks(kept)
+        elif defect.rule == "hotels_over_budget":
+            ir.places_to_stay.replace_blocks([
+                block for block in ir.places_to_stay.blocks
+                if not (isinstance(block, Hotel) and block.name in defect.names)
+            ])
+        elif defect.rule == "extra_days":
+            ir.itinerary.replace_blocks([
+                block for block in ir.itinerary.blocks
+                if not (isinstance(block, ItineraryDay) and block.number in defect.days)
+            ])
+
+    requests = {}
+    limits = {}
+    for defect in defects:
+        if defect.rule not in ADD_RULES:
+            continue
+        if defect.rule == "empty_section":
+            prompt = build_section_message(user_input, defect.section, findings.get(defect.section, ""))
+            limits[defect] = stage_max_tokens(f"writer:{defect.section}", user_input)
+        else:
+            request = build_correction_request(defect, plan, user_input.destination)
+            prompt = f"{request}\n\nTRIP:\n{user_input.to_prompt_context()}"
+            limits[defect] = stage_max_tokens(f"correct:{defect.section}", user_input)
+        requests[defect] = prompt
+
+    results: Dict[PlanDefect, List[Dict[str, Any]]] = {}
+    if requests:
+        with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+            futures = {
+                executor.submit(copy_context().run, run_stage, client, writers[defect.section],
+                                f"correct:{defect.section}", prompt, max_tokens=limits[defect]): defect
+                for defect, prompt in requests.items()
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+    messages = []
+    for defect, prompt in requests.items():
+        messages.extend(results[defect])
+        text = clean_section_text(results[defect][-1]["content"])
+        if defect.section in ITEM_SECTIONS:
+            text = filter_text(text, user_input.content_filter)
+        if not text:
+            continue
+        section = getattr(ir, defect.section)
+        added = parse_section(defect.section, text)
+        if defect.rule == "empty_section":
+            section.replace_blocks(added.blocks)
+        elif defect.rule == "missing_days":
+            days = [block for block in added.blocks if isinstance(block, ItineraryDay) and block.number in defect.days]
+            section.replace_blocks(_insert_days(section.blocks, days))
+        else:
+            section.replace_blocks(section.blocks + [Note("")] + added.blocks)
+
+    return TravelPlan.from_ir(ir), messages
+
+
+def _simplify_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep only what the debug view needs from Swarm messages"""
+    return [
+        {
+            "role": message.get("role", "unknown"),
+            "sender": message.get("sender", "unknown"),
+            "content": message.get("content") or ""
+        }
+        for message in messages
+    ]
+
+
+def run_stage(client, agent, stage: str, message: str,
+              context_variables: Optional[Dict[str, Any]] = None,
+              max_tokens: Optional[int] = None,
+              model: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Run one agent on its own message
+
+    Args:
+        client: Swarm client
+        agent: Swarm Agent
+        stage: Stage name (LLM calls are labelled with it for latency tracking)
+        message: User message for the agent
+        context_variables: Context passed to the agent's functions
+        max_tokens: Output limit per LLM call (responses cut off at it are continued)
+        model: Model to use instead of the agent's own
+
+    Returns:
+        Simplified messages of the run (the last one is the agent's answer)
+
+    Raises:
+        RuntimeError: If the agent returned no response
+    """
+    with call_label(stage), output_limit(max_tokens):
+        response = client.run(
+            agent=agent,
+            messages=[{"role": "user", "content": message}],
+            context_variables=context_variables or {},
+            model_override=model,
+            max_turns=STAGE_MAX_TURNS.get(stage, 1)
+        )
+    if not response or not response.messages:
+        raise RuntimeError(f"No response received from {stage} agent")
+    return _simplify_messages(response.messages)
+
+
+def run_specialist_stage(client, agents: Dict[str, Any], stage: str, user_input: UserInput,
+                         research: str = "", model: Optional[str] = None) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Run a specialist stage, reusing its output from an earlier attempt if cached
+
+    Outputs are cached as soon as each stage finishes, so when a later stage
+    fails the next attempt (e.g. the user pressing Retry) only redoes the
+    stages that didn't complete. Outputs of a model other than the agent's
+    own (degraded mode) aren't cached, so full-quality runs never reuse them.
+
+    Returns:
+        (messages, True if served from cache)
+    """
+    key = stage_cache_key(stage, user_input, research)
+    cached = cached_stage(key)
+    if cached is not None:
+        return cached, True
+
+    messages = run_stage(
+        client,
+        agents[stage],
+        stage,
+        build_stage_message(stage, user_input, research),
+        context_variables={
+            "start_date": user_input.start_date.isoformat(),
+            "duration_days": user_input.duration_days,
+            "pace": user_input.pace,
+        },
+        max_tokens=stage_max_tokens(stage, user_input),
+        model=model,
+    )
+    if messages[-1]["content"] and model is None:
+        cache_stage(key, messages)
+    return messages, False
+
+
+def create_travel_plan(user_input: UserInput, progress: Optional[ProgressCallback] = None,
+                       source: str = "user", tenant: Optional[str] = None, fresh: bool = False) -> PlanResult:
+    """
+    Execute travel planning with agents - RUNS ONCE to gather all data
+
+    Args:
+        user_input: UserInput model
+        progress: Optional callback receiving (fraction, message) updates
+        source: Who asked for the plan, recorded in the plan store ("user", "warmup");
+            also picks the priority class its LLM calls are scheduled under
+        tenant: Who to share LLM capacity fairly with within the class (default: source)
+        fresh: Generate a new plan even if one for this request is cached or saved
+
+    Returns:
+        PlanResult with the parsed plan and run details
+
+    Raises:
+        RuntimeError: If the agents returned no response
+    """
+    if user_input.is_multi_city:
+        return create_multi_city_plan(user_input, progress, source, tenant, fresh)
+
+    def report(fraction: float, message: str):
+        if progress:
+            progress(fraction, message)
+
+    started = time.perf_counter()
+
+    # Identical requests are served from the plan cache (warmed from history)
+    _warm_plan_cache_once()
+    cached = None if fresh else cached_plan(user_input)
+    if cached is not None:
+        report(1.0, "✅ Done (from cache)")
+        result = PlanResult.from_dict(cached)
+        result.metrics = {**result.metrics, "plan_cache_hit": True}
+        return result
+
+    # Under overload, trade plan quality for latency instead of timing out
+    monitor = get_overload_monitor()
+    load = monitor.snapshot()
+    degradation = monitor.steps(load) if source == "user" else []
+    if "similar_plan" in degradation:
+        similar = similar_plan(user_input)
+        if similar is not None:
+            report(1.0, "✅ Done (similar saved plan)")
+            similar.plan.degradation = ["similar_plan"]
+            similar.metrics = {
+                **similar.metrics, "degradation": ["similar_plan"], "load": load.as_dict(), "similar_to": similar.plan_id
+            }
+            similar.plan_id = ""
+            monitor.record_latency(time.perf_counter() - started)
+            return similar
+        degradation.remove("similar_plan")
+    specialist_model = Config.FAST_MODEL if "fast_model" in degradation else None
+
+    report(0.05, "🔎 Researching your destination...")
+
+    # Swarm client and agents are built once and shared across runs
+    client = get_swarm_client()
+    agents = get_agents()
+
+    stage_messages: Dict[str, List[Dict[str, Any]]] = {}
+    stage_seconds: Dict[str, float] = {}
+    cached_stages: List[str] = []
+
+    priority = PRIORITY_BY_SOURCE.get(source, "batch")
+    with scheduling(priority, tenant or source), track_calls() as call_stats:
+        stage_started = time.perf_counter()
+        # Research may already be running, started from the trip form
+        speculative = join_speculative_research(stage_cache_key("research", user_input), Config.LLM_TIMEOUT)
+        stage_messages["research"], cached = run_specialist_stage(
+            client, agents, "research", user_input, model=specialist_model
+        )
+        stage_seconds["research"] = round(time.perf_counter() - stage_started, 3)
+        if cached:
+            cached_stages.append("research")
+        research = stage_messages["research"][-1]["content"]
+
+        # Budget, itinerary and recommendation only depend on research
+        report(0.25, "🤝 Budget, itinerary and recommendation agents at work...")
+        later_stages = [
+            stage for stage in SPECIALIST_STAGES[1:]
+            if not (stage == "recommendation" and "skip_recommendation" in degradation)
+        ]
+        with ThreadPoolExecutor(max_workers=len(later_stages)) as executor:
+            stage_started = time.perf_counter()
+            futures = {
+                executor.submit(copy_context().run, run_specialist_stage, client, agents, stage, user_input, research,
+                                specialist_model): stage
+                for stage in later_stages
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                stage = futures[future]
+                stage_messages[stage], cached = future.result()
+                stage_seconds[stage] = round(time.perf_counter() - stage_started, 3)
+                if cached:
+                    cached_stages.append(stage)
+                report(0.25 + 0.4 * done / len(later_stages), f"✅ {stage.capitalize()} agent finished")
+
+        # Only what each section needs goes to synthesis
+        report(0.7, "✍️ Writing your plan...")
+        stage_started = time.perf_counter()
+        stage_outputs = {stage: messages[-1]["content"] for stage, messages in stage_messages.items()}
+        full_findings = format_findings(stage_outputs)
+        unpruned_prompt = build_context_message(user_input, full_findings)
+        pruned = prune_context(stage_outputs) if Config.PRUNE_CONTEXT else None
+
+        section_findings = {name: pruned.sections.get(name, "") if pruned else full_findings for name in SECTION_TITLES}
+
+        if Config.SYNTHESIS_MODE == "sections":
+            # Four concurrent writers, assembled straight into TravelPlan fields
+            sections, synthesis_messages, synthesis_prompts = write_sections(
+                client, agents["section_writers"], user_input, section_findings, report
+            )
+            stage_seconds["synthesis"] = round(time.perf_counter() - stage_started, 3)
+            agents_done = time.perf_counter()
+            report(0.85, "🧩 Assembling your plan...")
+            processed = postprocess(sections, user_input.content_filter)
+        else:
+            synthesis_prompt = build_context_message(user_input, pruned.to_prompt()) if pruned else unpruned_prompt
+            synthesis_messages = run_stage(
+                client, agents["supervisor"], "supervisor", synthesis_prompt,
+                max_tokens=stage_max_tokens("supervisor", user_input),
+            )
+            synthesis_prompts = [synthesis_prompt]
+            stage_seconds["supervisor"] = round(time.perf_counter() - stage_started, 3)
+            agents_done = time.perf_counter()
+
+            # Parse, filter, dedupe and validate (in-thread or on the process pool)
+            report(0.85, "🧩 Assembling your plan...")
+            processed = postprocess(synthesis_messages[-1]["content"], user_input.content_filter)
+
+        plan = processed.plan
+        flagged = processed.flagged
+
+        # Only items removed by the content filter are regenerated
+        empty = processed.empty_sections
+        if any(item.whole_item for item in flagged):
+            report(0.9, "🛡️ Replacing items removed by the content filter...")
+            with call_label("regenerate"):
+                plan = regenerate_filtered_items(client, agents["recommendation"], plan, user_input, flagged)
+            empty = plan.ir.empty_sections()
+
+        # Check the plan against the checklist and fix only what's wrong
+        defects = validate_plan(plan, user_input.duration_days, user_input.budget_range[1]) if Config.VALIDATE_PLANS else []
+        remaining = defects
+        if defects:
+            report(0.93, f"🔧 Fixing {len(defects)} issue(s) in the plan...")
+            plan, correction_messages = correct_plan(
+                client, agents["section_writers"], plan, user_input, defects, section_findings
+            )
+            synthesis_messages = synthesis_messages + correction_messages
+            remaining = validate_plan(plan, user_input.duration_days, user_input.budget_range[1])
+            empty = plan.ir.empty_sections()
+
+    # Output lengths of this run size max_tokens for the next ones
+    output_sizer.observe_run(call_stats.output_tokens, user_input)
+
+    # Validate that sections have content
+    empty_sections = [SECTION_TITLES[name] for name in empty]
+
+    finished = time.perf_counter()
+    monitor.record_latency(finished - started)
+    plan.degradation = degradation
+    report(1.0, "✅ Done")
+
+    messages = [message for stage in SPECIALIST_STAGES for message in stage_messages.get(stage, ())]
+    messages.extend(synthesis_messages)
+
+    result = PlanResult(
+        plan=plan,
+        messages=messages,
+        parse_log=processed.parse_log,
+        flagged=flagged,
+        empty_sections=empty_sections,
+        metrics={
+            "total_seconds": round(finished - started, 3),
+            "agent_seconds": round(agents_done - started, 3),
+            "postprocess_seconds": round(finished - agents_done, 3),
+            "message_count": len(messages),
+            "stage_seconds": stage_seconds,
+            "cached_stages": cached_stages,
+            "speculative_research": speculative,
+            "priority": priority,
+            "degradation": degradation,
+            "load": load.as_dict(),
+            "llm_calls": call_stats.as_dict(),
+            "prompt_cache_pct": round(100 * call_stats.cached_tokens / max(call_stats.prompt_tokens, 1), 1),
+            "output_tokens": dict(call_stats.output_tokens),
+            "history_tokens_saved": call_stats.compacted_tokens,
+            "synthesis_mode": Config.SYNTHESIS_MODE,
+            "synthesis_prompt_tokens": {
+                "unpruned": estimate_tokens(unpruned_prompt),
+                "sent": sum(estimate_tokens(prompt) for prompt in synthesis_prompts),
+                "saved_pct": round(100 * (1 - sum(map(len, synthesis_prompts)) / max(len(unpruned_prompt), 1)), 1),
+            },
+            "context_duplicates_removed": pruned.duplicates_removed if pruned else 0,
+            "plan_defects": [defect.message for defect in defects],
+            "defects_remaining": [defect.message for defect in remaining],
+        },
+    )
+
+    # Persist, then cache under the request so repeats are instant (incomplete plans are neither)
+    if not result.complete:
+        return result
+    store = get_plan_store()
+    if store is not None:
+        result.plan_id = store.save(user_input, result.to_dict(), source)
+    if Config.ENABLE_CACHE and not degradation:
+        search_cache.set(plan_cache_key(user_input), result.to_dict())
+    return result
+
+
+def create_multi_city_plan(user_input: UserInput, progress: Optional[ProgressCallback] = None,
+                           source: str = "user", tenant: Optional[str] = None, fresh: bool = False) -> PlanResult:
+    """
+    Plan a multi-city trip as concurrent single-destination plans, one per leg
+
+    Each leg runs the full pipeline on its own request (reusing that
+    destination's research, stage and plan caches), so the trip takes as
+    long as its slowest leg. The leg plans are merged with the transfers
+    between cities into one plan.
+
+    Args:
+        user_input: UserInput with two or more legs
+        progress: Optional callback receiving (fraction, message) updates
+        source: Who asked for the plan (see create_travel_plan)
+        tenant: Who to share LLM capacity fairly with within the class
+        fresh: Generate new plans for the trip and every leg (see create_travel_plan)
+
+    Returns:
+        PlanResult for the whole trip
+    """
+    def report(fraction: float, message: str):
+        if progress:
+            progress(fraction, message)
+
+    started = time.perf_counter()
+    _warm_plan_cache_once()
+    cached = None if fresh else cached_plan(user_input)
+    if cached is not None:
+        report(1.0, "✅ Done (from cache)")
+        result = PlanResult.from_dict(cached)
+        result.metrics = {**result.metrics, "plan_cache_hit": True}
+        return result
+
+    legs = user_input.leg_inputs()
+    report(0.05, f"🗺️ Planning {len(legs)} destinations in parallel...")
+    results: List[Optional[PlanResult]] = [None] * len(legs)
+    with track_calls() as call_stats, ThreadPoolExecutor(max_workers=len(legs)) as executor:
+        futures = {
+            executor.submit(copy_context().run, create_travel_plan, leg, None, source, tenant, fresh): index
+            for index, leg in enumerate(legs)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            results[index] = future.result()
+            report(0.05 + 0.9 * done / len(legs), f"✅ {legs[index].destination} planned ({done}/{len(legs)})")
+
+    transfers = plan_transfers(user_input.legs)
+    plan = merge_leg_plans(user_input, [result.plan for result in results], transfers)
+    finished = time.perf_counter()
+    report(1.0, "✅ Done")
+
+    leg_seconds = [result.metrics.get("total_seconds", 0.0) for result in results]
+    result = PlanResult(
+        plan=plan,
+        messages=[message for leg_result in results for message in leg_result.messages],
+        parse_log=[f"{leg.destination}: {line}" for leg, leg_result in zip(legs, results) for line in leg_result.parse_log],
+        flagged=[item for leg_result in results for item in leg_result.flagged],
+        empty_sections=list(dict.fromkeys(name for leg_result in results for name in leg_result.empty_sections)),
+        metrics={
+            "total_seconds": round(finished - started, 3),
+            "multi_city": True,
+            "legs": [
+                {
+                    "destination": leg.destination,
+                    "plan_id": leg_result.plan_id,
+                    "seconds": leg_result.metrics.get("total_seconds", 0.0),
+                    "plan_cache_hit": leg_result.metrics.get("plan_cache_hit", False),
+                    "cached_stages": leg_result.metrics.get("cached_stages", []),
+                }
+                for leg, leg_result in zip(legs, results)
+            ],
+            "slowest_leg_seconds": max(leg_seconds),
+            "sequential_leg_seconds": round(sum(leg_seconds), 3),
+            "transfers": [transfer.as_dict() for transfer in transfers],
+            "degradation": plan.degradation,
+            "llm_calls": call_stats.as_dict(),
+            "output_tokens": dict(call_stats.output_tokens),
+        },
+    )
+
+    if not all(leg_result.complete for leg_result in results):
+        return result
+    store = get_plan_store()
+    if store is not None:
+        result.plan_id = store.save(user_input, result.to_dict(), source)
+    if Config.ENABLE_CACHE and not plan.degradation:
+        search_cache.set(plan_cache_key(user_input), result.to_dict())
+    return result
+
+
+def write_variant(client, agents: Dict[str, Any], user_input: UserInput, shared: Dict[str, str]) -> PlanResult:
+    """
+    Write one plan variant: its own cost estimate, then a single synthesis call
+
+    The budget agent runs for the variant's budget and pace, on top of the
+    shared research and recommendations. The plan is post-processed,
+    filtered and validated like a full plan.
+
+    Args:
+        client: Swarm client
+        agents: get_agents() output
+        user_input: The variant's request
+        shared: Research and recommendation outputs, by stage
+
+    Returns:
+        PlanResult of the variant (not stored or cached)
+    """
+    started = time.perf_counter()
+    budget_messages, _ = run_specialist_stage(client, agents, "budget", user_input, shared["research"])
+    stage_outputs = {**shared, "budget": budget_messages[-1]["content"]}
+    pruned = prune_context(stage_outputs) if Config.PRUNE_CONTEXT else None
+    full_findings = format_findings(stage_outputs)
+    findings = pruned.to_prompt() if pruned else full_findings
+    section_findings = {name: pruned.sections.get(name, "") if pruned else full_findings for name in SECTION_TITLES}
+
+    messages = budget_messages + run_stage(
+        client, agents["supervisor"], "supervisor", build_context_message(user_input, findings, VARIANT_NOTE),
+        max_tokens=stage_max_tokens("supervisor", user_input),
+    )
+    processed = postprocess(messages[-1]["content"], user_input.content_filter)
+    plan = processed.plan
+    empty = processed.empty_sections
+    if any(item.whole_item for item in processed.flagged):
+        with call_label("regenerate"):
+            plan = regenerate_filtered_items(client, agents["recommendation"], plan, user_input, processed.flagged)
+        empty = plan.ir.empty_sections()
+
+    defects = validate_plan(plan, user_input.duration_days, user_input.budget_range[1]) if Config.VALIDATE_PLANS else []
+    remaining = defects
+    if defects:
+        plan, correction_messages = correct_plan(
+            client, agents["section_writers"], plan, user_input, defects, section_findings
+        )
+        messages = messages + correction_messages
+        remaining = validate_plan(plan, user_input.duration_days, user_input.budget_range[1])
+        empty = plan.ir.empty_sections()
+
+    return PlanResult(
+        plan=plan,
+        messages=messages,
+        parse_log=processed.parse_log,
+        flagged=processed.flagged,
+        empty_sections=[SECTION_TITLES[name] for name in empty],
+        metrics={
+            "total_seconds": round(time.perf_counter() - started, 3),
+            "budget_range": list(user_input.budget_range),
+            "pace": user_input.pace,
+            "plan_defects": [defect.message for defect in defects],
+            "defects_remaining": [defect.message for defect in remaining],
+        },
+    )
+
+
+def create_plan_variants(user_input: UserInput, dimension: str = "budget",
+                         progress: Optional[ProgressCallback] = None,
+                         source: str = "user", tenant: Optional[str] = None) -> PlanVariants:
+    """
+    Plan the same trip at several budget tiers or paces from one research pass
+
+    Research and recommendation prompts carry neither budget nor pace (see
+    STAGE_CONTEXT), so they run once for all variants (and come from the
+    stage cache when a plan for the destination was made recently). Each
+    variant then runs the budget agent for its own budget and pace and is
+    written by one synthesis call, concurrently with the others. The
+    itinerary agent is skipped (the synthesis writes the days), so three
+    variants cost about as much as one and a half full plans.
+
+    Args:
+        user_input: The request as entered
+        dimension: "budget" or "pace" (see variants.variant_inputs)
+        progress: Optional callback receiving (fraction, message) updates
+        source: Who asked for the variants (picks the priority class)
+        tenant: Who to share LLM capacity fairly with within the class
+
+    Returns:
+        PlanVariants with one PlanResult per variant
+    """
+    def report(fraction: float, message: str):
+        if progress:
+            progress(fraction, message)
+
+    started = time.perf_counter()
+    inputs = variant_inputs(user_input, dimension)
+    client = get_swarm_client()
+    agents = get_agents()
+    cached_stages: List[str] = []
+
+    report(0.05, "🔎 Researching your destination...")
+    with scheduling(PRIORITY_BY_SOURCE.get(source, "batch"), tenant or source), track_calls() as call_stats:
+        speculative = join_speculative_research(stage_cache_key("research", user_input), Config.LLM_TIMEOUT)
+        research_messages, cached = run_specialist_stage(client, agents, "research", user_input)
+        if cached:
+            cached_stages.append("research")
+        research = research_messages[-1]["content"]
+
+        report(0.3, "🤝 Recommendation agent at work...")
+        recommendation_messages, cached = run_specialist_stage(client, agents, "recommendation", user_input, research)
+        if cached:
+            cached_stages.append("recommendation")
+
+        stage_outputs = {"research": research, "recommendation": recommendation_messages[-1]["content"]}
+        shared_seconds = time.perf_counter() - started
+
+        report(0.5, f"✍️ Costing and writing {len(inputs)} variants...")
+        results: Dict[str, PlanResult] = {}
+        with ThreadPoolExecutor(max_workers=len(inputs)) as executor:
+            futures = {
+                executor.submit(copy_context().run, write_variant, client, agents, variant_input, stage_outputs): label
+                for label, variant_input in inputs.items()
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                label = futures[future]
+                results[label] = future.result()
+                report(0.5 + 0.45 * done / len(inputs), f"✅ {label} plan written")
+
+    report(1.0, "✅ Done")
+    shared = research_messages + recommendation_messages
+    for result in results.values():
+        result.messages = shared + result.messages
+    return PlanVariants(
+        dimension=dimension,
+        variants={label: results[label] for label in inputs},
+        metrics={
+            "total_seconds": round(time.perf_counter() - started, 3),
+            "shared_seconds": round(shared_seconds, 3),
+            "cached_stages": cached_stages,
+            "speculative_research": speculative,
+            "llm_calls": call_stats.as_dict(),
+        },
+    )
+
+
+@register_handler("plan")
+def run_plan_job(payload: Dict[str, Any], progress: ProgressCallback) -> Dict[str, Any]:
+    """
+    Job handler: generate a plan from a serialized UserInput
+
+    Args:
+        payload: UserInput.model_dump(mode="json"), plus an optional "tenant" (the app session)
+            and "fresh" (skip cached and saved plans)
+        progress: Progress callback
+
+    Returns:
+        PlanResult.to_dict()
+    """
+    fields = dict(payload)
+    tenant = fields.pop("tenant", None)
+    fresh = fields.pop("fresh", False)
+    return create_travel_plan(UserInput(**fields), progress, tenant=tenant, fresh=fresh).to_dict()
+
+
+@register_handler("variants")
+def run_variants_job(payload: Dict[str, Any], progress: ProgressCallback) -> Dict[str, Any]:
+    """
+    Job handler: plan variants of a serialized UserInput
+
+    Args:
+        payload: UserInput.model_dump(mode="json"), plus "dimension" ("budget" or "pace")
+            and an optional "tenant"
+
+    Returns:
+        PlanVariants.to_dict()
+    """
+    fields = dict(payload)
+    tenant = fields.pop("tenant", None)
+    dimension = fields.pop("dimension", "budget")
+    return create_plan_variants(UserInput(**fields), dimension, progress, tenant=tenant).to_dict()
@@ -3,27 +3,27 @@
 import streamlit as st
 import sys
 import os
+import time
+import uuid
+from dataclasses import replace
 from datetime import datetime
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from swarm import Swarm
 from src.utils.config import Config
-from src.models import TravelPlan
+from src.planner import PlanResult, PlanVariants
+from src.utils.jobs import JOB_DONE, JOB_FAILED, JOB_CANCELLED, JOB_RUNNING, get_job_queue
+from src.utils.plan_store import get_plan_store
+from src.utils.degradation import DEGRADATION_NOTES
+from src.utils.speculation import get_speculator
 from src.ui.components import (
     render_input_form,
     render_section_buttons,
     render_section_content,
+    render_variant_comparison,
     apply_custom_css
 )
-from src.agents import (
-    create_supervisor_agent,
-    create_research_agent,
-    create_budget_agent,
-    create_itinerary_agent,
-    create_recommendation_agent
-)
 
 
 # Page configuration
@@ -51,246 +51,254 @@ def initialize_app():
         return False
 
 
-def parse_plan_sections(plan_text: str) -> TravelPlan:
+def clear_job():
+    """Forget the tracked job (session and URL)"""
+    st.session_state.job_id = None
+    if "job" in st.query_params:
+        del st.query_params["job"]
+
+
+def show_plan(result: PlanResult):
+    """Make a plan the one on screen (and link to it from the URL if stored)"""
+    # Sessions keep the plan compressed and shared; sections are decompressed as they're shown
+    packed = result.plan.packed()
+    st.session_state.travel_plan = packed
+    st.session_state.plan_result = replace(result, plan=packed)
+    st.session_state.plan_generated = True
+    st.session_state.generation_in_progress = False
+    st.session_state.selected_section = 'places_to_stay'
+    if result.plan_id:
+        st.query_params["plan"] = result.plan_id
+
+
+def show_variants(variants: PlanVariants):
+    """Put plan variants on screen for side-by-side comparison"""
+    st.session_state.plan_variants = variants
+    st.session_state.generation_in_progress = False
+    st.session_state.selected_section = 'places_to_stay'
+
+
+def submit_planning_job(kind: str, payload: dict):
+    """Start a background job for the form's request and track it"""
+    st.session_state.generation_in_progress = True
+    payload = {**payload, "tenant": st.session_state.tenant}
+    if kind == "plan" and st.session_state.get("skip_saved_plans"):
+        # After Clear Cache, the next plan is generated anew rather than loaded from the plan store
+        payload["fresh"] = True
+        st.session_state.skip_saved_plans = False
+    job_id = get_job_queue().submit(kind, payload)
+    st.session_state.job_id = job_id
+    st.query_params["job"] = job_id
+    # The job picks up the speculative research
+    st.session_state.speculation_trip = None
+    st.session_state.speculation_key = None
+    st.rerun()
+
+
+def load_stored_plan(plan_id: str) -> bool:
     """
-    Parse supervisor's output into structured sections
+    Open a plan from the plan store
     
     Args:
-        plan_text: Raw text from supervisor
+        plan_id: Stored plan ID
     
     Returns:
-        TravelPlan object with sections and images
+        True if the plan was found
     """
-    import streamlit as st
+    store = get_plan_store()
+    stored = store.get(plan_id) if store else None
+    if stored is None:
+        return False
+    show_plan(PlanResult.from_dict({**stored.result, "metrics": stored.metrics, "plan_id": stored.id}))
+    return True
+
+
+def speculate_research(destination: str, start_date, end_date):
+    """
+    Research the destination while the rest of the form is filled in
     
-    # Split by section headers
-    sections = {
-        'places_to_stay': '',
-        'activities': '',
-        'transportation': '',
-        'itinerary': ''
-    }
+    Runs once per destination/dates change; research for a destination the
+    user has moved away from is cancelled if it hasn't started.
+    """
+    if not Config.SPECULATIVE_RESEARCH:
+        return
+    trip = (destination.lower(), start_date, end_date)
+    if st.session_state.get("speculation_trip") == trip:
+        return
     
-    # DEBUG: Show parsing process
-    with st.expander("🔍 Debug: Parsing Process", expanded=False):
-        st.write("**Looking for section markers in the text...**")
-        
-        # Strategy 1: Look for explicit section markers
-        import re
-        
-        # Pattern: === SECTION START: NAME === content === SECTION END: NAME ===
-        patterns = {
-            'places_to_stay': r'===\s*SECTION START:\s*PLACES TO STAY\s*===\s*(.+?)\s*===\s*SECTION END:\s*PLACES TO STAY\s*===',
-            'activities': r'===\s*SECTION START:\s*ACTIVITIES\s*===\s*(.+?)\s*===\s*SECTION END:\s*ACTIVITIES\s*===',
-            'transportation': r'===\s*SECTION START:\s*TRANSPORTATION\s*===\s*(.+?)\s*===\s*SECTION END:\s*TRANSPORTATION\s*===',
-            'itinerary': r'===\s*SECTION START:\s*ITINERARY\s*===\s*(.+?)\s*===\s*SECTION END:\s*ITINERARY\s*==='
-        }
-        
-        sections_found = []
-        for section_key, pattern in patterns.items():
-            match = re.search(pattern, plan_text, re.DOTALL | re.IGNORECASE)
-            if match:
-                sections[section_key] = match.group(1).strip()
-                sections_found.append(section_key)
-                st.write(f"✅ Found section: {section_key} ({len(sections[section_key])} characters)")
-            else:
-                st.write(f"❌ Missing section: {section_key}")
-        
-        # Fallback: If structured markers not found, try old parsing method
-        if len(sections_found) == 0:
-            st.warning("⚠️ Structured markers not found, trying fallback parsing...")
-            
-            lines = plan_text.split('\n')
-            current_section = None
-            current_content = []
-            
-            for line_num, line in enumerate(lines):
-                line_lower = line.lower()
-                
-                # Detect section headers (look for emoji or text)
-                if ('places to stay' in line_lower or '🏨' in line):
-                    if current_section and current_content:
-                        sections[current_section] = '\n'.join(current_content).strip()
-                    current_section = 'places_to_stay'
-                    current_content = []
-                elif ('activities' in line_lower or '🎭' in line) and 'day-by-day' not in line_lower and 'itinerary' not in line_lower:
-                    if current_section and current_content:
-                        sections[current_section] = '\n'.join(current_content).strip()
-                    current_section = 'activities'
-                    current_content = []
-                elif ('transportation' in line_lower or '🚗' in line):
-                    if current_section and current_content:
-                        sections[current_section] = '\n'.join(current_content).strip()
-                    current_section = 'transportation'
-                    current_content = []
-                elif ('itinerary' in line_lower or '📅' in line or 'day-by-day' in line_lower):
-                    if current_section and current_content:
-                        sections[current_section] = '\n'.join(current_content).strip()
-                    current_section = 'itinerary'
-                    current_content = []
-                elif line.strip() == '---':
-                    if current_section and current_content:
-                        sections[current_section] = '\n'.join(current_content).strip()
-                        current_content = []
-                elif line.strip().startswith('#'):
-                    continue
-                else:
-                    if current_section:
-                        current_content.append(line)
-            
-            if current_section and current_content:
-                sections[current_section] = '\n'.join(current_content).strip()
-        
-        st.write(f"\n**Final section lengths:**")
-        for key, content in sections.items():
-            st.write(f"- {key}: {len(content)} characters")
+    speculator = get_speculator()
+    previous = st.session_state.get("speculation_key")
+    key = speculator.start(destination, start_date, end_date, tenant=st.session_state.tenant)
+    if previous and previous != key:
+        speculator.cancel(previous)
+    elif previous == key:
+        speculator.cancel(previous)  # Same research (same month) - keep a single claim
+    st.session_state.speculation_trip = trip
+    st.session_state.speculation_key = key
+
+
+def render_plan_history():
+    """Sidebar picker for previously generated plans"""
+    store = get_plan_store()
+    if store is None:
+        return
     
-    # Fallback: if parsing failed, put everything in itinerary
-    if not any([sections['places_to_stay'], sections['activities'], sections['transportation'], sections['itinerary']]):
-        st.warning("⚠️ Parsing failed - no sections found! Using fallback.")
-        sections['itinerary'] = plan_text
-        sections['places_to_stay'] = "⚠️ Parsing error - check debug output"
-        sections['activities'] = "⚠️ Parsing error - check debug output"
-        sections['transportation'] = "⚠️ Parsing error - check debug output"
+    st.subheader("📚 Past Plans")
+    plans = store.search(limit=20)
+    if not plans:
+        st.caption("Generated plans are saved here")
+        return
     
-    return TravelPlan(**sections)
+    labels = {summary.id: summary.label for summary in plans}
+    plan_id = st.selectbox(
+        "Past plans",
+        options=list(labels),
+        format_func=labels.get,
+        label_visibility="collapsed",
+        key="history_plan"
+    )
+    if st.button("Open", use_container_width=True, key="open_history_plan"):
+        clear_job()
+        load_stored_plan(plan_id)
+        st.rerun()
 
 
-def create_travel_plan(user_input):
+def render_job_progress(job_id: str):
     """
-    Execute travel planning with agents - RUNS ONCE to gather all data
+    Show progress of a background planning job and collect its result
     
-    Args:
-        user_input: UserInput model
+    The job ID is kept in session state and in the URL, so the job keeps
+    running across reruns and can be picked up again after a refresh.
     
-    Returns:
-        TravelPlan object or None if failed
+    Args:
+        job_id: Job to track
     """
-    try:
-        # Initialize Swarm client
-        client = Swarm()
-        
-        # Create all agents upfront
-        supervisor = create_supervisor_agent()
-        research = create_research_agent()
-        budget = create_budget_agent()
-        itinerary = create_itinerary_agent()
-        recommendation = create_recommendation_agent()
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    
+    if job is None:
+        st.warning("⚠️ This planning job has expired. Please generate a new plan.")
+        clear_job()
+        return
+    
+    if job.status == JOB_DONE:
+        clear_job()
+        if job.kind == "variants":
+            show_variants(PlanVariants.from_dict(job.result))
+        else:
+            show_plan(PlanResult.from_dict(job.result))
+        st.rerun()
+    
+    if job.status == JOB_FAILED:
+        st.session_state.generation_in_progress = False
+        st.error("Error generating travel plan")
+        with st.expander("Error details", expanded=False):
+            st.code(job.error)
         
-        # Prepare comprehensive context for agents
-        context_message = f"""
-Create a COMPLETE travel plan. Follow these steps EXACTLY:
-
-STEP 1: Call Research Agent
-STEP 2: Call Budget Agent  
-STEP 3: Call Itinerary Agent
-STEP 4: Call Recommendation Agent
-STEP 5: Create final plan using ALL the information gathered
-
-{user_input.to_prompt_context()}
-
-FINAL OUTPUT MUST HAVE EXACTLY 4 SECTIONS WITH THESE EXACT HEADERS:
-
-=== SECTION START: PLACES TO STAY ===
-[Write 3-5 hotel recommendations here with names, prices, locations]
-=== SECTION END: PLACES TO STAY ===
-
-=== SECTION START: ACTIVITIES ===
-[Write 8-12 specific attraction/activity recommendations here - NO day numbers, just a list!]
-Examples: "Eiffel Tower", "Louvre Museum", "Seine River Cruise", etc.
-=== SECTION END: ACTIVITIES ===
-
-=== SECTION START: TRANSPORTATION ===
-[Write complete transportation guide here]
-MUST include: Airport names with codes (e.g., "JFK", "CDG"), how to get from airport to city, local transport options with costs
-=== SECTION END: TRANSPORTATION ===
+        # Agent steps that finished are cached, so a retry only redoes the rest
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("🔁 Retry", type="primary", use_container_width=True, key="retry_job"):
+                retry_id = queue.submit(job.kind, job.payload)
+                st.session_state.job_id = retry_id
+                st.query_params["job"] = retry_id
+                st.session_state.generation_in_progress = True
+                st.rerun()
+        with col2:
+            if st.button("✏️ Edit Trip", use_container_width=True, key="edit_trip"):
+                clear_job()
+                st.rerun()
+        return
+    
+    if job.status == JOB_CANCELLED:
+        st.session_state.generation_in_progress = False
+        st.info("Plan generation cancelled.")
+        clear_job()
+        return
+    
+    # Still queued or running - show progress and poll again
+    st.markdown("---")
+    st.progress(job.progress, text=job.message or "🤖 AI agents are planning your trip...")
+    st.info("📋 This will take 20-40 seconds. You can refresh the page - your plan keeps generating in the background.")
+    if job.status != JOB_RUNNING and queue.depth():
+        st.caption(f"{queue.depth()} plan(s) ahead in the queue")
+    
+    if st.button("✖️ Cancel", key="cancel_job"):
+        queue.cancel(job_id)
+        st.rerun()
+    
+    time.sleep(Config.JOB_POLL_INTERVAL)
+    st.rerun()
 
-=== SECTION START: ITINERARY ===
-[Write complete day-by-day schedule for ALL days here]
-Day 1: [morning, afternoon, evening]
-Day 2: [morning, afternoon, evening]
-[etc. for ALL days]
-=== SECTION END: ITINERARY ===
 
-⚠️ CRITICAL: DO NOT SKIP ANY SECTION! Each section MUST have real content!
-⚠️ Use EXACT section markers: "=== SECTION START: [NAME] ===" and "=== SECTION END: [NAME] ==="
-⚠️ Apply {user_input.content_filter} filter
-⚠️ Budget: ${user_input.budget_range[0]:,.0f}-${user_input.budget_range[1]:,.0f}
-"""
-        
-        # Run Swarm orchestration with progress updates
-        with st.spinner("🤖 AI agents are planning your trip..."):
-            # Create progress placeholder
-            progress_text = st.empty()
-            status_text = st.empty()
-            
-            progress_text.text("✨ Coordinating AI agents...")
-            status_text.info("📋 This will take 20-40 seconds. All data is gathered once, then you can navigate seamlessly.")
-            
-            # Execute with supervisor - ALL agents run here
-            response = client.run(
-                agent=supervisor,
-                messages=[{"role": "user", "content": context_message}],
-                max_turns=Config.MAX_TURNS,
-                context_variables={
-                    "research_agent": research,
-                    "budget_agent": budget,
-                    "itinerary_agent": itinerary,
-                    "recommendation_agent": recommendation
-                }
+def render_debug(result: PlanResult):
+    """
+    Show agent messages and parsing details for a generated plan
+    
+    Args:
+        result: PlanResult of the run
+    """
+    if result.empty_sections:
+        st.error(f"⚠️ Empty sections detected: {', '.join(result.empty_sections)}")
+        st.error("The supervisor did not follow instructions properly. Check the debug output below.")
+    
+    with st.expander("🔍 Debug: View ALL Agent Messages", expanded=False):
+        st.write(f"**Total messages in conversation: {len(result.messages)}**")
+        st.write(f"**Timings:** {result.metrics}")
+        tokens = result.metrics.get("synthesis_prompt_tokens")
+        if tokens:
+            st.write(
+                f"**Synthesis prompt:** ~{tokens['sent']:,} tokens "
+                f"(~{tokens['unpruned']:,} unpruned, {tokens['saved_pct']}% saved)"
+            )
+        calls = result.metrics.get("llm_calls", {})
+        if calls.get("prompt_tokens"):
+            st.write(
+                f"**Prompt cache:** {calls['cached_tokens']:,} of {calls['prompt_tokens']:,} prompt tokens "
+                f"served from the provider cache ({result.metrics.get('prompt_cache_pct', 0)}%)"
+            )
+        if calls.get("queue_seconds"):
+            st.write(
+                f"**Call scheduler:** {calls['queue_seconds']:.1f}s queued for LLM capacity "
+                f"({result.metrics.get('priority', 'interactive')} priority)"
+            )
+        legs = result.metrics.get("legs")
+        if legs:
+            st.write(
+                f"**Multi-city:** {len(legs)} legs planned in parallel in {result.metrics['total_seconds']:.1f}s "
+                f"(slowest leg {result.metrics['slowest_leg_seconds']:.1f}s, "
+                f"{result.metrics['sequential_leg_seconds']:.1f}s one after another)"
             )
-            
-            progress_text.empty()
-            status_text.empty()
+        degradation = result.metrics.get("degradation")
+        if degradation:
+            load = result.metrics.get("load", {})
+            st.write(
+                f"**Degraded:** {', '.join(degradation)} (load {load.get('pressure', 0)}x threshold: "
+                f"{load.get('waiting_jobs', 0)} jobs waiting, plan p95 {load.get('latency_p95', 0)}s)"
+            )
+        if calls.get("compacted_tokens"):
+            st.write(f"**History compaction:** ~{calls['compacted_tokens']:,} prompt tokens not re-sent between agent turns")
+        defects = result.metrics.get("plan_defects")
+        if defects:
+            remaining = result.metrics.get("defects_remaining", [])
+            st.write(f"**Plan checks:** {len(defects)} issue(s) found, {len(defects) - len(remaining)} fixed")
+            for defect in defects:
+                st.write(f"- {defect}" + (" (not fixed)" if defect in remaining else ""))
+        st.write("---")
+        for idx, msg in enumerate(result.messages):
+            content = msg.get("content", "")
+            st.write(f"**Message {idx + 1}** - Role: `{msg.get('role')}` - Sender: `{msg.get('sender')}`")
+            st.code(content[:2000] + ("..." if len(content) > 2000 else ""), language="markdown")
         
-        # Extract final plan from response
-        if response and response.messages:
-            final_message = response.messages[-1]["content"]
-            
-            # DEBUG: Show ALL messages to see agent interactions
-            with st.expander("🔍 Debug: View ALL Agent Messages", expanded=True):
-                st.write(f"**Total messages in conversation: {len(response.messages)}**")
-                st.write("---")
-                for idx, msg in enumerate(response.messages):
-                    role = msg.get("role", "unknown")
-                    content = msg.get("content", "")
-                    sender = msg.get("sender", "unknown")
-                    
-                    st.write(f"**Message {idx + 1}** - Role: `{role}` - Sender: `{sender}`")
-                    with st.expander(f"Message {idx + 1} Content", expanded=(idx == len(response.messages) - 1)):
-                        st.code(content[:2000] + ("..." if len(content) > 2000 else ""), language="markdown")
-                    st.write("---")
-            
-            # Parse into sections
-            plan = parse_plan_sections(final_message)
-            
-            # Validate that sections have content
-            empty_sections = []
-            if not plan.places_to_stay or len(plan.places_to_stay.strip()) < 50:
-                empty_sections.append("Places to Stay")
-            
-            if not plan.activities or len(plan.activities.strip()) < 50:
-                empty_sections.append("Activities")
-            
-            if not plan.transportation or len(plan.transportation.strip()) < 50:
-                empty_sections.append("Transportation")
-            
-            if not plan.itinerary or len(plan.itinerary.strip()) < 50:
-                empty_sections.append("Itinerary")
-            
-            if empty_sections:
-                st.error(f"⚠️ Empty sections detected: {', '.join(empty_sections)}")
-                st.error("The supervisor did not follow instructions properly. Check the debug output above.")
-            
-            return plan
-        else:
-            st.error("No response received from agents")
-            return None
-            
-    except Exception as e:
-        st.error(f"Error generating travel plan: {e}")
-        st.exception(e)
-        return None
+        st.write("**Parsing Process:**")
+        for line in result.parse_log:
+            st.write(line)
+        
+        if result.flagged:
+            st.write(f"**🛡️ Content filter removed {len(result.flagged)} item(s):**")
+            for item in result.flagged:
+                st.write(f"**{item.section}** ({', '.join(item.terms)})")
+                st.code(item.text, language="markdown")
 
 
 def main():
@@ -312,6 +320,21 @@ def main():
         st.session_state.selected_section = 'places_to_stay'
     if 'generation_in_progress' not in st.session_state:
         st.session_state.generation_in_progress = False
+    if 'plan_result' not in st.session_state:
+        st.session_state.plan_result = None
+    if 'plan_variants' not in st.session_state:
+        st.session_state.plan_variants = None
+    if 'tenant' not in st.session_state:
+        # LLM capacity is shared fairly between sessions
+        st.session_state.tenant = uuid.uuid4().hex[:12]
+    if 'job_id' not in st.session_state:
+        # Reconnect to a job started before a browser refresh
+        st.session_state.job_id = st.query_params.get("job")
+        
+        # Reopen a saved plan linked from the URL
+        plan_id = st.query_params.get("plan")
+        if plan_id and not st.session_state.job_id and not load_stored_plan(plan_id):
+            del st.query_params["plan"]
     
     # Header
     st.title("🌍 AI-Powered Travel Planner")
@@ -333,9 +356,18 @@ def main():
         if st.session_state.plan_generated:
             st.success("✅ Plan ready")
             st.info("🔒 Navigation locked (no re-execution)")
+        elif st.session_state.job_id:
+            st.info("⏳ Generating plan...")
         else:
             st.info("📝 Waiting for input")
         
+        queue = get_job_queue()
+        st.caption(f"Workers: {queue.workers} · Queued plans: {queue.depth()}")
+        
+        st.markdown("---")
+        
+        render_plan_history()
+        
         st.markdown("---")
         
         st.subheader("📊 Cache")
@@ -344,16 +376,21 @@ def main():
         
         if st.button("Clear Cache", use_container_width=True):
             search_cache.clear()
-            st.success("Cache cleared!")
+            st.session_state.skip_saved_plans = True
+            st.success("Cache cleared! Your next plan will be generated anew.")
             st.rerun()
         
         st.markdown("---")
         st.caption("Built with OpenAI Swarm")
     
+    # Track a running job instead of showing the form
+    if not st.session_state.plan_generated and st.session_state.job_id:
+        render_job_progress(st.session_state.job_id)
+    
     # Show input form ONLY if no plan is generated
-    if not st.session_state.plan_generated:
+    if not st.session_state.plan_generated and not st.session_state.job_id and not st.session_state.plan_variants:
         # Input form
-        user_input = render_input_form()
+        user_input = render_input_form(on_trip_basics=speculate_research)
         
         # Generate button
         st.markdown("---")
@@ -362,22 +399,48 @@ def main():
             if user_input is None:
                 st.error("Please fill in all required fields correctly")
             else:
-                # Mark generation in progress
-                st.session_state.generation_in_progress = True
-                
-                # Execute travel planning (ONLY HAPPENS ONCE HERE!)
-                plan = create_travel_plan(user_input)
-                
-                if plan:
-                    # Store plan in session state
-                    st.session_state.travel_plan = plan
-                    st.session_state.plan_generated = True
-                    st.session_state.generation_in_progress = False
-                    st.success("✅ Travel plan generated successfully!")
-                    st.balloons()
-                    st.rerun()
-                else:
-                    st.session_state.generation_in_progress = False
+                # Execute travel planning in the background (ONLY HAPPENS ONCE HERE!)
+                submit_planning_job("plan", user_input.model_dump(mode="json"))
+        
+        # One research pass, one cheap synthesis per variant
+        compare_col, dimension_col = st.columns(2)
+        with dimension_col:
+            dimension = st.radio("Compare by", ["Budget tier", "Pace"], horizontal=True, key="variant_dimension")
+        with compare_col:
+            compare = st.button("⚖️ Compare Variants", use_container_width=True, key="compare_btn")
+        if compare:
+            if user_input is None:
+                st.error("Please fill in all required fields correctly")
+            elif user_input.is_multi_city:
+                st.error("Variants can be compared for single-destination trips")
+            else:
+                submit_planning_job("variants", {
+                    **user_input.model_dump(mode="json"),
+                    "dimension": "budget" if dimension == "Budget tier" else "pace",
+                })
+    
+    # Compare variants side by side; picking one makes it the plan
+    elif st.session_state.plan_variants and not st.session_state.plan_generated:
+        variants = st.session_state.plan_variants
+        st.markdown("---")
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.markdown(f"## ⚖️ Plan Variants by {'Budget Tier' if variants.dimension == 'budget' else 'Pace'}")
+        with col2:
+            if st.button("🔄 Start New Plan", type="primary", use_container_width=True, key="start_new_variants"):
+                st.session_state.plan_variants = None
+                st.rerun()
+        st.caption(
+            f"Research shared across {len(variants.variants)} variants · "
+            f"{variants.metrics.get('llm_calls', {}).get('calls', 0)} LLM calls in {variants.metrics.get('total_seconds', 0):.1f}s"
+        )
+        
+        selected_section = render_section_buttons()
+        chosen = render_variant_comparison(variants.variants, selected_section)
+        if chosen:
+            st.session_state.plan_variants = None
+            show_plan(variants.variants[chosen])
+            st.rerun()
     
     # Display plan if generated (ISOLATED FROM GENERATION LOGIC!)
     elif st.session_state.plan_generated and st.session_state.travel_plan:
@@ -391,12 +454,22 @@ def main():
             if st.button("🔄 Start New Plan", type="primary", use_container_width=True, key="start_new_main"):
                 st.session_state.plan_generated = False
                 st.session_state.travel_plan = None
+                st.session_state.plan_result = None
                 st.session_state.selected_section = 'places_to_stay'
+                clear_job()
+                if "plan" in st.query_params:
+                    del st.query_params["plan"]
                 st.rerun()
         
         st.info("🔒 All data is cached! Clicking buttons below ONLY switches views - no agents are called.")
         
         plan = st.session_state.travel_plan
+        if plan.degradation:
+            notes = "; ".join(DEGRADATION_NOTES.get(step, step) for step in plan.degradation)
+            st.warning(f"⚡ High demand: this plan was made in a reduced mode ({notes}). Try again later for a full plan.")
+        
+        if st.session_state.plan_result:
+            render_debug(st.session_state.plan_result)
         
         # Section navigation buttons (ONLY switches display, guaranteed no agent calls!)
         selected_section = render_section_buttons()
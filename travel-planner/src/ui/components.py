@@ -1,15 +1,60 @@
 """Reusable UI components"""
 
+import hashlib
 import streamlit as st
 from datetime import date, timedelta
-from typing import Optional
-from src.models import UserInput
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.models import TripLeg, UserInput
+from src.plan_ir import ItineraryDay, parse_section
+from src.utils.gazetteer import canonical_destination, get_gazetteer
 
 
-def render_input_form() -> Optional[UserInput]:
+@st.cache_data
+def _destination_options() -> List[str]:
+    """Gazetteer cities for the destination type-ahead, most populous first"""
+    gazetteer = get_gazetteer()
+    return gazetteer.display_names() if gazetteer else []
+
+
+def _suggest_destinations(destination: Optional[str]):
+    """Point free-text destinations that aren't a known city at close matches"""
+    gazetteer = get_gazetteer()
+    if not destination or not gazetteer or canonical_destination(destination)[1]:
+        return
+    suggestions = gazetteer.complete(destination.split(",")[0], limit=3)
+    if suggestions:
+        st.caption("Did you mean: " + ", ".join(city.display for city in suggestions) + "?")
+
+
+MAX_STOPS = 5
+
+
+def _render_stops() -> List[Tuple[Optional[str], int]]:
+    """Destination and number of days for each stop of a multi-city trip"""
+    count = st.number_input("Stops", min_value=2, max_value=MAX_STOPS, value=2, step=1)
+    stops = []
+    for index in range(int(count)):
+        name = st.selectbox(
+            f"Stop {index + 1}",
+            _destination_options(),
+            index=None,
+            accept_new_options=True,
+            placeholder="e.g., Rome, Italy",
+            key=f"stop_{index}"
+        )
+        days = st.number_input(f"Days in stop {index + 1}", min_value=1, max_value=30, value=3, key=f"stop_days_{index}")
+        stops.append((name, int(days)))
+    return stops
+
+
+def render_input_form(on_trip_basics: Optional[Callable[[str, date, date], None]] = None) -> Optional[UserInput]:
     """
     Render input form for trip details
     
+    Args:
+        on_trip_basics: Called with (destination, start date, end date) once those are
+            valid, before the rest of the form is complete
+    
     Returns:
         UserInput model if valid, None otherwise
     """
@@ -18,11 +63,20 @@ def render_input_form() -> Optional[UserInput]:
     col1, col2 = st.columns(2)
     
     with col1:
-        destination = st.text_input(
-            "Destination",
-            placeholder="e.g., Paris, France",
-            help="Enter your destination city or country"
-        )
+        multi_city = st.toggle("Multi-city trip", help="Visit several destinations in order")
+        if multi_city:
+            stops = _render_stops()
+            destination = " → ".join(name for name, _ in stops) if all(name for name, _ in stops) else None
+        else:
+            destination = st.selectbox(
+                "Destination",
+                _destination_options(),
+                index=None,
+                accept_new_options=True,
+                placeholder="e.g., Paris, France",
+                help="Start typing a city, or enter any destination"
+            )
+            _suggest_destinations(destination)
         
         start_date = st.date_input(
             "Start Date",
@@ -31,12 +85,16 @@ def render_input_form() -> Optional[UserInput]:
             help="When does your trip begin?"
         )
         
-        end_date = st.date_input(
-            "End Date",
-            value=date.today() + timedelta(days=33),
-            min_value=date.today(),
-            help="When does your trip end?"
-        )
+        if multi_city:
+            end_date = start_date + timedelta(days=sum(days for _, days in stops) - 1)
+            st.caption(f"Trip ends {end_date:%a %b %d, %Y}")
+        else:
+            end_date = st.date_input(
+                "End Date",
+                value=date.today() + timedelta(days=33),
+                min_value=date.today(),
+                help="When does your trip end?"
+            )
     
     with col2:
         budget_min = st.number_input(
@@ -98,12 +156,25 @@ def render_input_form() -> Optional[UserInput]:
         st.error("End date must be after start date")
         return None
     
+    if on_trip_basics:
+        if multi_city:
+            # Research is speculated for the first stop
+            on_trip_basics(stops[0][0].strip(), start_date, start_date + timedelta(days=stops[0][1] - 1))
+        else:
+            on_trip_basics(destination.strip(), start_date, end_date)
+    
     if budget_min >= budget_max:
         st.error("Maximum budget must be greater than minimum budget")
         return None
     
     # Create UserInput model
     try:
+        legs = []
+        if multi_city:
+            leg_start = start_date
+            for name, days in stops:
+                legs.append(TripLeg(destination=name, start_date=leg_start, end_date=leg_start + timedelta(days=days - 1)))
+                leg_start += timedelta(days=days)
         user_input = UserInput(
             destination=destination,
             start_date=start_date,
@@ -112,7 +183,8 @@ def render_input_form() -> Optional[UserInput]:
             pace=pace.lower(),
             food_preferences=food_prefs,
             activities=activities,
-            content_filter=content_filter.lower().replace("-", "_")
+            content_filter=content_filter.lower().replace("-", "_"),
+            legs=legs
         )
         return user_input
     except Exception as e:
@@ -120,6 +192,19 @@ def render_input_form() -> Optional[UserInput]:
         return None
 
 
+SECTION_BUTTONS = [
+    ('places_to_stay', "🏨 Places to Stay", "btn_places"),
+    ('activities', "🎭 Activities", "btn_activities"),
+    ('transportation', "🚗 Transportation", "btn_transport"),
+    ('itinerary', "📅 Itinerary", "btn_itinerary"),
+]
+
+
+def _select_section(section_key: str):
+    """Button callback: runs before the rerun the click triggers, so no extra st.rerun()"""
+    st.session_state.selected_section = section_key
+
+
 def render_section_buttons():
     """
     Render navigation buttons for plan sections
@@ -137,50 +222,92 @@ def render_section_buttons():
     st.markdown("### 📑 Plan Sections")
     st.caption("✅ All data cached - clicking buttons just switches views (no agent calls)")
     
-    # Create 4 columns for buttons
-    col1, col2, col3, col4 = st.columns(4)
+    # One column per section button
+    for column, (section_key, label, button_key) in zip(st.columns(len(SECTION_BUTTONS)), SECTION_BUTTONS):
+        with column:
+            st.button(
+                label,
+                use_container_width=True,
+                type="primary" if st.session_state.selected_section == section_key else "secondary",
+                key=button_key,
+                on_click=_select_section,
+                args=(section_key,)
+            )
     
-    with col1:
-        if st.button(
-            "🏨 Places to Stay",
-            use_container_width=True,
-            type="primary" if st.session_state.selected_section == 'places_to_stay' else "secondary",
-            key="btn_places"
-        ):
-            st.session_state.selected_section = 'places_to_stay'
-            st.rerun()
+    return st.session_state.selected_section
+
+
+def content_hash(content: str) -> str:
+    """Stable hash of section content, used as the render cache key"""
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def split_itinerary_days(section_hash: str, _content: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Split an itinerary into per-day markdown chunks (memoized on content hash)
     
-    with col2:
-        if st.button(
-            "🎭 Activities",
-            use_container_width=True,
-            type="primary" if st.session_state.selected_section == 'activities' else "secondary",
-            key="btn_activities"
-        ):
-            st.session_state.selected_section = 'activities'
-            st.rerun()
+    Args:
+        section_hash: content_hash() of the itinerary; the cache key
+        _content: Itinerary markdown (not hashed by Streamlit)
     
-    with col3:
-        if st.button(
-            "🚗 Transportation",
-            use_container_width=True,
-            type="primary" if st.session_state.selected_section == 'transportation' else "secondary",
-            key="btn_transport"
-        ):
-            st.session_state.selected_section = 'transportation'
-            st.rerun()
+    Returns:
+        Intro markdown and a list of (day label, day markdown)
+    """
+    section = parse_section('itinerary', _content)
+    intro = []
+    days = []
+    for block in section.blocks:
+        if isinstance(block, ItineraryDay):
+            days.append((f"Day {block.number}", block.raw))
+        elif not days:
+            intro.append(block.raw)
+    return "\n".join(intro).strip(), days
+
+
+def render_itinerary(content: str, key: str = ""):
+    """
+    Render the itinerary one day at a time
     
-    with col4:
-        if st.button(
-            "📅 Itinerary",
-            use_container_width=True,
-            type="primary" if st.session_state.selected_section == 'itinerary' else "secondary",
-            key="btn_itinerary"
-        ):
-            st.session_state.selected_section = 'itinerary'
-            st.rerun()
+    Only the selected day's markdown is sent to the browser, so switching
+    to the itinerary stays fast for long trips.
     
-    return st.session_state.selected_section
+    Args:
+        content: Itinerary markdown
+        key: Distinguishes itineraries shown on the same page
+    """
+    section_hash = content_hash(content)
+    intro, days = split_itinerary_days(section_hash, content)
+    
+    if len(days) < 2:
+        st.markdown(content)
+        return
+    
+    if intro:
+        st.markdown(intro)
+    
+    # Options are day indices (len(days) = all days). Streamlit matches radio
+    # options by their displayed text, so repeated labels get a suffix
+    labels = []
+    seen: Dict[str, int] = {}
+    for label, _ in days:
+        seen[label] = seen.get(label, 0) + 1
+        labels.append(f"{label} ({seen[label]})" if seen[label] > 1 else label)
+    labels.append("All days")
+    selected = st.radio(
+        "Day",
+        list(range(len(labels))),
+        format_func=labels.__getitem__,
+        horizontal=True,
+        label_visibility="collapsed",
+        key=f"itinerary_day_{key}{section_hash[:12]}"
+    )
+    
+    if selected == len(days):
+        for _, day_markdown in days:
+            st.markdown(day_markdown)
+    else:
+        st.markdown(days[selected][1])
 
 
 def render_section_content(plan, section_key: str):
@@ -203,7 +330,37 @@ def render_section_content(plan, section_key: str):
     if section_key in section_map:
         title, content = section_map[section_key]
         st.header(title)
-        st.markdown(content)
+        if section_key == 'itinerary':
+            render_itinerary(content)
+        else:
+            st.markdown(content)
+
+
+def render_variant_comparison(variants: Dict[str, Any], section_key: str) -> Optional[str]:
+    """
+    Show plan variants side by side, one column each
+    
+    Args:
+        variants: Variant label to PlanResult
+        section_key: Section to compare
+    
+    Returns:
+        Label of the variant the user chose to keep, if any
+    """
+    chosen = None
+    for column, (label, result) in zip(st.columns(len(variants)), variants.items()):
+        with column:
+            st.subheader(label)
+            low, high = result.metrics.get("budget_range", (0, 0))
+            st.caption(f"${low:,.0f} - ${high:,.0f} · {result.metrics.get('pace', '')} pace")
+            if st.button("✅ Use this plan", use_container_width=True, key=f"use_variant_{label}"):
+                chosen = label
+            content = getattr(result.plan, section_key)
+            if section_key == 'itinerary':
+                render_itinerary(content, key=label)
+            else:
+                st.markdown(content)
+    return chosen
 
 
 def render_progress(message: str = "Planning your trip..."):
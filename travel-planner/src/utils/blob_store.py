@@ -0,0 +1,162 @@
+"""Content-addressed, compressed storage for plan text held in memory
+
+Cached plans, stage outputs and the plan on each session's screen are
+mostly long markdown strings, and the same text is often held many times
+over: in the plan cache, in every session a cached plan was served to, in
+the stage outputs it was written from. BlobStore keeps one zlib-compressed
+copy of each distinct string, keyed by its hash:
+
+- intern() returns the Blob for a text, reusing the existing one when the
+  same text was interned before
+- blobs are held weakly, so one disappears as soon as no cache entry or
+  session refers to it; there's no reference counting or cleanup pass
+- Blob.text decompresses on access; the most recently read texts stay
+  decompressed (BLOB_HOT_ITEMS), so rerendering the section on screen
+  doesn't decompress it again, and sessions showing the same plan share
+  one copy
+
+pack() and unpack() apply this to JSON-like data (plan dicts, message
+lists), replacing long strings with blobs and back.
+"""
+
+import hashlib
+import threading
+import weakref
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict
+
+from src.utils.config import Config
+
+
+MIN_BLOB_CHARS = 256  # Shorter strings aren't worth a blob and are kept as they are
+COMPRESS_LEVEL = 6
+
+
+class Blob:
+    """One interned text, compressed"""
+
+    __slots__ = ("digest", "data", "size", "_store", "__weakref__")
+
+    def __init__(self, digest: str, data: bytes, size: int, store: "BlobStore"):
+        self.digest = digest
+        self.data = data  # zlib-compressed UTF-8
+        self.size = size  # Uncompressed bytes
+        self._store = store
+
+    @property
+    def text(self) -> str:
+        """The text, decompressed (or from the store's hot texts)"""
+        return self._store.text(self)
+
+    def __repr__(self) -> str:
+        return f"Blob({self.digest[:8]}, {self.size} -> {len(self.data)} bytes)"
+
+
+class BlobStore:
+    """Interned, compressed texts keyed by content hash"""
+
+    def __init__(self, hot_items: int = 256):
+        """
+        Args:
+            hot_items: Recently read texts kept decompressed
+        """
+        self.hot_items = hot_items
+        self._blobs: "weakref.WeakValueDictionary[str, Blob]" = weakref.WeakValueDictionary()
+        self._hot: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def intern(self, text: str) -> Blob:
+        """
+        The blob for a text, compressing it only if it isn't stored yet
+
+        Args:
+            text: Text to store
+
+        Returns:
+            Blob shared by every holder of the same text
+        """
+        raw = text.encode("utf-8")
+        digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        with self._lock:
+            blob = self._blobs.get(digest)
+        if blob is not None:
+            return blob
+
+        data = zlib.compress(raw, COMPRESS_LEVEL)
+        with self._lock:
+            # Another thread may have interned the same text meanwhile
+            blob = self._blobs.get(digest)
+            if blob is None:
+                blob = Blob(digest, data, len(raw), self)
+                self._blobs[digest] = blob
+            return blob
+
+    def text(self, blob: Blob) -> str:
+        """Decompressed text of a blob"""
+        with self._lock:
+            text = self._hot.get(blob.digest)
+            if text is not None:
+                self._hot.move_to_end(blob.digest)
+                return text
+
+        text = zlib.decompress(blob.data).decode("utf-8")
+        if self.hot_items:
+            with self._lock:
+                self._hot[blob.digest] = text
+                while len(self._hot) > self.hot_items:
+                    self._hot.popitem(last=False)
+        return text
+
+    def pack(self, data: Any) -> Any:
+        """
+        Copy of JSON-like data with long strings replaced by blobs
+
+        Args:
+            data: Dicts, lists, tuples and scalars
+
+        Returns:
+            Same structure; unpack() restores it
+        """
+        if isinstance(data, str):
+            return self.intern(data) if len(data) >= MIN_BLOB_CHARS else data
+        if isinstance(data, dict):
+            return {key: self.pack(value) for key, value in data.items()}
+        if isinstance(data, (list, tuple)):
+            return type(data)(self.pack(value) for value in data)
+        return data
+
+    def stats(self) -> Dict[str, int]:
+        """Blob count, and bytes before and after compression"""
+        with self._lock:
+            blobs = list(self._blobs.values())
+            hot = len(self._hot)
+        return {
+            "blobs": len(blobs),
+            "raw_bytes": sum(blob.size for blob in blobs),
+            "stored_bytes": sum(len(blob.data) for blob in blobs),
+            "hot_texts": hot,
+        }
+
+    def clear_hot(self):
+        """Drop the decompressed texts (blobs stay)"""
+        with self._lock:
+            self._hot.clear()
+
+
+def unpack(data: Any) -> Any:
+    """Copy of packed data with blobs replaced by their text"""
+    if isinstance(data, Blob):
+        return data.text
+    if isinstance(data, dict):
+        return {key: unpack(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return type(data)(unpack(value) for value in data)
+    return data
+
+
+@lru_cache(maxsize=1)
+def get_blob_store() -> BlobStore:
+    """Process-wide blob store"""
+    return BlobStore(Config.BLOB_HOT_ITEMS)
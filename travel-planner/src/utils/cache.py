@@ -5,22 +5,30 @@ import hashlib
 import json
 from typing import Any, Optional
 
+from src.utils.blob_store import get_blob_store, unpack
+from src.utils.config import Config
+
 
 class SimpleCache:
     """In-memory cache with TTL"""
     
-    def __init__(self, ttl: int = 3600):
+    def __init__(self, ttl: int = 3600, compress: Optional[bool] = None):
         """
         Initialize cache
         
         Args:
             ttl: Time to live in seconds (default: 1 hour)
+            compress: Store long strings in values interned and compressed
+                (default: Config.COMPRESS_CACHE)
         """
         self.cache = {}
         self.ttl = ttl
+        self.compress = Config.COMPRESS_CACHE if compress is None else compress
     
     def _get_key(self, data: Any) -> str:
         """Generate cache key from data"""
+        if isinstance(data, str):
+            return data  # Precomputed key (e.g. UserInput.cache_key), used as is
         try:
             serialized = json.dumps(data, sort_keys=True)
             return hashlib.md5(serialized.encode()).hexdigest()
@@ -45,7 +53,7 @@ class SimpleCache:
             
             # Check if expired
             if time.time() - timestamp < self.ttl:
-                return value
+                return unpack(value) if self.compress else value
             else:
                 # Remove expired entry
                 del self.cache[cache_key]
@@ -61,6 +69,8 @@ class SimpleCache:
             value: Value to cache
         """
         cache_key = self._get_key(key)
+        if self.compress:
+            value = get_blob_store().pack(value)
         self.cache[cache_key] = (time.time(), value)
     
     def clear(self):
@@ -0,0 +1,311 @@
+"""Priority and fair-share scheduling of LLM calls
+
+Interactive plans, speculative research and batch jobs (cache warm-up)
+share one OpenAI rate limit. Every completion ResilientClient makes asks
+the CallScheduler for a slot first:
+
+- calls belong to a priority class: interactive > speculative > batch
+- each class has a share of the tokens granted (LLM_SHARES); a class that
+  is under its share goes before any class that is over it, then higher
+  priority goes first. A nightly batch can't starve live users, and live
+  traffic can't starve the batch completely
+- within a class, tenants (app sessions, the warm-up job) are served fairly:
+  the waiting tenant that has been granted the fewest tokens goes next
+- tokens granted in the last minute stay under LLM_TPM (0 = no limit) and at
+  most LLM_MAX_CONCURRENCY calls are in flight
+
+A call that fits is admitted immediately. Token counts are estimated
+(prompt characters / 4 plus max_tokens) and corrected with the response's
+usage. Queue waits are recorded per class.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+from src.utils.config import Config
+
+
+PRIORITIES = ("interactive", "speculative", "batch")
+
+# Plan source (as recorded in the plan store) to priority class
+PRIORITY_BY_SOURCE = {"user": "interactive", "speculation": "speculative", "warmup": "batch"}
+
+WINDOW_SECONDS = 60.0
+DEFAULT_OUTPUT_TOKENS = 1000  # Output estimate for calls without max_tokens
+
+_priority: ContextVar[str] = ContextVar("call_priority", default="interactive")
+_tenant: ContextVar[str] = ContextVar("call_tenant", default="")
+
+
+@contextmanager
+def scheduling(priority: str, tenant: str = "") -> Iterator[None]:
+    """Schedule LLM calls in this context under a priority class and tenant"""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority class: {priority}")
+    priority_token = _priority.set(priority)
+    tenant_token = _tenant.set(tenant)
+    try:
+        yield
+    finally:
+        _tenant.reset(tenant_token)
+        _priority.reset(priority_token)
+
+
+def parse_shares(spec: str) -> Dict[str, float]:
+    """
+    Parse "interactive=0.6,speculative=0.1,batch=0.3" into normalized shares
+
+    Classes left out get no guaranteed share (they still run when nobody
+    else is waiting).
+    """
+    shares = {priority: 0.0 for priority in PRIORITIES}
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = part.partition("=")
+        if name.strip() not in shares:
+            raise ValueError(f"Unknown priority class in LLM_SHARES: {name.strip()}")
+        shares[name.strip()] = max(0.0, float(value))
+    total = sum(shares.values())
+    return {name: value / total for name, value in shares.items()} if total else shares
+
+
+def estimate_request_tokens(params: Dict[str, Any]) -> int:
+    """Tokens a chat completion request may use (prompt estimate plus its output limit)"""
+    prompt_chars = sum(len(message.get("content") or "") for message in params.get("messages", ())
+                       if isinstance(message.get("content"), str))
+    output = params.get("max_tokens") or params.get("max_completion_tokens") or DEFAULT_OUTPUT_TOKENS
+    return prompt_chars // 4 + output
+
+
+@dataclass
+class _Waiter:
+    priority: str
+    tenant: str
+    tokens: int
+    enqueued: float
+    granted: bool = False
+
+
+@dataclass
+class ClassStats:
+    """Admissions and queue waits for one priority class"""
+
+    requests: int = 0
+    tokens: int = 0
+    waits: Deque[float] = field(default_factory=lambda: deque(maxlen=2000))
+
+    def as_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.waits)
+
+        def percentile(pct: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 3) if ordered else 0.0
+
+        return {"requests": self.requests, "tokens": self.tokens, "wait_p50": percentile(0.5), "wait_p95": percentile(0.95)}
+
+
+class CallScheduler:
+    """Admits LLM calls by priority class, fair share and tenant"""
+
+    def __init__(self, tpm: int = 0, shares: Optional[Dict[str, float]] = None, max_concurrency: int = 0):
+        """
+        Args:
+            tpm: Tokens per minute across all calls (0 = no limit)
+            shares: Share of granted tokens per class (default: equal)
+            max_concurrency: Calls in flight at once (0 = no limit)
+        """
+        self.tpm = tpm
+        self.shares = shares or {priority: 1 / len(PRIORITIES) for priority in PRIORITIES}
+        self.max_concurrency = max_concurrency
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Dict[str, Deque[_Waiter]]] = {priority: {} for priority in PRIORITIES}
+        self._served: Dict[str, Dict[str, int]] = {priority: {} for priority in PRIORITIES}  # Tokens per waiting tenant
+        self._usage: Deque[Tuple[float, str, int]] = deque()  # (time, class, tokens) granted in the window
+        self._used = {priority: 0 for priority in PRIORITIES}
+        self._in_flight = 0
+        self._stats = {priority: ClassStats() for priority in PRIORITIES}
+
+    @classmethod
+    def from_config(cls) -> "CallScheduler":
+        return cls(
+            tpm=Config.LLM_TPM,
+            shares=parse_shares(Config.LLM_SHARES),
+            max_concurrency=Config.LLM_MAX_CONCURRENCY,
+        )
+
+    def acquire(self, tokens: int, priority: Optional[str] = None, tenant: Optional[str] = None) -> float:
+        """
+        Block until a call may start
+
+        Args:
+            tokens: Estimated tokens of the call
+            priority: Priority class (default: from scheduling())
+            tenant: Tenant (default: from scheduling())
+
+        Returns:
+            Seconds spent waiting
+        """
+        waiter = _Waiter(
+            priority=priority or _priority.get(),
+            tenant=_tenant.get() if tenant is None else tenant,
+            tokens=tokens,
+            enqueued=time.monotonic(),
+        )
+        with self._cond:
+            self._enqueue(waiter)
+            self._dispatch()
+            while not waiter.granted:
+                self._cond.wait(timeout=self._retry_in())
+                self._dispatch()
+            waited = time.monotonic() - waiter.enqueued
+            stats = self._stats[waiter.priority]
+            stats.requests += 1
+            stats.tokens += tokens
+            stats.waits.append(waited)
+        return waited
+
+    def try_acquire(self, tokens: int, priority: Optional[str] = None) -> bool:
+        """
+        Admit a call only if there's spare capacity now, without queueing
+
+        For optional calls (hedges): nothing may be waiting, a concurrency
+        slot must be free and the tokens must fit under LLM_TPM.
+
+        Args:
+            tokens: Estimated tokens of the call
+            priority: Priority class (default: from scheduling())
+
+        Returns:
+            True if admitted; finish it with release()
+        """
+        priority = priority or _priority.get()
+        with self._cond:
+            self._expire()
+            if any(any(tenants.values()) for tenants in self._queues.values()):
+                return False
+            if self.max_concurrency and self._in_flight >= self.max_concurrency:
+                return False
+            window = sum(self._used.values())
+            if self.tpm and window > 0 and window + tokens > self.tpm:
+                return False
+            self._charge(priority, tokens)
+            self._in_flight += 1
+            stats = self._stats[priority]
+            stats.requests += 1
+            stats.tokens += tokens
+        return True
+
+    def release(self, tokens: int, actual_tokens: Optional[int] = None, priority: Optional[str] = None):
+        """
+        Finish a call admitted by acquire()
+
+        Args:
+            tokens: Estimate passed to acquire()
+            actual_tokens: Tokens the call really used (from its usage), if known
+            priority: Priority class passed to acquire() (default: from scheduling())
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if actual_tokens is not None and actual_tokens != tokens:
+                self._charge(priority or _priority.get(), actual_tokens - tokens)
+            self._dispatch()
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Calls waiting per class"""
+        with self._cond:
+            return {
+                priority: sum(len(waiters) for waiters in tenants.values())
+                for priority, tenants in self._queues.items()
+            }
+
+    def as_dict(self) -> Dict[str, Any]:
+        depth = self.queue_depth()
+        with self._cond:
+            return {
+                "in_flight": self._in_flight,
+                **{priority: {**self._stats[priority].as_dict(), "waiting": depth[priority]} for priority in PRIORITIES},
+            }
+
+    def _enqueue(self, waiter: _Waiter):
+        tenants = self._queues[waiter.priority]
+        served = self._served[waiter.priority]
+        if not tenants.get(waiter.tenant):
+            # A tenant coming back from idle starts level with the others, without banked credit
+            active = [served[tenant] for tenant, waiters in tenants.items() if waiters]
+            served[waiter.tenant] = max(served.get(waiter.tenant, 0), min(active, default=0))
+        tenants.setdefault(waiter.tenant, deque()).append(waiter)
+
+    def _charge(self, priority: str, tokens: int):
+        self._usage.append((time.monotonic(), priority, tokens))
+        self._used[priority] += tokens
+
+    def _expire(self):
+        horizon = time.monotonic() - WINDOW_SECONDS
+        while self._usage and self._usage[0][0] < horizon:
+            _, priority, tokens = self._usage.popleft()
+            self._used[priority] -= tokens
+
+    def _pick(self) -> Optional[_Waiter]:
+        """Next waiter: under-share classes first, then by priority; fewest tokens served within a class"""
+        waiting = [priority for priority in PRIORITIES if any(self._queues[priority].values())]
+        if not waiting:
+            return None
+        total = sum(self._used.values())
+        priority = min(
+            waiting,
+            key=lambda name: (total > 0 and self._used[name] >= self.shares.get(name, 0.0) * total, PRIORITIES.index(name)),
+        )
+        tenants = self._queues[priority]
+        served = self._served[priority]
+        tenant = min(
+            (name for name, waiters in tenants.items() if waiters),
+            key=lambda name: (served.get(name, 0), tenants[name][0].enqueued),
+        )
+        return tenants[tenant][0]
+
+    def _dispatch(self):
+        """Grant waiters while capacity allows (called with the lock held)"""
+        self._expire()
+        granted = False
+        while not self.max_concurrency or self._in_flight < self.max_concurrency:
+            waiter = self._pick()
+            if waiter is None:
+                break
+            window = sum(self._used.values())
+            if self.tpm and window > 0 and window + waiter.tokens > self.tpm:
+                break  # The next call waits for budget; nothing behind it jumps ahead
+            tenants = self._queues[waiter.priority]
+            tenants[waiter.tenant].popleft()
+            if not tenants[waiter.tenant]:
+                del tenants[waiter.tenant]
+                self._served[waiter.priority].pop(waiter.tenant, None)
+            else:
+                self._served[waiter.priority][waiter.tenant] += waiter.tokens
+            self._charge(waiter.priority, waiter.tokens)
+            self._in_flight += 1
+            waiter.granted = True
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _retry_in(self) -> Optional[float]:
+        """How long to sleep before budget frees up (None = until a call finishes)"""
+        if self.tpm and self._usage:
+            return max(0.01, self._usage[0][0] + WINDOW_SECONDS - time.monotonic())
+        return None
+
+
+_scheduler: Optional[CallScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_call_scheduler() -> CallScheduler:
+    """Process-wide call scheduler (created on first use)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = CallScheduler.from_config()
+        return _scheduler
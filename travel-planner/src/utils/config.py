@@ -15,13 +15,62 @@ class Config:
     
     # Model Configuration
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")  # or gpt-4o-mini for faster/cheaper
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")  # Optional: OpenAI-compatible endpoint (e.g. benchmarks/stub_openai.py)
+    
+    # LLM Call Policy
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "90"))  # Seconds per completion attempt
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))  # Retries on 429/5xx/timeouts
+    LLM_BACKOFF_BASE = 1.0  # First retry delay in seconds, doubled each retry
+    LLM_HEDGE = os.getenv("LLM_HEDGE", "true").lower() == "true"  # Duplicate calls slower than p95
+    LLM_MAX_CONTINUATIONS = int(os.getenv("LLM_MAX_CONTINUATIONS", "2"))  # Follow-ups for responses cut off at max_tokens
+    ADAPTIVE_MAX_TOKENS = os.getenv("ADAPTIVE_MAX_TOKENS", "true").lower() == "true"  # Size max_tokens from trip length and history
+    COMPACT_HISTORY = os.getenv("COMPACT_HISTORY", "true").lower() == "true"  # Digest already-read messages between agent turns
+    COMPACT_MIN_TOKENS = int(os.getenv("COMPACT_MIN_TOKENS", "150"))  # Smaller messages are re-sent as is
+    LLM_TPM = int(os.getenv("LLM_TPM", "0"))  # Tokens per minute across all LLM calls (0 = no limit)
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))  # LLM calls in flight at once (0 = no limit)
+    LLM_SHARES = os.getenv("LLM_SHARES", "interactive=0.6,speculative=0.1,batch=0.3")  # Token shares per priority class
     
     # Feature Flags
     ENABLE_CACHE = True
     CACHE_TTL = 3600  # 1 hour
+    COMPRESS_CACHE = os.getenv("COMPRESS_CACHE", "true").lower() == "true"  # Intern and zlib-compress cached plans and stage outputs
+    BLOB_HOT_ITEMS = int(os.getenv("BLOB_HOT_ITEMS", "256"))  # Recently read texts kept decompressed
     
     # Swarm Configuration
     MAX_TURNS = 20
+    PRUNE_CONTEXT = os.getenv("PRUNE_CONTEXT", "true").lower() == "true"  # Send synthesis only what each section needs
+    SYNTHESIS_MODE = os.getenv("SYNTHESIS_MODE", "sections")  # "sections" (4 concurrent writers) or "single" (supervisor)
+    VALIDATE_PLANS = os.getenv("VALIDATE_PLANS", "true").lower() == "true"  # Check plans and fix defects with small calls
+    
+    # Background Jobs
+    PLANNER_WORKERS = int(os.getenv("PLANNER_WORKERS", "2"))  # Concurrent plan generations per process
+    REDIS_URL = os.getenv("REDIS_URL", "")  # Optional: shared job queue (any Redis-compatible server)
+    JOB_TTL = 24 * 3600  # Keep finished jobs for 1 day
+    JOB_POLL_INTERVAL = 1.0  # Seconds between UI progress refreshes
+    SPECULATIVE_RESEARCH = os.getenv("SPECULATIVE_RESEARCH", "true").lower() == "true"  # Research while the form is filled in
+    SPECULATIVE_WORKERS = int(os.getenv("SPECULATIVE_WORKERS", "1"))  # Concurrent speculative research calls
+    
+    # Degradation Under Overload
+    DEGRADE_QUEUE_DEPTH = int(os.getenv("DEGRADE_QUEUE_DEPTH", "8"))  # Waiting plan jobs per degradation step (0 = ignore)
+    DEGRADE_P95_SECONDS = float(os.getenv("DEGRADE_P95_SECONDS", "90"))  # Plan latency p95 per degradation step (0 = ignore)
+    DEGRADE_WINDOW_SECONDS = float(os.getenv("DEGRADE_WINDOW_SECONDS", "300"))  # Plan latencies older than this drop out of p95
+    DEGRADE_LADDER = os.getenv("DEGRADE_LADDER", "fast_model,skip_recommendation,similar_plan")  # Mildest first ("" = never)
+    FAST_MODEL = os.getenv("FAST_MODEL", "gpt-4o-mini")  # Specialist model in the fast_model step
+    
+    # Destination Gazetteer
+    GAZETTEER_PATH = os.getenv(
+        "GAZETTEER_PATH",
+        os.path.join(os.path.dirname(__file__), "..", "..", "data", "cities.tsv")
+    )  # Empty string keeps destinations as typed
+
+    # Plan Store
+    PLAN_DB_PATH = os.getenv(
+        "PLAN_DB_PATH",
+        os.path.join(os.path.dirname(__file__), "..", "..", "data", "plans.db")
+    )  # Empty string disables persistence
+    PLAN_CACHE_WARM_LIMIT = 200  # Recent plans loaded into the plan cache on startup
+    PLAN_CACHE_WARM_AGE = 24 * 3600  # Only warm from plans generated within this many seconds
+    STAGE_CACHE_TTL = 24 * 3600  # Persisted research/recommendation outputs are reused this long
     
     @classmethod
     def validate(cls):
@@ -0,0 +1,271 @@
+"""Rule-based content filter applied to generated plans"""
+
+import re
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from src.models import TravelPlan
+from src.plan_ir import Attraction, Hotel, ItineraryDay, PlanIR, PlanSection, Record, split_items
+
+
+# Venues and experiences excluded per content filter mode
+EXCLUDED_TERMS: Dict[str, Tuple[str, ...]] = {
+    "family_friendly": (
+        "bar", "bars", "wine bar", "wine bars", "rooftop bar", "rooftop bars",
+        "cocktail bar", "cocktail bars", "cocktail lounge", "cocktail lounges",
+        "cocktail", "cocktails", "pub", "pubs", "pub crawl", "speakeasy",
+        "nightclub", "nightclubs", "night club", "night clubs", "nightlife",
+        "casino", "casinos", "gambling", "strip club", "strip clubs",
+        "gentlemen's club", "adult entertainment", "burlesque", "cabaret",
+        "red light district", "wine tasting", "wine tastings", "beer hall",
+        "beer garden", "brewery", "breweries", "brewery tour", "distillery",
+        "sake tasting", "jazz club", "jazz clubs", "happy hour",
+    ),
+    "adults_only": (),
+}
+
+# Food counters that are called bars ("Sushi bar", "Tapas bars")
+FOOD_BARS: Tuple[str, ...] = (
+    "sushi", "tapas", "pintxos", "pinchos", "oyster", "raw", "noodle", "ramen",
+    "soba", "poke", "taco", "sandwich", "breakfast", "soup", "yogurt",
+)
+
+# Harmless phrases that contain an excluded term
+ALLOWED_TERMS: Tuple[str, ...] = (
+    "snack bar", "juice bar", "salad bar", "milk bar", "candy bar",
+    "chocolate bar", "granola bar", "ice cream bar", "dessert bar",
+    "coffee bar", "espresso bar", "mini bar", "minibar", "bar mitzvah",
+    "bar-b-q", "mocktail", "mocktails", "pub-style", "bar harbor",
+    *(f"{food} {bar}" for food in FOOD_BARS for bar in ("bar", "bars")),
+)
+
+# A match right after one of these words is not a venue ("no bars", "avoid the casino")
+_NEGATION = re.compile(
+    r"\b(?:no|avoid|avoids|avoiding|without|excludes?|excluding|skip)\s+(?:(?:the|any|a|an)\s+)?$",
+    re.IGNORECASE
+)
+
+# ...and neither is one listed after a negated match ("no bars or nightclubs")
+_NEGATED_LIST = re.compile(r"(?:\s*(?:,|/|&|\bor\b|\band\b|\bnor\b))+\s*(?:(?:the|any)\s+)?", re.IGNORECASE)
+
+# Sections whose removed items are sent back for regeneration
+ITEM_SECTIONS = ("places_to_stay", "activities")
+
+
+@dataclass(frozen=True, slots=True)
+class FlaggedItem:
+    """An item removed from the plan by the content filter"""
+
+    section: str
+    text: str
+    terms: Tuple[str, ...]
+    whole_item: bool = False
+
+
+class ContentFilter:
+    """Compiled keyword matcher for one content filter mode"""
+
+    def __init__(self, excluded: Tuple[str, ...], allowed: Tuple[str, ...] = ALLOWED_TERMS):
+        """
+        Build the matcher
+
+        Args:
+            excluded: Terms that make an item inappropriate
+            allowed: Longer phrases that override an excluded term
+        """
+        self.pattern = self._compile(excluded, allowed) if excluded else None
+
+    @staticmethod
+    def _compile(excluded: Tuple[str, ...], allowed: Tuple[str, ...]) -> Pattern:
+        """Compile all terms into one alternation (allowed first, longest first)"""
+        def alternation(terms):
+            ordered = sorted({term.lower() for term in terms}, key=len, reverse=True)
+            return "|".join(re.escape(term) for term in ordered)
+
+        return re.compile(
+            rf"\b(?:(?P<allow>{alternation(allowed)})|(?P<block>{alternation(excluded)}))\b",
+            re.IGNORECASE,
+        )
+
+    def scan(self, text: str) -> Tuple[str, ...]:
+        """
+        Find excluded terms in text
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Distinct excluded terms found (empty if the text is clean)
+        """
+        if self.pattern is None:
+            return ()
+
+        found = []
+        negated_end = -1  # End of the last negated match, for lists of them
+        for match in self.pattern.finditer(text):
+            term = match.group("block")
+            if term is None:
+                continue
+            line_start = text.rfind("\n", 0, match.start()) + 1
+            if _NEGATION.search(text, line_start, match.start()) or (
+                negated_end >= line_start and _NEGATED_LIST.fullmatch(text, negated_end, match.start())
+            ):
+                negated_end = match.end()
+                continue
+            term = term.lower()
+            if term not in found:
+                found.append(term)
+        return tuple(found)
+
+
+# Matchers are compiled once per mode
+_FILTERS: Dict[str, ContentFilter] = {}
+
+
+def get_content_filter(mode: str) -> ContentFilter:
+    """Get the compiled filter for a content filter mode"""
+    content_filter = _FILTERS.get(mode)
+    if content_filter is None:
+        content_filter = ContentFilter(EXCLUDED_TERMS.get(mode, ()))
+        _FILTERS[mode] = content_filter
+    return content_filter
+
+
+def _filter_lines(text: str, content_filter: ContentFilter, section: str, flagged: List[FlaggedItem]) -> str:
+    """Drop offending lines from text, recording each removed line"""
+    kept = []
+    for line in text.split("\n"):
+        terms = content_filter.scan(line)
+        if terms:
+            flagged.append(FlaggedItem(section=section, text=line.strip(), terms=terms))
+        else:
+            kept.append(line)
+    return "\n".join(kept)
+
+
+def _filter_block(block: Record, content_filter: ContentFilter, section: str,
+                  flagged: List[FlaggedItem]) -> Optional[Record]:
+    """
+    Filter one IR block
+
+    Returns:
+        The block (possibly with lines removed), or None to drop it
+    """
+    if not content_filter.scan(block.raw):
+        return block
+
+    # Attractions, and hotels that are themselves a venue, are removed as a whole;
+    # a hotel merely listing a bar among its amenities only loses that line
+    title = block.raw.strip().split("\n", 1)[0]
+    if isinstance(block, Attraction) or (isinstance(block, Hotel) and content_filter.scan(title)):
+        flagged.append(FlaggedItem(
+            section=section,
+            text=block.raw.strip(),
+            terms=content_filter.scan(block.raw),
+            whole_item=True,
+        ))
+        return None
+
+    if isinstance(block, ItineraryDay):
+        slots = [
+            replace(slot, raw=_filter_lines(slot.raw, content_filter, section, flagged))
+            for slot in block.slots
+        ]
+        intro = block.intro
+        if intro is not None:
+            intro = _filter_lines(intro, content_filter, section, flagged)
+        return replace(block, slots=slots, intro=intro)
+
+    raw = _filter_lines(block.raw, content_filter, section, flagged)
+    return replace(block, raw=raw) if raw.strip() else None
+
+
+def filter_ir(ir: PlanIR, mode: str) -> Tuple[PlanIR, List[FlaggedItem]]:
+    """
+    Apply the content filter to a structured plan
+
+    Args:
+        ir: Structured plan (left unmodified)
+        mode: Content filter mode (family_friendly/adults_only)
+
+    Returns:
+        Filtered PlanIR (the same object if nothing was removed) and removed items
+    """
+    content_filter = get_content_filter(mode)
+    if content_filter.pattern is None:
+        return ir, []
+
+    updates = {}
+    flagged = []
+    for section in ir.sections():
+        before = len(flagged)
+        blocks = [
+            filtered for filtered in (
+                _filter_block(block, content_filter, section.name, flagged)
+                for block in section.blocks
+            )
+            if filtered is not None
+        ]
+        if len(flagged) > before:
+            updates[section.name] = PlanSection(section.name, blocks)
+
+    if not updates:
+        return ir, []
+    return replace(ir, **updates), flagged
+
+
+def filter_plan(plan: TravelPlan, mode: str) -> Tuple[TravelPlan, List[FlaggedItem]]:
+    """
+    Apply the content filter to every section of a plan
+
+    Args:
+        plan: Parsed travel plan
+        mode: Content filter mode (family_friendly/adults_only)
+
+    Returns:
+        Filtered plan (the same object if nothing was removed) and removed items
+    """
+    ir, flagged = filter_ir(plan.ir, mode)
+    if not flagged:
+        return plan, []
+    return TravelPlan.from_ir(ir), flagged
+
+
+def filter_text(text: str, mode: str) -> str:
+    """
+    Filter free-form item markdown (e.g. regenerated replacements)
+
+    Args:
+        text: Markdown containing numbered items
+        mode: Content filter mode
+
+    Returns:
+        Text with offending items removed
+    """
+    content_filter = get_content_filter(mode)
+    if content_filter.pattern is None:
+        return text
+    return "\n".join(item for item in split_items(text) if not content_filter.scan(item)).strip()
+
+
+def build_regeneration_request(section: str, flagged: List[FlaggedItem], mode: str) -> str:
+    """
+    Build a prompt asking for replacements of removed items only
+
+    Args:
+        section: Section the items were removed from
+        flagged: Removed items for that section
+        mode: Content filter mode
+
+    Returns:
+        Prompt for the recommendation agent
+    """
+    removed = "\n\n".join(item.text for item in flagged)
+    terms = sorted({term for item in flagged for term in item.terms})
+    return f"""The following {len(flagged)} item(s) were removed from the "{section.replace('_', ' ')}" section because they violate the {mode} content filter ({', '.join(terms)}):
+
+{removed}
+
+Write exactly {len(flagged)} replacement item(s) in the same markdown format, suitable for {mode}.
+Do not repeat the removed items. Output only the replacement items.
+"""
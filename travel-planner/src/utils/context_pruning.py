@@ -0,0 +1,208 @@
+"""Context pruning between specialist agents and synthesis
+
+The supervisor only needs, per plan section, the parts of each specialist's
+output that feed it: hotel lines from Research and Budget for Places to
+Stay, attractions from Research and Recommendation plus food and activity
+costs from Budget for Activities, and so on. prune_context() splits each
+output into items, routes them to the sections they're relevant to, drops
+the rest (weather, etiquette, hand-off chatter) and removes attractions
+listed by both Research and Recommendation (under any of their names), so
+the synthesis prompt stops growing with every specialist's full markdown.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from src.plan_ir import SECTION_NAMES, item_title, split_items
+from src.utils.entity_dedupe import EntityIndex
+
+
+# Which specialists feed each plan section, in priority order
+SECTION_SOURCES = {
+    "places_to_stay": ("research", "budget"),
+    "activities": ("research", "recommendation", "budget"),  # Budget: food and activity costs
+    "transportation": ("research", "budget"),
+    "itinerary": ("itinerary",),
+}
+
+SECTION_LABELS = {
+    "places_to_stay": "PLACES TO STAY",
+    "activities": "ACTIVITIES",
+    "transportation": "TRANSPORTATION",
+    "itinerary": "ITINERARY",
+}
+
+_SECTION_TERMS = {
+    "places_to_stay": re.compile(
+        r"\b(?:hotels?|hostels?|inns?|resorts?|accommodations?|lodging|suites?|guest ?houses?|"
+        r"b&b|apartments?|airbnb|per night|nightly|where to stay|neighbou?rhoods?)\b",
+        re.IGNORECASE
+    ),
+    "activities": re.compile(
+        r"\b(?:museums?|galler(?:y|ies)|tours?|parks?|gardens?|markets?|temples?|shrines?|cathedrals?|"
+        r"churche?s?|palaces?|castles?|towers?|landmarks?|attractions?|monuments?|squares?|beach(?:es)?|"
+        r"cruises?|shows?|festivals?|events?|nightlife|restaurants?|caf[eé]s?|food|dining|cuisine|"
+        r"experiences?|things to do|must[- ]see|sights?|activit(?:y|ies))\b",
+        re.IGNORECASE
+    ),
+    "transportation": re.compile(
+        r"\b(?:airports?|flights?|airlines?|metro|subway|underground|bus(?:es)?|trains?|rail|trams?|"
+        r"taxis?|uber|lyft|rideshare|ferr(?:y|ies)|bikes?|transit|transport(?:ation)?|shuttle|"
+        r"car rental|day pass|getting (?:there|around))\b|\([A-Z]{3}\)",
+        re.IGNORECASE
+    ),
+}
+
+# Sources whose output is a breakdown of one-line facts, routed line by line
+LINE_ROUTED_SOURCES = ("budget",)
+
+_HANDOFF = re.compile(r"^.*TRANSFER_TO_SUPERVISOR.*$\n?", re.MULTILINE)
+_BULLET_NAME = re.compile(r"^\s*[-*•]\s*(?:\*\*)?([^*:\n]+?)(?:\*\*)?\s*(?::|\s[-–—]\s|$)")
+_HEADING_ONLY = re.compile(r"^\s*(?:#{1,6}\s.*|\*\*[^*\n]+\*\*:?)\s*$")
+_MARKDOWN_HEADING = re.compile(r"^\s*#{1,6}\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English prose)"""
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class PrunedContext:
+    """Specialist findings routed to the plan sections that use them"""
+
+    sections: Dict[str, str]
+    duplicates_removed: int = 0
+    dropped_items: int = 0
+    source_tokens: Dict[str, int] = field(default_factory=dict)
+
+    def to_prompt(self) -> str:
+        """Findings grouped by the section they feed"""
+        return "\n\n".join(
+            f"--- FOR {SECTION_LABELS[name]} ---\n{self.sections[name]}"
+            for name in SECTION_NAMES
+            if self.sections.get(name)
+        )
+
+
+def _sections_for(block: str) -> List[str]:
+    """
+    Plan sections an item is relevant to
+
+    The item's title decides when it names a topic ("## Airports", "**Hotel
+    Lumen**"); otherwise the section whose terms appear most in the body.
+    """
+    title = item_title(block)
+    by_title = [name for name, terms in _SECTION_TERMS.items() if terms.search(title)]
+    if by_title:
+        return by_title
+
+    counts = {name: len(terms.findall(block)) for name, terms in _SECTION_TERMS.items()}
+    best = max(counts.values())
+    return [name for name, count in counts.items() if count == best] if best else []
+
+
+def _dedupe_attractions(block: str, seen: EntityIndex) -> Tuple[str, int]:
+    """
+    Drop an attraction item, or bullet lines within it, already listed by another agent
+
+    Names are matched fuzzily ("Louvre" / "Musée du Louvre"), see entity_dedupe
+
+    Returns:
+        (remaining text, number of attractions removed)
+    """
+    lines = block.split("\n")
+    title = item_title(block)
+
+    # Item with its own details ("**3. Louvre Museum**" + bullets)
+    if title.strip() and not _BULLET_NAME.match(lines[0]) and not _is_list_heading(lines[0]):
+        if seen.seen(title):
+            return "", 1
+        return block, 0
+
+    # A heading followed by a list of attractions: dedupe line by line
+    kept, removed = [], 0
+    for line in lines:
+        match = _BULLET_NAME.match(line)
+        if match:
+            if seen.seen(match.group(1)):
+                removed += 1
+                continue
+        kept.append(line)
+    return "\n".join(kept), removed
+
+
+def _is_list_heading(line: str) -> bool:
+    """A heading that introduces a list ("## Top Attractions") rather than naming one item"""
+    return bool(_HEADING_ONLY.match(line)) and bool(re.search(
+        r"\b(?:top|popular|must|best|things|attractions|activities|sights|recommendations?|restaurants|"
+        r"dining|experiences|events)\b",
+        line,
+        re.IGNORECASE
+    ))
+
+
+def prune_context(stage_outputs: Dict[str, str]) -> PrunedContext:
+    """
+    Route specialist outputs to the plan sections that need them
+
+    Args:
+        stage_outputs: Specialist stage name to agent output
+
+    Returns:
+        PrunedContext with one compact findings block per section
+    """
+    routed: Dict[str, List[str]] = {name: [] for name in SECTION_NAMES}
+    seen_attractions = EntityIndex()
+    duplicates = 0
+    dropped = 0
+
+    # Itinerary output is used as a whole, without hand-off chatter
+    itinerary = _HANDOFF.sub("", stage_outputs.get("itinerary", "")).strip()
+    if itinerary:
+        routed["itinerary"].append(f"[Itinerary Agent]\n{itinerary}")
+
+    for source in ("research", "recommendation", "budget"):
+        text = _HANDOFF.sub("", stage_outputs.get(source, "")).strip()
+        if not text:
+            continue
+
+        per_section: Dict[str, List[str]] = {name: [] for name in SECTION_NAMES}
+        heading_sections: List[str] = []
+        units = text.split("\n") if source in LINE_ROUTED_SOURCES else split_items(text)
+        for block in units:
+            block = block.strip()
+            if not block:
+                continue
+            # Items that don't say what they are ("3. Montmartre") belong to their heading's topic
+            sections = _sections_for(block)
+            if _MARKDOWN_HEADING.match(block):
+                heading_sections = sections
+            elif not sections:
+                sections = heading_sections
+            targets = [name for name in sections if source in SECTION_SOURCES[name]]
+            if not targets:
+                dropped += 1
+                continue
+            for name in targets:
+                if name == "activities" and source not in LINE_ROUTED_SOURCES:
+                    # Cost lines ("Louvre entry: $22") aren't attraction listings; keep them all
+                    kept, removed = _dedupe_attractions(block, seen_attractions)
+                    duplicates += removed
+                    if kept.strip():
+                        per_section[name].append(kept)
+                else:
+                    per_section[name].append(block)
+
+        separator = "\n" if source in LINE_ROUTED_SOURCES else "\n\n"
+        for name, blocks in per_section.items():
+            if blocks:
+                routed[name].append(f"[{source.capitalize()} Agent]\n" + separator.join(blocks))
+
+    return PrunedContext(
+        sections={name: "\n\n".join(parts) for name, parts in routed.items() if parts},
+        duplicates_removed=duplicates,
+        dropped_items=dropped,
+        source_tokens={source: estimate_tokens(text) for source, text in stage_outputs.items()},
+    )
@@ -0,0 +1,140 @@
+"""Graceful degradation under overload
+
+When plan jobs pile up or plans get slow, an interactive request would
+otherwise sit in the queue until it times out. OverloadMonitor turns the
+current load into a list of degradation steps taken from a configurable
+ladder (DEGRADE_LADDER), one more step for each multiple of a threshold
+the load reaches:
+
+- fast_model: specialists run on Config.FAST_MODEL
+- skip_recommendation: no Recommendation agent; activities come from the
+  destination research only
+- similar_plan: serve a saved plan for the same destination and content
+  filter with a close trip length, without any LLM calls
+
+Load is the number of plan jobs waiting for a worker (DEGRADE_QUEUE_DEPTH)
+and the p95 of plan response times over the last DEGRADE_WINDOW_SECONDS
+(DEGRADE_P95_SECONDS). Degraded responses are recorded too, and old ones
+age out, so p95 falls back once a burst of slow plans is over. Only
+interactive plans degrade; warm-up plans are cached for others and stay
+complete. Degraded plans say so in TravelPlan.degradation and the UI, and
+are never served from the plan cache to later requests.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.utils.config import Config
+
+
+DEGRADATION_STEPS = ("fast_model", "skip_recommendation", "similar_plan")
+
+# Shown to the user for each step applied
+DEGRADATION_NOTES = {
+    "fast_model": "specialist agents used a faster model",
+    "skip_recommendation": "activities were planned from destination research only",
+    "similar_plan": "this is a saved plan for a similar trip",
+}
+
+MAX_DAY_DIFFERENCE = 1  # Trip length difference a similar plan may have
+
+
+def parse_ladder(spec: str) -> Tuple[str, ...]:
+    """Parse "fast_model,skip_recommendation,similar_plan" (mildest first)"""
+    steps = tuple(filter(None, (step.strip() for step in spec.split(","))))
+    unknown = [step for step in steps if step not in DEGRADATION_STEPS]
+    if unknown:
+        raise ValueError(f"Unknown degradation step(s) in DEGRADE_LADDER: {', '.join(unknown)}")
+    return steps
+
+
+@dataclass
+class LoadSnapshot:
+    """Load signals at the start of a plan request"""
+
+    waiting_jobs: int
+    latency_p95: float
+    pressure: float  # Highest signal as a multiple of its threshold
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "latency_p95": round(self.latency_p95, 2), "pressure": round(self.pressure, 2)}
+
+
+class OverloadMonitor:
+    """Picks degradation steps from queue depth and plan latency"""
+
+    def __init__(self, queue_threshold: int, p95_threshold: float, ladder: Tuple[str, ...],
+                 window: int = 50, min_samples: int = 5, window_seconds: float = 300.0):
+        """
+        Args:
+            queue_threshold: Waiting plan jobs that count as overload (0 = ignore the queue)
+            p95_threshold: Plan latency p95 in seconds that counts as overload (0 = ignore latency)
+            ladder: Steps to apply in order as load rises
+            window: Recent plan latencies kept
+            min_samples: Latencies needed before p95 counts
+            window_seconds: Latencies older than this no longer count
+        """
+        self.queue_threshold = queue_threshold
+        self.p95_threshold = p95_threshold
+        self.ladder = ladder
+        self.min_samples = min_samples
+        self.window_seconds = window_seconds
+        self._latencies: Deque[Tuple[float, float]] = deque(maxlen=window)  # (monotonic time, seconds)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "OverloadMonitor":
+        return cls(
+            queue_threshold=Config.DEGRADE_QUEUE_DEPTH,
+            p95_threshold=Config.DEGRADE_P95_SECONDS,
+            ladder=parse_ladder(Config.DEGRADE_LADDER),
+            window_seconds=Config.DEGRADE_WINDOW_SECONDS,
+        )
+
+    def record_latency(self, seconds: float):
+        """Record how long a plan response took (generated or served degraded)"""
+        with self._lock:
+            self._latencies.append((time.monotonic(), seconds))
+
+    def snapshot(self) -> LoadSnapshot:
+        from src.utils.jobs import waiting_jobs
+
+        waiting = waiting_jobs()
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            while self._latencies and self._latencies[0][0] < cutoff:
+                self._latencies.popleft()
+            ordered = sorted(seconds for _, seconds in self._latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if len(ordered) >= self.min_samples else 0.0
+        pressure = max(
+            waiting / self.queue_threshold if self.queue_threshold else 0.0,
+            p95 / self.p95_threshold if self.p95_threshold else 0.0,
+        )
+        return LoadSnapshot(waiting_jobs=waiting, latency_p95=p95, pressure=pressure)
+
+    def steps(self, snapshot: Optional[LoadSnapshot] = None) -> List[str]:
+        """
+        Degradation steps for the current load
+
+        Returns:
+            The first floor(pressure) steps of the ladder (empty below every threshold)
+        """
+        snapshot = snapshot or self.snapshot()
+        return list(self.ladder[:min(len(self.ladder), math.floor(snapshot.pressure))])
+
+
+_monitor: Optional[OverloadMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_overload_monitor() -> OverloadMonitor:
+    """Process-wide overload monitor (created on first use)"""
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = OverloadMonitor.from_config()
+        return _monitor
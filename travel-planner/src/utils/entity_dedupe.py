@@ -0,0 +1,188 @@
+"""Fuzzy deduplication of attraction names across agent outputs
+
+Research and Recommendation each list 10-15 attractions and name the same
+place differently: "Louvre", "Louvre Museum", "Musée du Louvre", "The
+Colosseum" / "Coloseum". Exact matching on normalized names misses these,
+so duplicates reached the synthesis prompt (paid for in tokens and left to
+the model to merge) and the final Activities list.
+
+EntityIndex clusters names that refer to the same place:
+
+- a name's key is its normalized core: accents, articles and connecting
+  words removed ("the", "du", "de la"), and place-type words ("museum",
+  "musée", "museo", "park", "parc", ...) taken out into a set of types
+- names with the same core match unless their types conflict: "Louvre"
+  and "Musée du Louvre" match, "Central Park" and "Central Museum" don't
+- otherwise, cores within a small edit distance match (typos and
+  spelling variants: "Coloseum", "Ziniin"). Candidates come from a
+  deletion-neighbourhood index (each core and every copy of it with one
+  character deleted), so a lookup costs a few dict probes per character of
+  the name, however many names are indexed, and only the candidates get a
+  full edit-distance check
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from src.plan_ir import normalize_name
+
+
+MIN_FUZZY_CHARS = 5  # Shorter cores only match exactly
+LONG_CORE_CHARS = 12  # Cores this long may differ by two edits, shorter ones by one
+
+STOPWORDS = frozenset({
+    "the", "a", "an", "of", "and", "at", "in", "on",
+    "de", "du", "des", "la", "le", "les", "l", "d", "el", "los", "las", "il", "di", "del", "della", "da", "do",
+    "dos", "das", "der", "die", "von", "st",
+})
+
+# Place-type words in a few languages, to one canonical type each
+PLACE_TYPES = {
+    **dict.fromkeys(("museum", "museums", "musee", "museo", "museu", "museet", "muzeum"), "museum"),
+    **dict.fromkeys(("gallery", "galleries", "galleria", "galerie", "galeria"), "gallery"),
+    **dict.fromkeys(("cathedral", "cathedrale", "catedral", "duomo", "dom"), "cathedral"),
+    **dict.fromkeys(("church", "eglise", "iglesia", "chiesa", "kirche", "basilica", "basilique"), "church"),
+    **dict.fromkeys(("palace", "palais", "palazzo", "palacio", "palast"), "palace"),
+    **dict.fromkeys(("castle", "chateau", "castello", "castillo", "schloss", "burg"), "castle"),
+    **dict.fromkeys(("park", "parc", "parque", "parco"), "park"),
+    **dict.fromkeys(("garden", "gardens", "jardin", "jardins", "giardino", "giardini", "garten"), "garden"),
+    **dict.fromkeys(("market", "marche", "mercado", "mercato", "markt"), "market"),
+    **dict.fromkeys(("square", "plaza", "piazza", "platz", "praca"), "square"),
+    **dict.fromkeys(("bridge", "pont", "ponte", "puente", "brucke"), "bridge"),
+    **dict.fromkeys(("tower", "torre", "turm"), "tower"),
+    **dict.fromkeys(("temple", "templo", "tempio"), "temple"),
+    **dict.fromkeys(("shrine", "jinja", "jingu"), "shrine"),
+    **dict.fromkeys(("fountain", "fontana", "fontaine", "fuente", "brunnen"), "fountain"),
+}
+
+
+@dataclass(frozen=True)
+class NameKey:
+    """What a name is compared by"""
+
+    core: str  # Distinctive words, in order
+    types: FrozenSet[str]  # Canonical place types mentioned
+
+    def compatible(self, other: "NameKey") -> bool:
+        """Types don't conflict (either has none, or they share one)"""
+        return not self.types or not other.types or bool(self.types & other.types)
+
+
+@lru_cache(maxsize=8192)
+def name_key(name: str) -> NameKey:
+    """Core words and place types of a name"""
+    words = normalize_name(name).split()
+    types = frozenset(PLACE_TYPES[word] for word in words if word in PLACE_TYPES)
+    core = [word for word in words if word not in STOPWORDS and word not in PLACE_TYPES]
+    # A name that is only generic words ("The Museum") keeps them as its core
+    return NameKey(core=" ".join(core) or " ".join(words), types=types)
+
+
+def deletions(core: str) -> Set[str]:
+    """A core and every string one deleted character away from it"""
+    return {core, *(core[:i] + core[i + 1:] for i in range(len(core)))}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Edit distance counting an adjacent transposition as one edit
+
+    Args:
+        a, b: Strings to compare
+        limit: Stop early once the distance is known to exceed this
+
+    Returns:
+        The distance, or limit + 1 if it's larger than limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if before is not None and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def allowed_edits(core: str) -> int:
+    """How many edits apart two names of this length may be and still match"""
+    if len(core) < MIN_FUZZY_CHARS:
+        return 0
+    return 2 if len(core) >= LONG_CORE_CHARS else 1
+
+
+class EntityIndex:
+    """Clusters of names that refer to the same place"""
+
+    def __init__(self):
+        self._keys: List[NameKey] = []  # Per entry
+        self._cluster: List[int] = []  # Per entry: cluster ID (the entry that started it)
+        self._by_core: Dict[str, List[int]] = {}
+        self._by_deletion: Dict[str, List[int]] = {}
+        self.names: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def find(self, name: str) -> Optional[int]:
+        """
+        Cluster a name belongs to, without adding it
+
+        Returns:
+            Cluster ID, or None for a new place
+        """
+        key = name_key(name)
+        for entry in self._by_core.get(key.core, ()):
+            if self._keys[entry].compatible(key):
+                return self._cluster[entry]
+        limit = allowed_edits(key.core)
+        if not limit:
+            return None
+
+        # Cores one edit apart (substitution, insertion, deletion or swap) share a
+        # deletion; so do some two edits apart, which is where long cores get their slack
+        candidates = {entry for variant in deletions(key.core) for entry in self._by_deletion.get(variant, ())}
+        best, best_distance = None, limit + 1
+        for entry in sorted(candidates):
+            other = self._keys[entry]
+            distance = edit_distance(key.core, other.core, min(limit, allowed_edits(other.core)))
+            if distance < best_distance and other.compatible(key):
+                best, best_distance = entry, distance
+        return self._cluster[best] if best is not None else None
+
+    def add(self, name: str) -> Tuple[int, bool]:
+        """
+        Add a name
+
+        Returns:
+            (cluster ID, True if the place was already in the index)
+        """
+        cluster = self.find(name)
+        entry = len(self.names)
+        key = name_key(name)
+        self.names.append(name)
+        self._keys.append(key)
+        self._cluster.append(entry if cluster is None else cluster)
+        self._by_core.setdefault(key.core, []).append(entry)
+        if allowed_edits(key.core):
+            for variant in deletions(key.core):
+                self._by_deletion.setdefault(variant, []).append(entry)
+        return self._cluster[entry], cluster is not None
+
+    def seen(self, name: str) -> bool:
+        """Add a name; True if it's a place already in the index"""
+        return self.add(name)[1]
+
+    def clusters(self) -> List[List[str]]:
+        """Names grouped by place, in first-seen order"""
+        groups: Dict[int, List[str]] = {}
+        for name, cluster in zip(self.names, self._cluster):
+            groups.setdefault(cluster, []).append(name)
+        return list(groups.values())
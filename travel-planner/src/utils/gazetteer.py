@@ -0,0 +1,213 @@
+"""Offline city gazetteer for destination names
+
+Users type the same destination many ways ("paris", "Paris, FR", "PARIS
+France", "Köln" / "Cologne"), and every spelling used to be its own plan,
+stage and search cache key. The gazetteer (data/cities.tsv, bundled) maps
+them to one city with a stable ID, a canonical display name and coordinates:
+
+- lookup() resolves a typed destination: exact names and aliases, then
+  "city, country" / "city country" where the country part must match the
+  city's country (code, name or common alias) or be another name of the
+  city ("New York, NY"). Anything else - a region, a country, a city that
+  isn't listed, "Paris, Texas" - resolves to None and the destination is
+  kept as typed
+- complete() lists cities whose name or alias starts with a prefix, most
+  populous first, for type-ahead
+
+Names are normalized (accents stripped, case folded, punctuation dropped)
+into one sorted key array: exact lookups are a dict hit and prefix search is
+a bisect into the array, both a few microseconds. The file is read once, on
+first use.
+"""
+
+import math
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.config import Config
+
+
+# Common names for countries beyond their code and gazetteer name
+COUNTRY_ALIASES = {
+    "US": ("usa", "united states of america", "america"),
+    "GB": ("uk", "great britain", "britain", "england", "scotland"),
+    "AE": ("uae", "emirates"),
+    "CZ": ("czechia",),
+    "KR": ("korea",),
+    "NL": ("holland",),
+    "TR": ("turkiye",),
+    "CH": ("swiss",),
+}
+
+
+def normalize(text: str) -> str:
+    """Accents stripped, case folded, punctuation to spaces, whitespace collapsed"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char)).casefold()
+    return " ".join("".join(char if char.isalnum() else " " for char in text).split())
+
+
+@dataclass(frozen=True)
+class City:
+    """One gazetteer entry"""
+
+    id: str  # Stable ID, e.g. "fr-paris"
+    name: str
+    country_code: str
+    country: str
+    latitude: float
+    longitude: float
+    population_k: int  # Metro population in thousands (ranks ambiguous names and suggestions)
+
+    @property
+    def display(self) -> str:
+        """Canonical destination name, e.g. "Paris, France" """
+        return self.name if self.name == self.country else f"{self.name}, {self.country}"
+
+    @property
+    def coordinates(self) -> Tuple[float, float]:
+        return self.latitude, self.longitude
+
+
+def distance_km(a: City, b: City) -> float:
+    """Great-circle distance between two cities"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (a.latitude, a.longitude, b.latitude, b.longitude))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+
+class Gazetteer:
+    """Name and prefix index over a list of cities"""
+
+    def __init__(self, cities: List[City], aliases: Optional[Dict[str, Tuple[str, ...]]] = None):
+        """
+        Args:
+            cities: Gazetteer entries
+            aliases: Alternative names per city ID
+        """
+        aliases = aliases or {}
+        self._by_id = {city.id: city for city in cities}
+        self._exact: Dict[str, List[City]] = {}  # Name, alias or display name -> cities, most populous first
+        self._countries: Dict[str, str] = {}  # Country name, code or alias -> country code
+        for city in sorted(cities, key=lambda city: -city.population_k):
+            for key in {normalize(city.name), normalize(city.display), *map(normalize, aliases.get(city.id, ()))}:
+                self._exact.setdefault(key, []).append(city)
+            for key in (city.country_code, city.country, *COUNTRY_ALIASES.get(city.country_code, ())):
+                self._countries[normalize(key)] = city.country_code
+        self._keys = sorted(self._exact)
+
+    @classmethod
+    def from_tsv(cls, path: str) -> "Gazetteer":
+        """
+        Load a gazetteer file
+
+        Columns: id, name, country code, country, latitude, longitude,
+        population in thousands, aliases (| separated, optional). Lines
+        starting with # are ignored.
+        """
+        cities, aliases = [], {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                fields = line.rstrip("\n").split("\t")
+                city = City(
+                    id=fields[0],
+                    name=fields[1],
+                    country_code=fields[2],
+                    country=fields[3],
+                    latitude=float(fields[4]),
+                    longitude=float(fields[5]),
+                    population_k=int(fields[6]),
+                )
+                cities.append(city)
+                if len(fields) > 7 and fields[7]:
+                    aliases[city.id] = tuple(fields[7].split("|"))
+        return cls(cities, aliases)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, city_id: str) -> Optional[City]:
+        return self._by_id.get(city_id)
+
+    def lookup(self, text: str) -> Optional[City]:
+        """
+        City a typed destination refers to
+
+        Args:
+            text: Destination as typed
+
+        Returns:
+            Matching city (the most populous one for an ambiguous name), or None
+        """
+        key = normalize(text)
+        matches = self._exact.get(key)
+        if matches:
+            return matches[0]
+
+        head, comma, qualifier = text.partition(",")
+        if comma:
+            return self._qualified(normalize(head), normalize(qualifier))
+        tokens = key.split()
+        for split in range(len(tokens) - 1, 0, -1):
+            city = self._qualified(" ".join(tokens[:split]), " ".join(tokens[split:]))
+            if city:
+                return city
+        return None
+
+    def _qualified(self, name: str, qualifier: str) -> Optional[City]:
+        """City called name in the country qualifier names (or that qualifier is another name of)"""
+        country_code = self._countries.get(qualifier)
+        same_city = {city.id for city in self._exact.get(qualifier, ())}
+        return next((city for city in self._exact.get(name, ())
+                     if city.country_code == country_code or city.id in same_city), None)
+
+    def complete(self, prefix: str, limit: int = 8) -> List[City]:
+        """
+        Cities with a name or alias starting with prefix
+
+        Args:
+            prefix: Text typed so far
+            limit: Most suggestions to return
+
+        Returns:
+            Matching cities, most populous first
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        found: Dict[str, City] = {}
+        index = bisect_left(self._keys, prefix)
+        while index < len(self._keys) and self._keys[index].startswith(prefix):
+            for city in self._exact[self._keys[index]]:
+                found.setdefault(city.id, city)
+            index += 1
+        return sorted(found.values(), key=lambda city: -city.population_k)[:limit]
+
+    def display_names(self) -> List[str]:
+        """Every city's canonical name, most populous first"""
+        return [city.display for city in sorted(self._by_id.values(), key=lambda city: -city.population_k)]
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Optional[Gazetteer]:
+    """Process-wide gazetteer (None when GAZETTEER_PATH is empty)"""
+    if not Config.GAZETTEER_PATH:
+        return None
+    return Gazetteer.from_tsv(Config.GAZETTEER_PATH)
+
+
+def canonical_destination(destination: str) -> Tuple[str, Optional[City]]:
+    """
+    Canonical name for a typed destination
+
+    Returns:
+        (the city's display name, city) when it resolves, else (destination stripped, None)
+    """
+    gazetteer = get_gazetteer()
+    city = gazetteer.lookup(destination) if gazetteer else None
+    return (city.display, city) if city else (destination.strip(), None)
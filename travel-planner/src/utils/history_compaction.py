@@ -0,0 +1,109 @@
+"""Conversation history compaction inside multi-turn agent runs
+
+Swarm resends the whole conversation on every turn of an agent's run, so
+specialist findings pasted into the first message, tool results and
+earlier agents' answers are paid for again on each later completion and
+input tokens grow quadratically with turns. compact_history() is the hook
+ResilientClient applies before every completion: once the agent has
+answered at least once, everything it already read (messages before its
+latest answer) is replaced with a digest of item names and their first
+detail line. The latest tool result and the agent's own latest answer are
+left alone, and the full text stays in the run's message history (and the
+stage cache) - only what is re-sent shrinks.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.plan_ir import item_title, split_items
+from src.utils.config import Config
+from src.utils.context_pruning import estimate_tokens
+
+
+# Findings pasted into stage and synthesis messages, up to the trip details
+_FINDINGS_BLOCK = re.compile(
+    r"^(?P<header>[A-Z][\w ]*? Agent findings:|SPECIALIST FINDINGS:)\n(?P<body>.*?)(?=\n\nTRIP:|\Z)",
+    re.MULTILINE | re.DOTALL
+)
+
+MAX_DIGEST_ITEMS = 30
+DETAIL_CHARS = 80
+
+
+def digest(text: str, source: str) -> str:
+    """
+    Compact stand-in for text an agent has already read
+
+    Args:
+        text: Full text (markdown findings, a tool result or an answer)
+        source: What the text was, for the digest's header
+
+    Returns:
+        Header line plus one "- name: first detail" line per item
+    """
+    lines = []
+    for block in split_items(text):
+        title = item_title(block)
+        if not title:
+            continue
+        detail = next((line.strip(" -*•") for line in block.split("\n")[1:] if line.strip(" -*•")), "")
+        lines.append(f"- {title}: {detail[:DETAIL_CHARS]}" if detail else f"- {title}")
+        if len(lines) >= MAX_DIGEST_ITEMS:
+            break
+    if not lines:
+        lines = [text.strip()[:DETAIL_CHARS * 3] + "…"]
+    header = f"[Digest of {source} (~{estimate_tokens(text):,} tokens, already read; full text kept in the run history)]"
+    return "\n".join([header, *lines])
+
+
+def _compact_findings(content: str, min_tokens: int) -> str:
+    def replace(match: re.Match) -> str:
+        body = match.group("body")
+        if estimate_tokens(body) < min_tokens:
+            return match.group(0)
+        return f"{match.group('header')}\n{digest(body, match.group('header').rstrip(':').lower())}"
+
+    return _FINDINGS_BLOCK.sub(replace, content)
+
+
+def compact_history(messages: List[Dict[str, Any]],
+                    min_tokens: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Replace what the agent already read with digests before the next turn
+
+    The input list and its messages aren't modified.
+
+    Args:
+        messages: Chat messages about to be sent
+        min_tokens: Smallest text worth compacting (default: Config.COMPACT_MIN_TOKENS)
+
+    Returns:
+        (messages to send, estimated prompt tokens saved)
+    """
+    min_tokens = Config.COMPACT_MIN_TOKENS if min_tokens is None else min_tokens
+    last_answer = max((i for i, message in enumerate(messages) if message.get("role") == "assistant"), default=None)
+    if last_answer is None:
+        return messages, 0  # First turn: nothing has been read yet
+
+    compacted = []
+    saved = 0
+    for i, message in enumerate(messages):
+        content = message.get("content")
+        role = message.get("role")
+        if i >= last_answer or not isinstance(content, str) or role == "system":
+            compacted.append(message)
+            continue
+
+        if role == "user":
+            new_content = _compact_findings(content, min_tokens)
+        elif estimate_tokens(content) >= min_tokens:
+            source = message.get("tool_name") or message.get("sender") or role
+            new_content = digest(content, f"{source} result" if role == "tool" else f"{source} answer")
+        else:
+            new_content = content
+
+        if new_content != content and estimate_tokens(new_content) < estimate_tokens(content):
+            saved += estimate_tokens(content) - estimate_tokens(new_content)
+            message = {**message, "content": new_content}
+        compacted.append(message)
+    return compacted, saved
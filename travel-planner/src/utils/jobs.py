@@ -0,0 +1,362 @@
+"""Background job queue for plan generation
+
+Jobs are submitted by kind ("plan", ...) with a JSON payload and run by a
+pool of worker threads. Job state lives in a backend: in-process memory by
+default, or Redis (any Redis-compatible server) when REDIS_URL is set, in
+which case jobs also survive app restarts and can be consumed by separate
+worker processes:
+
+    python -m src.utils.jobs --workers 4
+"""
+
+import json
+import queue
+import threading
+import time
+import traceback
+import uuid
+import weakref
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils.config import Config
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+# Handler: (payload, progress callback) -> JSON-compatible result
+JobHandler = Callable[[Dict[str, Any], Callable[[float, str], None]], Dict[str, Any]]
+
+_HANDLERS: Dict[str, JobHandler] = {}
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job when it has been cancelled"""
+
+
+@dataclass
+class Job:
+    """State of a background job"""
+
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    status: str = JOB_QUEUED
+    progress: float = 0.0
+    message: str = ""
+    result: Optional[Dict[str, Any]] = None
+    error: str = ""
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        """True once the job has completed, failed or been cancelled"""
+        return self.status in FINISHED_STATES
+
+    @property
+    def queue_seconds(self) -> float:
+        """Time spent waiting for a worker"""
+        return (self.started_at or time.time()) - self.created_at
+
+
+def register_handler(kind: str):
+    """
+    Register the function that runs jobs of a kind
+
+    Args:
+        kind: Job kind passed to JobQueue.submit
+    """
+    def decorator(handler: JobHandler) -> JobHandler:
+        _HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+
+class MemoryJobBackend:
+    """In-process job store and queue (local stand-in for Redis)"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._lock = threading.Lock()
+
+    def save(self, job: Job):
+        with self._lock:
+            self._jobs[job.id] = replace(job)
+
+    def load(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job else None
+
+    def update(self, job_id: str, **fields):
+        self.update_if(job_id, None, **fields)
+
+    def update_if(self, job_id: str, statuses: Optional[Tuple[str, ...]], **fields) -> bool:
+        """Update a job only while its status is one of statuses (None: any); True if it was updated"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or (statuses is not None and job.status not in statuses):
+                return False
+            self._jobs[job_id] = replace(job, **fields)
+            return True
+
+    def push(self, job_id: str):
+        self._queue.put(job_id)
+
+    def pop(self, timeout: float) -> Optional[str]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def prune(self, ttl: float):
+        """Forget finished jobs older than ttl seconds"""
+        cutoff = time.time() - ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished and (job.finished_at or 0) < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+class RedisJobBackend:
+    """Job store and queue in Redis (or any Redis-compatible server)"""
+
+    def __init__(self, url: str, ttl: int, prefix: str = "travel-planner"):
+        """
+        Connect to Redis
+
+        Args:
+            url: Redis URL (redis://host:port/db)
+            ttl: Seconds to keep job records
+            prefix: Key prefix
+        """
+        import redis
+
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._ttl = ttl
+        self._queue_key = f"{prefix}:queue"
+        self._job_prefix = f"{prefix}:job:"
+
+    def save(self, job: Job):
+        self._redis.set(self._job_prefix + job.id, json.dumps(asdict(job)), ex=self._ttl)
+
+    def load(self, job_id: str) -> Optional[Job]:
+        data = self._redis.get(self._job_prefix + job_id)
+        return Job(**json.loads(data)) if data else None
+
+    def update(self, job_id: str, **fields):
+        self.update_if(job_id, None, **fields)
+
+    def update_if(self, job_id: str, statuses: Optional[Tuple[str, ...]], **fields) -> bool:
+        """Update a job only while its status is one of statuses (None: any); True if it was updated"""
+        # Check and write under WATCH, so an update racing cancel() is retried on
+        # top of the cancellation (and then refused) instead of overwriting it
+        key = self._job_prefix + job_id
+
+        def apply(pipe) -> bool:
+            data = pipe.get(key)
+            if not data:
+                return False
+            job = Job(**json.loads(data))
+            if statuses is not None and job.status not in statuses:
+                return False
+            pipe.multi()
+            pipe.set(key, json.dumps(asdict(replace(job, **fields))), ex=self._ttl)
+            return True
+
+        return self._redis.transaction(apply, key, value_from_callable=True)
+
+    def push(self, job_id: str):
+        self._redis.rpush(self._queue_key, job_id)
+
+    def pop(self, timeout: float) -> Optional[str]:
+        item = self._redis.blpop([self._queue_key], timeout=max(1, int(timeout)))
+        return item[1] if item else None
+
+    def depth(self) -> int:
+        return self._redis.llen(self._queue_key)
+
+    def prune(self, ttl: float):
+        """Redis expires job records on its own"""
+
+
+class JobQueue:
+    """Submit jobs and run them on a pool of worker threads"""
+
+    def __init__(self, backend=None, workers: int = 2, start_workers: bool = True):
+        """
+        Initialize queue
+
+        Args:
+            backend: Job backend (default: in-memory)
+            workers: Number of worker threads
+            start_workers: Start workers now (False for submit-only clients)
+        """
+        self.backend = backend or MemoryJobBackend()
+        self.workers = workers
+        self._threads = []
+        self._stop = threading.Event()
+        if start_workers:
+            self.start()
+
+    def start(self):
+        """Start the worker threads"""
+        _running_queues.add(self)
+        for index in range(self.workers - len(self._threads)):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Ask worker threads to exit after their current job"""
+        self._stop.set()
+        _running_queues.discard(self)
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> str:
+        """
+        Queue a job
+
+        Args:
+            kind: Registered job kind
+            payload: JSON-compatible job input
+
+        Returns:
+            Job ID
+        """
+        job = Job(id=uuid.uuid4().hex, kind=kind, payload=payload, message="⏳ Waiting for a worker...")
+        self.backend.save(job)
+        self.backend.push(job.id)
+        return job.id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get current job state (None if unknown or expired)"""
+        return self.backend.load(job_id)
+
+    def cancel(self, job_id: str):
+        """Cancel a queued job, or stop a running one at its next progress update"""
+        self.backend.update_if(
+            job_id, (JOB_QUEUED, JOB_RUNNING), status=JOB_CANCELLED, finished_at=time.time(), message="Cancelled"
+        )
+
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker"""
+        return self.backend.depth()
+
+    def _work(self):
+        """Worker loop"""
+        while not self._stop.is_set():
+            job_id = self.backend.pop(timeout=1.0)
+            if job_id is None:
+                self.backend.prune(Config.JOB_TTL)
+                continue
+            self._run(job_id)
+
+    def _run(self, job_id: str):
+        """Run one job and record its outcome"""
+        job = self.backend.load(job_id)
+        if job is None or job.status != JOB_QUEUED:
+            return  # Cancelled or expired while queued
+
+        # Every transition is conditional on the status it starts from, so one
+        # racing cancel() can't be overwritten and a cancelled job never ends up done
+        handler = _HANDLERS.get(job.kind)
+        if handler is None:
+            self.backend.update_if(
+                job_id, (JOB_QUEUED,), status=JOB_FAILED, error=f"Unknown job kind: {job.kind}", finished_at=time.time()
+            )
+            return
+
+        if not self.backend.update_if(job_id, (JOB_QUEUED,), status=JOB_RUNNING, started_at=time.time()):
+            return  # Cancelled (or expired) since it was loaded
+
+        def progress(fraction: float, message: str):
+            if not self.backend.update_if(job_id, (JOB_RUNNING,), progress=fraction, message=message):
+                raise JobCancelled(job_id)
+
+        try:
+            result = handler(job.payload, progress)
+        except JobCancelled:
+            return
+        except Exception as e:
+            self.backend.update_if(
+                job_id,
+                (JOB_RUNNING,),
+                status=JOB_FAILED,
+                error=f"{e}\n\n{traceback.format_exc()}",
+                finished_at=time.time()
+            )
+            return
+
+        self.backend.update_if(
+            job_id, (JOB_RUNNING,), status=JOB_DONE, progress=1.0, result=result, finished_at=time.time()
+        )
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+_running_queues: "weakref.WeakSet[JobQueue]" = weakref.WeakSet()
+
+
+def waiting_jobs() -> int:
+    """Jobs waiting for a worker across the job queues this process runs"""
+    return sum(queue.depth() for queue in list(_running_queues))
+
+
+def create_backend():
+    """Redis backend if REDIS_URL is configured, otherwise in-memory"""
+    if Config.REDIS_URL:
+        return RedisJobBackend(Config.REDIS_URL, ttl=Config.JOB_TTL)
+    return MemoryJobBackend()
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Get the process-wide job queue (created on first use)
+
+    With a Redis backend and PLANNER_WORKERS=0 the app only submits jobs
+    and separate worker processes run them.
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(create_backend(), workers=Config.PLANNER_WORKERS)
+        return _queue
+
+
+if __name__ == "__main__":
+    import argparse
+
+    # Use the importable module (not __main__) so handlers registered by
+    # src.planner land in the same registry the workers read
+    import src.planner  # noqa: F401
+    from src.utils import jobs
+
+    parser = argparse.ArgumentParser(description="Run travel planner job workers")
+    parser.add_argument("--workers", type=int, default=max(Config.PLANNER_WORKERS, 1))
+    args = parser.parse_args()
+
+    if not Config.REDIS_URL:
+        parser.error("REDIS_URL must be set so workers share a queue with the app")
+
+    jobs.JobQueue(jobs.create_backend(), workers=args.workers)
+    print(f"Running {args.workers} job workers against {Config.REDIS_URL} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
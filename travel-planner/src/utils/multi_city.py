@@ -0,0 +1,119 @@
+"""Multi-city trips: inter-city transfers and merging per-leg plans
+
+A multi-city request (UserInput.legs) is planned as one single-destination
+request per leg, concurrently, so each leg hits the same research, stage
+and plan caches as a one-city trip would. This module turns the per-leg
+plans into one TravelPlan:
+
+- places to stay and activities are grouped under a line per leg
+- transportation starts with the transfers between cities (distance from
+  the gazetteer coordinates, a suggested mode and rough door-to-door time),
+  followed by each leg's local transport
+- itinerary days are renumbered to the whole trip, with a travel-day note
+  where a leg starts
+"""
+
+import math
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from src.models import TravelPlan, TripLeg, UserInput
+from src.plan_ir import ItineraryDay
+from src.utils.gazetteer import canonical_destination, distance_km
+
+
+# (up to km, mode, average km/h, fixed hours for stations/airports)
+TRANSFER_MODES = (
+    (300, "train or bus", 80, 0.5),
+    (700, "high-speed train or short flight", 180, 1.0),
+    (math.inf, "flight", 750, 3.0),
+)
+
+
+@dataclass
+class Transfer:
+    """Moving from one leg's city to the next"""
+
+    origin: str
+    destination: str
+    day: date  # First day of the next leg
+    distance_km: Optional[float]  # Great-circle distance (None if a city isn't in the gazetteer)
+    mode: str
+    hours: Optional[float]  # Rough door-to-door time
+
+    def to_markdown(self) -> str:
+        if self.distance_km is None:
+            return f"- **{self.origin} → {self.destination}** ({self.day:%a %b %d}): compare trains, buses and flights"
+        return (
+            f"- **{self.origin} → {self.destination}** ({self.day:%a %b %d}): ~{self.distance_km:,.0f} km, "
+            f"{self.mode} (about {self.hours:g} h door to door)"
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "day": self.day.isoformat()}
+
+
+def plan_transfers(legs: List[TripLeg]) -> List[Transfer]:
+    """Transfer between each pair of consecutive legs"""
+    transfers = []
+    for previous, leg in zip(legs, legs[1:]):
+        origin, destination = canonical_destination(previous.destination)[1], canonical_destination(leg.destination)[1]
+        distance = mode = hours = None
+        if origin and destination:
+            distance = distance_km(origin, destination)
+            _, mode, speed, overhead = next(entry for entry in TRANSFER_MODES if distance <= entry[0])
+            hours = round(distance / speed + overhead, 1)
+        transfers.append(Transfer(
+            origin=previous.destination,
+            destination=leg.destination,
+            day=leg.start_date,
+            distance_km=round(distance) if distance is not None else None,
+            mode=mode or "",
+            hours=hours,
+        ))
+    return transfers
+
+
+def _leg_line(leg: TripLeg) -> str:
+    return f"📍 **{leg.destination}** · {leg.start_date:%b %d} – {leg.end_date:%b %d} ({leg.duration_days} days)"
+
+
+def merge_leg_plans(user_input: UserInput, plans: List[TravelPlan],
+                    transfers: Optional[List[Transfer]] = None) -> TravelPlan:
+    """
+    Combine the plans of a multi-city trip's legs into one plan
+
+    Args:
+        user_input: The multi-city request
+        plans: One plan per leg, in leg order
+        transfers: plan_transfers() output (computed if not given)
+
+    Returns:
+        TravelPlan for the whole trip
+    """
+    legs = user_input.legs
+    transfers = plan_transfers(legs) if transfers is None else transfers
+
+    def grouped(section: str) -> str:
+        return "\n\n".join(f"{_leg_line(leg)}\n\n{getattr(plan, section)}" for leg, plan in zip(legs, plans))
+
+    transport = ["🚆 **Between cities**", *(transfer.to_markdown() for transfer in transfers), "", grouped("transportation")]
+
+    itinerary = []
+    for index, (leg, plan) in enumerate(zip(legs, plans)):
+        if index:
+            itinerary.extend([f"🚆 Travel day: {transfers[index - 1].to_markdown()[2:]}", ""])
+        itinerary.extend([_leg_line(leg), ""])
+        offset = (leg.start_date - user_input.start_date).days
+        for block in plan.ir.itinerary.blocks:
+            itinerary.append(block.renumbered(offset + block.number).raw if isinstance(block, ItineraryDay) else block.raw)
+        itinerary.append("")
+
+    return TravelPlan(
+        places_to_stay=grouped("places_to_stay"),
+        activities=grouped("activities"),
+        transportation="\n".join(transport),
+        itinerary="\n".join(itinerary).strip(),
+        degradation=list(dict.fromkeys(step for plan in plans for step in plan.degradation)),
+    )
@@ -0,0 +1,134 @@
+"""Output sizing: max_tokens per LLM call
+
+Without a limit, short trips over-generate and long ones run into the
+model's default cap mid-itinerary. OutputSizer derives max_tokens for each
+call kind (the call label: "research", "writer:itinerary", ...) from the
+trip length and pace, using output lengths observed in earlier runs: the
+p90 tokens per unit of work plus headroom. Units are days x pace factor for
+day-by-day output (itineraries, the supervisor's full plan) and one call
+for everything else.
+
+Observations are each run's completion tokens per label, stored in the
+plan metrics; the sizer is seeded from the plan store on first use and
+keeps learning from every run. Until a kind has enough samples, built-in
+defaults apply. A response that still hits the limit is continued rather
+than restarted (see resilience.ResilientCompletions).
+"""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from src.models import UserInput
+
+
+PACE_FACTORS = {"relaxed": 0.8, "moderate": 1.0, "packed": 1.25}
+
+# Kinds whose output grows with the number of days
+DAY_SCALED = ("itinerary", "supervisor", "writer:itinerary", "correct:itinerary")
+
+# Tokens per unit before enough runs have been observed
+DEFAULT_TOKENS = {
+    "research": 1500,
+    "budget": 1200,
+    "recommendation": 2000,
+    "itinerary": 500,
+    "supervisor": 700,
+    "writer:places_to_stay": 900,
+    "writer:activities": 1500,
+    "writer:transportation": 900,
+    "writer:itinerary": 350,
+    "correct:places_to_stay": 600,
+    "correct:activities": 900,
+    "correct:transportation": 400,
+    "correct:itinerary": 350,
+}
+
+HEADROOM = 1.5
+MIN_SAMPLES = 5
+MIN_TOKENS = 512
+MAX_TOKENS = 16000
+
+
+def _percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class OutputSizer:
+    """Learns output lengths per call kind and sizes max_tokens from them"""
+
+    def __init__(self, window: int = 200):
+        """
+        Args:
+            window: Samples kept per kind
+        """
+        self._samples: Dict[str, Deque[float]] = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def units(kind: str, duration_days: int, pace: str) -> float:
+        """Units of work a call produces (days x pace for day-by-day output)"""
+        if kind in DAY_SCALED:
+            return max(duration_days, 1) * PACE_FACTORS.get(pace, 1.0)
+        return 1.0
+
+    def observe(self, kind: str, tokens: int, duration_days: int, pace: str):
+        """Record a call kind's completion tokens for a trip"""
+        if tokens <= 0:
+            return
+        with self._lock:
+            samples = self._samples.get(kind)
+            if samples is None:
+                samples = self._samples[kind] = deque(maxlen=self._window)
+            samples.append(tokens / self.units(kind, duration_days, pace))
+
+    def observe_run(self, output_tokens: Dict[str, int], user_input: UserInput):
+        """Record a run's completion tokens per label"""
+        for kind, tokens in output_tokens.items():
+            self.observe(kind, tokens, user_input.duration_days, user_input.pace)
+
+    def max_tokens(self, kind: str, user_input: UserInput) -> Optional[int]:
+        """
+        max_tokens for a call
+
+        Args:
+            kind: Call label
+            user_input: Trip the call is for
+
+        Returns:
+            Token limit, or None for kinds with no samples and no default
+        """
+        with self._lock:
+            samples = list(self._samples.get(kind, ()))
+        if len(samples) >= MIN_SAMPLES:
+            per_unit = _percentile(samples, 0.9)
+        elif kind in DEFAULT_TOKENS:
+            per_unit = DEFAULT_TOKENS[kind]
+        else:
+            return None
+        tokens = per_unit * self.units(kind, user_input.duration_days, user_input.pace) * HEADROOM
+        return int(min(MAX_TOKENS, max(MIN_TOKENS, tokens)))
+
+    def load_history(self, store, limit: int = 500) -> int:
+        """
+        Seed samples from runs saved in the plan store
+
+        Returns:
+            Number of runs loaded
+        """
+        loaded = 0
+        for stored in reversed(store.recent(limit)):
+            output_tokens = stored.metrics.get("output_tokens")
+            if output_tokens:
+                self.observe_run(output_tokens, stored.user_input)
+                loaded += 1
+        return loaded
+
+    def sample_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {kind: len(samples) for kind, samples in self._samples.items()}
+
+
+output_sizer = OutputSizer()
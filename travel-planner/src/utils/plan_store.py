@@ -0,0 +1,337 @@
+"""Persisted plan store (SQLite)
+
+Every generated plan is saved with its UserInput and run metrics, so plans
+outlive the Streamlit session: users can reopen past plans, batch jobs can
+read them, and the plan cache is warmed from recent history on startup.
+
+The plan itself (sections, agent messages, parse log) is stored as
+zlib-compressed JSON; the fields plans are looked up by (destination,
+dates, content filter, exact request) are indexed columns.
+
+A second table persists agent stage outputs (research, recommendations,
+...) so stage caches survive restarts and can be filled by the warm-up job
+from another process.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from src.models import UserInput
+from src.utils.config import Config
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    input_key TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    destination_label TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    duration_days INTEGER NOT NULL,
+    pace TEXT NOT NULL,
+    content_filter TEXT NOT NULL,
+    user_input TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    result BLOB NOT NULL,
+    source TEXT NOT NULL DEFAULT 'user'
+);
+CREATE INDEX IF NOT EXISTS idx_plans_destination ON plans (destination, start_date);
+CREATE INDEX IF NOT EXISTS idx_plans_dates ON plans (start_date, end_date);
+CREATE INDEX IF NOT EXISTS idx_plans_filter ON plans (content_filter, destination);
+CREATE INDEX IF NOT EXISTS idx_plans_input ON plans (input_key, created_at);
+CREATE INDEX IF NOT EXISTS idx_plans_created ON plans (created_at);
+
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    value BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_kind ON cache_entries (kind, created_at);
+"""
+
+# Columns needed to list plans without decompressing them
+_SUMMARY_COLUMNS = "id, created_at, destination_label, start_date, end_date, duration_days, pace, content_filter"
+
+
+def key_hash(data: Any) -> str:
+    """Stable hash of JSON-compatible data"""
+    serialized = json.dumps(data, sort_keys=True)
+    return hashlib.blake2b(serialized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def input_key(user_input: UserInput) -> str:
+    """Stable hash of a request (same trip details -> same key)"""
+    return user_input.cache_key
+
+
+def compress(data: Any) -> bytes:
+    return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def decompress(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+@dataclass
+class PlanSummary:
+    """A stored plan's listing fields"""
+
+    id: str
+    created_at: float
+    destination: str
+    start_date: date
+    end_date: date
+    duration_days: int
+    pace: str
+    content_filter: str
+
+    @property
+    def label(self) -> str:
+        """Short description for pickers"""
+        return f"{self.destination} · {self.start_date:%b %d} – {self.end_date:%b %d, %Y} · {self.pace}"
+
+
+@dataclass
+class StoredPlan:
+    """A stored plan with its request and run details"""
+
+    id: str
+    created_at: float
+    user_input: UserInput
+    metrics: Dict[str, Any]
+    result: Dict[str, Any]  # PlanResult.to_dict() without metrics
+
+
+class PlanStore:
+    """SQLite repository of generated plans"""
+
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the store
+
+        Args:
+            path: SQLite database file (":memory:" for a throwaway store)
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            # Stores created before plans had a source
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(plans)")}
+            if "source" not in columns:
+                self._conn.execute("ALTER TABLE plans ADD COLUMN source TEXT NOT NULL DEFAULT 'user'")
+
+    def save(self, user_input: UserInput, result: Dict[str, Any], source: str = "user") -> str:
+        """
+        Store a plan
+
+        Args:
+            user_input: Request the plan was generated for
+            result: PlanResult.to_dict()
+            source: Who asked for it ("user", "warmup", ...)
+
+        Returns:
+            Plan ID
+        """
+        plan_id = uuid.uuid4().hex
+        body = {key: value for key, value in result.items() if key != "metrics"}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO plans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    plan_id,
+                    time.time(),
+                    input_key(user_input),
+                    user_input.destination.strip().lower(),
+                    user_input.destination.strip(),
+                    user_input.start_date.isoformat(),
+                    user_input.end_date.isoformat(),
+                    user_input.duration_days,
+                    user_input.pace,
+                    user_input.content_filter,
+                    user_input.model_dump_json(),
+                    json.dumps(result.get("metrics", {})),
+                    compress(body),
+                    source,
+                )
+            )
+        return plan_id
+
+    def get(self, plan_id: str) -> Optional[StoredPlan]:
+        """Load a plan by ID (None if unknown)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, created_at, user_input, metrics, result FROM plans WHERE id = ?", (plan_id,)
+            ).fetchone()
+        return self._stored(row) if row else None
+
+    def find_latest(self, user_input: UserInput, max_age: Optional[float] = None) -> Optional[StoredPlan]:
+        """
+        Most recent plan generated for exactly this request
+
+        Args:
+            user_input: Request to match
+            max_age: Ignore plans older than this many seconds
+        """
+        cutoff = time.time() - max_age if max_age is not None else 0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, created_at, user_input, metrics, result FROM plans "
+                "WHERE input_key = ? AND created_at >= ? ORDER BY created_at DESC LIMIT 1",
+                (input_key(user_input), cutoff)
+            ).fetchone()
+        return self._stored(row) if row else None
+
+    def search(self, destination: Optional[str] = None, start_from: Optional[date] = None,
+               start_to: Optional[date] = None, content_filter: Optional[str] = None,
+               source: Optional[str] = "user", limit: int = 20) -> List[PlanSummary]:
+        """
+        List plans, newest first
+
+        Args:
+            destination: Exact destination (case-insensitive)
+            start_from: Earliest trip start date
+            start_to: Latest trip start date
+            content_filter: Content filter mode
+            source: Only plans from this source (None for all)
+            limit: Maximum number of plans
+
+        Returns:
+            Plan summaries
+        """
+        clauses, params = [], []
+        if destination:
+            clauses.append("destination = ?")
+            params.append(destination.strip().lower())
+        if start_from:
+            clauses.append("start_date >= ?")
+            params.append(start_from.isoformat())
+        if start_to:
+            clauses.append("start_date <= ?")
+            params.append(start_to.isoformat())
+        if content_filter:
+            clauses.append("content_filter = ?")
+            params.append(content_filter)
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_SUMMARY_COLUMNS} FROM plans {where} ORDER BY created_at DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [self._summary(row) for row in rows]
+
+    def recent(self, limit: int = 20, max_age: Optional[float] = None,
+               source: Optional[str] = None) -> List[StoredPlan]:
+        """Most recently generated plans, newest first (optionally from one source)"""
+        cutoff = time.time() - max_age if max_age is not None else 0
+        source_clause = "AND source = ? " if source else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, created_at, user_input, metrics, result FROM plans "
+                f"WHERE created_at >= ? {source_clause}ORDER BY created_at DESC LIMIT ?",
+                (cutoff, *([source] if source else []), limit)
+            ).fetchall()
+        return [self._stored(row) for row in rows]
+
+    def put_cached(self, key: Any, kind: str, value: Any):
+        """
+        Persist a cache entry
+
+        Args:
+            key: JSON-compatible cache key
+            kind: Entry kind (e.g. stage name), for stats and pruning
+            value: JSON-compatible value
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?)",
+                (key_hash(key), kind, time.time(), compress(value))
+            )
+
+    def get_cached(self, key: Any, max_age: float) -> Optional[Any]:
+        """Persisted cache entry no older than max_age seconds (None if missing)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND created_at >= ?",
+                (key_hash(key), time.time() - max_age)
+            ).fetchone()
+        return decompress(row["value"]) if row else None
+
+    def cache_counts(self, max_age: float) -> Dict[str, int]:
+        """Number of live cache entries per kind"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, COUNT(*) AS n FROM cache_entries WHERE created_at >= ? GROUP BY kind",
+                (time.time() - max_age,)
+            ).fetchall()
+        return {row["kind"]: row["n"] for row in rows}
+
+    def prune_cache(self, max_age: float):
+        """Delete cache entries older than max_age seconds"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries WHERE created_at < ?", (time.time() - max_age,))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+
+    def delete(self, plan_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM plans WHERE id = ?", (plan_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _summary(row: sqlite3.Row) -> PlanSummary:
+        return PlanSummary(
+            id=row["id"],
+            created_at=row["created_at"],
+            destination=row["destination_label"],
+            start_date=date.fromisoformat(row["start_date"]),
+            end_date=date.fromisoformat(row["end_date"]),
+            duration_days=row["duration_days"],
+            pace=row["pace"],
+            content_filter=row["content_filter"],
+        )
+
+    @staticmethod
+    def _stored(row: sqlite3.Row) -> StoredPlan:
+        return StoredPlan(
+            id=row["id"],
+            created_at=row["created_at"],
+            user_input=UserInput.model_validate_json(row["user_input"]),
+            metrics=json.loads(row["metrics"]),
+            result=decompress(row["result"]),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_plan_store() -> Optional[PlanStore]:
+    """Process-wide plan store (None when PLAN_DB_PATH is empty)"""
+    if not Config.PLAN_DB_PATH:
+        return None
+    return PlanStore(Config.PLAN_DB_PATH)
@@ -0,0 +1,62 @@
+"""CPU-side post-processing of agent output
+
+Parsing sections, content filtering, attraction dedup and finding empty
+sections run in-thread: a few milliseconds per plan, less than handing the
+response to a worker process and the result back would cost
+(benchmarks/bench_postprocess.py).
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Union
+
+from src.models import TravelPlan
+from src.utils.content_filter import FlaggedItem, filter_plan
+
+
+@dataclass
+class PostProcessResult:
+    """Output of post-processing one supervisor response"""
+
+    plan: TravelPlan
+    parse_log: List[str] = field(default_factory=list)
+    flagged: List[FlaggedItem] = field(default_factory=list)
+    empty_sections: List[str] = field(default_factory=list)
+    duplicates_removed: int = 0
+
+
+def postprocess(plan_text: Union[str, Dict[str, str]], content_filter: str) -> PostProcessResult:
+    """
+    Parse, filter and dedupe a supervisor response, and find empty sections
+
+    Args:
+        plan_text: Raw text from supervisor, or section name to text from the section writers
+        content_filter: Content filter mode
+
+    Returns:
+        PostProcessResult
+    """
+    # Imported here to avoid a circular import (planner uses this module)
+    from src.planner import parse_plan_sections
+
+    parse_log = []
+    if isinstance(plan_text, dict):
+        # Section writers already return one text per field - nothing to parse
+        plan = TravelPlan(**plan_text)
+        parse_log.append(f"Sections written directly: {', '.join(name for name, text in plan_text.items() if text)}")
+    else:
+        plan = parse_plan_sections(plan_text, parse_log)
+    plan, flagged = filter_plan(plan, content_filter)
+
+    # Drop attractions listed twice (e.g. by Research and Recommendation)
+    ir = plan.ir.copy()
+    duplicates = ir.dedupe_attractions()
+    if duplicates:
+        plan = TravelPlan.from_ir(ir)
+
+    return PostProcessResult(
+        plan=plan,
+        parse_log=parse_log,
+        flagged=flagged,
+        empty_sections=plan.ir.empty_sections(),
+        duplicates_removed=duplicates,
+    )
@@ -0,0 +1,429 @@
+"""Retry, hedging and timeout policy for LLM calls
+
+ResilientClient wraps an OpenAI client and is handed to Swarm, so every
+chat completion any agent makes goes through the same policy:
+
+- a per-call timeout
+- exponential backoff with jitter on 429 / 5xx / timeouts / connection errors
+  (honouring Retry-After when the server sends it)
+- a hedged duplicate request once a call runs past the p95 latency observed
+  for its label, taking whichever response arrives first. With a scheduler,
+  the hedge takes its own slot and is skipped when none is free
+- an optional max_tokens for calls made inside output_limit(), and
+  continuation of responses cut off at the limit (finish_reason "length")
+  instead of a restart
+- an optional history hook that compacts the messages of multi-turn agent
+  runs before each completion (see history_compaction.py)
+- an optional CallScheduler admitting each attempt by priority class,
+  fair share and tenant (see call_scheduler.py). A request keeps its slot
+  until it finishes, even after the caller gave up on it at the timeout
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from src.utils.call_scheduler import CallScheduler, estimate_request_tokens
+from src.utils.config import Config
+
+
+@dataclass
+class CallPolicy:
+    """How a single LLM call is retried, hedged and timed out"""
+
+    timeout: float = 60.0
+    max_retries: int = 3
+    backoff_base: float = 1.0
+    backoff_max: float = 20.0
+    hedge: bool = True
+    hedge_min_delay: float = 2.0
+    hedge_min_samples: int = 20
+    max_continuations: int = 2
+
+    @classmethod
+    def from_config(cls) -> "CallPolicy":
+        return cls(
+            timeout=Config.LLM_TIMEOUT,
+            max_retries=Config.LLM_MAX_RETRIES,
+            backoff_base=Config.LLM_BACKOFF_BASE,
+            hedge=Config.LLM_HEDGE,
+            max_continuations=Config.LLM_MAX_CONTINUATIONS,
+        )
+
+
+@dataclass
+class CallStats:
+    """Counters for the LLM calls made within one planning run"""
+
+    calls: int = 0
+    retries: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    failures: int = 0
+    continuations: int = 0
+    compacted_tokens: int = 0  # Prompt tokens not re-sent thanks to history compaction
+    queue_seconds: float = 0.0  # Time spent waiting for the call scheduler
+    prompt_tokens: int = 0
+    cached_tokens: int = 0  # Prompt tokens served from the provider's prompt cache
+    completion_tokens: int = 0
+    output_tokens: Dict[str, int] = field(default_factory=dict)  # Completion tokens per call label
+    parent: Optional["CallStats"] = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **counts: int):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+        # Nested track_calls() blocks also count towards the enclosing one
+        if self.parent is not None:
+            self.parent.add(**counts)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failures": self.failures,
+            "continuations": self.continuations,
+            "compacted_tokens": self.compacted_tokens,
+            "queue_seconds": round(self.queue_seconds, 3),
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+    def record_usage(self, usage: Any, label: str = ""):
+        """Add a completion's usage (cached tokens come from prompt_tokens_details)"""
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        self.add(
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            cached_tokens=getattr(details, "cached_tokens", 0) or 0,
+            completion_tokens=completion_tokens,
+        )
+        if label:
+            self.add_output(label, completion_tokens)
+
+    def add_output(self, label: str, tokens: int):
+        with self._lock:
+            self.output_tokens[label] = self.output_tokens.get(label, 0) + tokens
+        if self.parent is not None:
+            self.parent.add_output(label, tokens)
+
+
+_call_stats: ContextVar[Optional[CallStats]] = ContextVar("call_stats", default=None)
+_call_label: ContextVar[str] = ContextVar("call_label", default="")
+_max_tokens: ContextVar[Optional[int]] = ContextVar("max_tokens", default=None)
+
+# Rewrites a conversation before it is sent: (messages, prompt tokens saved)
+HistoryHook = Callable[[List[Dict[str, Any]]], Tuple[List[Dict[str, Any]], int]]
+
+# Sent after a response cut off at max_tokens
+CONTINUE_PROMPT = "Continue exactly where you stopped. Do not repeat anything or add any preamble."
+
+
+@contextmanager
+def track_calls() -> Iterator[CallStats]:
+    """Collect CallStats for every LLM call made in this context"""
+    stats = CallStats(parent=_call_stats.get())
+    token = _call_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _call_stats.reset(token)
+
+
+@contextmanager
+def call_label(label: str) -> Iterator[None]:
+    """Label LLM calls in this context (latency percentiles are kept per label)"""
+    token = _call_label.set(label)
+    try:
+        yield
+    finally:
+        _call_label.reset(token)
+
+
+@contextmanager
+def output_limit(max_tokens: Optional[int]) -> Iterator[None]:
+    """Send max_tokens with LLM calls in this context (None = no limit)"""
+    token = _max_tokens.set(max_tokens)
+    try:
+        yield
+    finally:
+        _max_tokens.reset(token)
+
+
+class LatencyTracker:
+    """Rolling latency samples per label"""
+
+    def __init__(self, window: int = 200):
+        self._samples: Dict[str, Deque[float]] = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def record(self, label: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(label)
+            if samples is None:
+                samples = self._samples[label] = deque(maxlen=self._window)
+            samples.append(seconds)
+
+    def percentile(self, label: str, pct: float, min_samples: int = 1) -> Optional[float]:
+        """Latency percentile for a label, or None with too few samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(label, ()))
+        if len(samples) < max(min_samples, 1):
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+    def labels(self):
+        with self._lock:
+            return list(self._samples)
+
+
+latency_tracker = LatencyTracker()
+
+# Runs primary and hedged requests so the caller can wait on either
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-call")
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for rate limits, server errors, timeouts and connection errors"""
+    import openai
+
+    if isinstance(error, (TimeoutError, openai.APITimeoutError, openai.APIConnectionError,
+                          openai.RateLimitError, openai.InternalServerError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds from a Retry-After header, if the server sent one"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class ResilientCompletions:
+    """chat.completions with timeouts, retries and hedging"""
+
+    def __init__(self, completions, policy: CallPolicy, tracker: LatencyTracker,
+                 compactor: Optional[HistoryHook] = None, scheduler: Optional[CallScheduler] = None):
+        self._completions = completions
+        self.policy = policy
+        self.tracker = tracker
+        self.compactor = compactor
+        self.scheduler = scheduler
+
+    def create(self, **params: Any):
+        """Create a chat completion under the call policy, continuing it if cut off at max_tokens"""
+        label = _call_label.get() or params.get("model", "")
+        stats = _call_stats.get() or CallStats()
+        if self.compactor is not None and params.get("messages"):
+            messages, saved = self.compactor(params["messages"])
+            if saved:
+                params = {**params, "messages": messages}
+                stats.add(compacted_tokens=saved)
+        limit = _max_tokens.get()
+        if limit and "max_tokens" not in params and "max_completion_tokens" not in params:
+            params = {**params, "max_tokens": limit}
+
+        response = self._attempt(params, label, stats)
+        for _ in range(self.policy.max_continuations):
+            if params.get("stream") or not getattr(response, "choices", None):
+                break
+            choice = response.choices[0]
+            if choice.finish_reason != "length" or choice.message.tool_calls:
+                break
+            # Ask for the rest and stitch it on, keeping what was already generated
+            stats.add(continuations=1)
+            partial = choice.message.content or ""
+            more = self._attempt({
+                **params,
+                "messages": [
+                    *params["messages"],
+                    {"role": "assistant", "content": partial},
+                    {"role": "user", "content": CONTINUE_PROMPT},
+                ],
+            }, label, stats)
+            rest = more.choices[0]
+            choice.message.content = partial + (rest.message.content or "")
+            choice.finish_reason = rest.finish_reason
+        return response
+
+    def _attempt(self, params: Dict[str, Any], label: str, stats: CallStats):
+        """One request, retried under the policy"""
+        stats.add(calls=1)
+
+        attempt = 0
+        while True:
+            try:
+                return self._scheduled(params, label, stats)
+            except Exception as e:
+                if attempt >= self.policy.max_retries or not is_retryable(e):
+                    stats.add(failures=1)
+                    raise
+                attempt += 1
+                stats.add(retries=1)
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(self.policy.backoff_max, self.policy.backoff_base * 2 ** (attempt - 1))
+                    delay *= random.uniform(0.5, 1.0)
+                time.sleep(delay)
+
+    def _scheduled(self, params: Dict[str, Any], label: str, stats: CallStats):
+        """One attempt, once the scheduler admits it (retries queue again rather than hold a slot)"""
+        if self.scheduler is None:
+            return self._hedged(params, label, stats)
+
+        tokens = estimate_request_tokens(params)
+        stats.add(queue_seconds=self.scheduler.acquire(tokens))
+        return self._hedged(params, label, stats, tokens)
+
+    def _call(self, params: Dict[str, Any], label: str, stats: CallStats):
+        started = time.perf_counter()
+        completion = self._completions.create(timeout=self.policy.timeout, **params)
+        self.tracker.record(label, time.perf_counter() - started)
+        # Hedge losers that complete are billed too, so every response counts
+        stats.record_usage(getattr(completion, "usage", None), label)
+        return completion
+
+    def _release(self, tokens: int, completion: Any = None):
+        usage = getattr(completion, "usage", None)
+        self.scheduler.release(tokens, getattr(usage, "total_tokens", None))
+
+    def _submit(self, params: Dict[str, Any], label: str, stats: CallStats, tokens: Optional[int]) -> Future:
+        """
+        Start a request on the call pool
+
+        A scheduler slot (tokens not None) is released when the request
+        itself finishes, not when the caller stops waiting for it: a call
+        abandoned on timeout still counts against LLM_MAX_CONCURRENCY and
+        LLM_TPM while it runs.
+        """
+        try:
+            future = _executor.submit(copy_context().run, self._call, params, label, stats)
+        except BaseException:
+            if tokens is not None:
+                self._release(tokens)
+            raise
+        if tokens is not None:
+            # Release in the caller's context, so usage is charged to its priority class
+            context = copy_context()
+            future.add_done_callback(lambda done: context.run(
+                self._release, tokens, None if done.cancelled() or done.exception() else done.result()
+            ))
+        return future
+
+    def _hedged(self, params: Dict[str, Any], label: str, stats: CallStats, tokens: Optional[int] = None):
+        """
+        One attempt: primary request plus an optional hedge past p95
+
+        Args:
+            tokens: Tokens the scheduler admitted the primary with (None without a scheduler);
+                its slot is held until the primary request finishes
+        """
+        if params.get("stream"):
+            completion = None
+            try:
+                completion = self._call(params, label, stats)
+                return completion
+            finally:
+                if tokens is not None:
+                    self._release(tokens, completion)
+
+        deadline = time.monotonic() + self.policy.timeout
+        primary = self._submit(params, label, stats, tokens)
+
+        hedge_after = None
+        if self.policy.hedge:
+            p95 = self.tracker.percentile(label, 0.95, self.policy.hedge_min_samples)
+            if p95 is not None:
+                hedge_after = max(p95, self.policy.hedge_min_delay)
+
+        if hedge_after is None or hedge_after >= self.policy.timeout:
+            done, _ = wait([primary], timeout=self.policy.timeout)
+            if not done:
+                raise TimeoutError(f"LLM call '{label}' timed out after {self.policy.timeout:.0f}s")
+            return primary.result()
+
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        # Primary is slower than usual: race a duplicate request against it, if the scheduler has room
+        hedge_tokens = None
+        if self.scheduler is not None:
+            hedge_tokens = estimate_request_tokens(params)
+            if not self.scheduler.try_acquire(hedge_tokens):
+                done, _ = wait([primary], timeout=max(0.0, deadline - time.monotonic()))
+                if not done:
+                    raise TimeoutError(f"LLM call '{label}' timed out after {self.policy.timeout:.0f}s")
+                return primary.result()
+
+        stats.add(hedges=1)
+        hedge = self._submit(params, label, stats, hedge_tokens)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        stats.add(hedge_wins=1)
+                    return future.result()
+                error = future.exception()
+
+        if error is not None:
+            raise error
+        raise TimeoutError(f"LLM call '{label}' timed out after {self.policy.timeout:.0f}s")
+
+
+class ResilientClient:
+    """OpenAI client wrapper exposing chat.completions.create under a CallPolicy"""
+
+    def __init__(self, client, policy: Optional[CallPolicy] = None, tracker: Optional[LatencyTracker] = None,
+                 compactor: Optional[HistoryHook] = None, scheduler: Optional[CallScheduler] = None):
+        """
+        Wrap a client
+
+        Args:
+            client: OpenAI client (construct it with max_retries=0 so retries aren't doubled)
+            policy: Call policy (default: from Config)
+            tracker: Latency tracker (default: process-wide)
+            compactor: Hook returning (messages to send, tokens saved) before each completion
+            scheduler: Call scheduler every attempt waits for (None = no admission control)
+        """
+        self._client = client
+        self.chat = _Chat(ResilientCompletions(
+            client.chat.completions,
+            policy or CallPolicy.from_config(),
+            tracker or latency_tracker,
+            compactor,
+            scheduler,
+        ))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class _Chat:
+    def __init__(self, completions: ResilientCompletions):
+        self.completions = completions
@@ -0,0 +1,275 @@
+"""Opening-hours-aware time-block scheduler for itineraries"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class TimeBlock:
+    """A fixed block of the day (times in minutes from midnight)"""
+
+    name: str
+    start: int
+    end: int
+    meal: str = ""
+    meal_minutes: int = 0
+
+
+# Daily structure shared with the itinerary agent prompt
+TIME_BLOCKS: Tuple[TimeBlock, ...] = (
+    TimeBlock("Morning", 9 * 60, 12 * 60),
+    TimeBlock("Afternoon", 12 * 60, 18 * 60, meal="Lunch", meal_minutes=60),
+    TimeBlock("Evening", 18 * 60, 22 * 60, meal="Dinner", meal_minutes=90),
+)
+
+# Maximum activities per day for each pace
+PACING_RULES: Dict[str, int] = {
+    "relaxed": 3,
+    "moderate": 4,
+    "packed": 6,
+}
+
+# Travel buffers between consecutive activities (minutes)
+SAME_AREA_BUFFER = 15
+CROSS_AREA_BUFFER = 30
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+_CLOCK_PATTERN = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*([ap]\.?m\.?)?\s*$", re.IGNORECASE)
+
+
+@dataclass(slots=True)
+class Activity:
+    """A candidate activity with duration and opening window"""
+
+    name: str
+    duration: int
+    opens: int = 0
+    closes: int = 24 * 60
+    area: str = ""
+    closed_days: FrozenSet[int] = frozenset()
+
+
+@dataclass(slots=True)
+class Slot:
+    """An activity placed at a concrete time"""
+
+    activity: Activity
+    start: int
+    end: int
+    travel_before: int = 0
+
+
+@dataclass(slots=True)
+class DayPlan:
+    """Scheduled slots for a single day, one list per time block"""
+
+    day: int
+    date: Optional[date]
+    blocks: List[List[Slot]] = field(default_factory=lambda: [[] for _ in TIME_BLOCKS])
+
+    @property
+    def activity_count(self) -> int:
+        """Number of activities scheduled on this day"""
+        return sum(len(slots) for slots in self.blocks)
+
+
+@dataclass(slots=True)
+class Schedule:
+    """Result of scheduling a trip"""
+
+    days: List[DayPlan]
+    unscheduled: List[Activity]
+
+    def to_prompt(self) -> str:
+        """Render the schedule as a skeleton the itinerary agent describes"""
+        lines = []
+        for day_plan in self.days:
+            heading = f"### Day {day_plan.day}"
+            if day_plan.date:
+                heading += f" - {day_plan.date.isoformat()}"
+            lines.append(heading)
+            lines.append("")
+
+            for block, slots in zip(TIME_BLOCKS, day_plan.blocks):
+                lines.append(f"**{block.name} ({format_clock(block.start)} - {format_clock(block.end)})**")
+                if block.meal:
+                    meal_end = block.start + block.meal_minutes
+                    lines.append(f"- {format_clock(block.start)} - {format_clock(meal_end)}: {block.meal}")
+                for slot in slots:
+                    line = f"- {format_clock(slot.start)} - {format_clock(slot.end)}: {slot.activity.name}"
+                    if slot.activity.area:
+                        line += f" ({slot.activity.area})"
+                    if slot.travel_before:
+                        line += f" - allow {slot.travel_before} min travel"
+                    lines.append(line)
+                if not slots and not block.meal:
+                    lines.append("- Free time")
+                lines.append("")
+
+        if self.unscheduled:
+            names = ", ".join(activity.name for activity in self.unscheduled)
+            lines.append(f"Not scheduled (no fitting time/opening window): {names}")
+
+        return "\n".join(lines).strip()
+
+
+def parse_clock(value: str) -> int:
+    """
+    Parse a clock time into minutes from midnight
+
+    Args:
+        value: Time such as "09:30", "9", "5:30 PM" or "17:00"
+
+    Returns:
+        Minutes from midnight
+    """
+    match = _CLOCK_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Invalid time: {value!r}")
+
+    hours = int(match.group(1))
+    minutes = int(match.group(2) or 0)
+    suffix = (match.group(3) or "").lower().replace(".", "")
+
+    if suffix == "pm" and hours < 12:
+        hours += 12
+    elif suffix == "am" and hours == 12:
+        hours = 0
+
+    if hours > 24 or minutes > 59:
+        raise ValueError(f"Invalid time: {value!r}")
+
+    return hours * 60 + minutes
+
+
+def format_clock(minutes: int) -> str:
+    """Format minutes from midnight as "9:00 AM" """
+    hours, mins = divmod(minutes, 60)
+    suffix = "AM" if hours < 12 or hours == 24 else "PM"
+    display = hours % 12 or 12
+    return f"{display}:{mins:02d} {suffix}"
+
+
+def parse_weekdays(names: Iterable[str]) -> FrozenSet[int]:
+    """Convert weekday names ("Monday", "tue") to weekday numbers"""
+    days = set()
+    for name in names:
+        prefix = name.strip().lower()[:3]
+        for index, weekday in enumerate(WEEKDAYS):
+            if prefix and weekday.startswith(prefix):
+                days.add(index)
+    return frozenset(days)
+
+
+def travel_buffer(previous: Optional[Activity], activity: Activity) -> int:
+    """Travel time to allow between two consecutive activities"""
+    if previous is None:
+        return 0
+    if previous.area and previous.area == activity.area:
+        return SAME_AREA_BUFFER
+    return CROSS_AREA_BUFFER
+
+
+def build_schedule(
+    activities: List[Activity],
+    num_days: int,
+    pace: str = "moderate",
+    start_date: Optional[date] = None,
+) -> Schedule:
+    """
+    Pack ranked activities into daily time blocks
+
+    Activities are placed greedily in rank order, respecting opening
+    windows, closed weekdays, meal breaks, travel buffers and the
+    per-day limit for the pace. After each placement, activities in the
+    same area are tried first so nearby attractions end up together.
+
+    Args:
+        activities: Candidate activities, most important first
+        num_days: Trip length in days
+        pace: Travel pace (relaxed/moderate/packed)
+        start_date: First day of the trip (enables closed-day checks)
+
+    Returns:
+        Schedule with one DayPlan per day and any activities that did not fit
+    """
+    max_per_day = PACING_RULES.get(pace, PACING_RULES["moderate"])
+
+    remaining = list(range(len(activities)))
+    placed = [False] * len(activities)
+    days = []
+
+    for day_index in range(num_days):
+        day_date = start_date + timedelta(days=day_index) if start_date else None
+        weekday = day_date.weekday() if day_date else -1
+        day_plan = DayPlan(day=day_index + 1, date=day_date)
+        previous: Optional[Activity] = None
+        previous_end = 0
+        count = 0
+
+        for block, slots in zip(TIME_BLOCKS, day_plan.blocks):
+            cursor = block.start + block.meal_minutes
+
+            while count < max_per_day and remaining:
+                choice = _pick_next(
+                    activities, remaining, placed, block, cursor,
+                    previous, previous_end, weekday,
+                )
+                if choice is None:
+                    break
+
+                index, start, buffer = choice
+                activity = activities[index]
+                end = start + activity.duration
+                slots.append(Slot(activity=activity, start=start, end=end, travel_before=buffer))
+                placed[index] = True
+                previous, previous_end, cursor = activity, end, end
+                count += 1
+
+            # Compact the candidate list once per block
+            remaining = [index for index in remaining if not placed[index]]
+
+        days.append(day_plan)
+
+    unscheduled = [activities[index] for index in remaining]
+    return Schedule(days=days, unscheduled=unscheduled)
+
+
+def _pick_next(
+    activities: List[Activity],
+    remaining: List[int],
+    placed: List[bool],
+    block: TimeBlock,
+    cursor: int,
+    previous: Optional[Activity],
+    previous_end: int,
+    weekday: int,
+) -> Optional[Tuple[int, int, int]]:
+    """Find the best activity that fits in the rest of a block"""
+    if block.end - cursor <= 0:
+        return None
+
+    fallback = None
+    for index in remaining:
+        if placed[index]:
+            continue
+
+        activity = activities[index]
+        if weekday in activity.closed_days:
+            continue
+
+        buffer = travel_buffer(previous, activity)
+        start = max(cursor, previous_end + buffer if previous else cursor, activity.opens)
+        if start + activity.duration > min(block.end, activity.closes):
+            continue
+
+        # Prefer staying in the same area; otherwise keep rank order
+        if previous is None or (activity.area and activity.area == previous.area):
+            return index, start, buffer
+        if fallback is None:
+            fallback = (index, start, buffer)
+
+    return fallback
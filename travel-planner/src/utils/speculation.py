@@ -0,0 +1,192 @@
+"""Speculative research while the trip form is being filled in
+
+Research only depends on the destination and travel month (its prompt
+carries nothing else, see planner.STAGE_CONTEXT), which users enter well
+before they pick preferences and press Generate. As soon as
+those are valid the app starts the Research stage here, in the background;
+its output lands in the normal stage cache, and a plan request arriving
+while it is still running waits for it instead of researching again.
+
+Work for a destination nobody is looking at any more (the user changed it)
+is cancelled if it hasn't started yet. A research call already in flight
+is a single completion, so it is left to finish and its result cached.
+Its LLM calls are scheduled in the "speculative" class, behind interactive
+plans.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Dict, Optional
+
+from src.models import UserInput
+from src.utils.call_scheduler import scheduling
+from src.utils.config import Config
+from src.utils.plan_store import key_hash
+
+# Trip details known when the form is half filled in; research is only speculated
+# while its prompt uses nothing else
+FORM_FIELDS = frozenset({"destination", "month"})
+
+# Placeholders the provisional request needs to validate; they never reach the
+# research prompt or its cache key
+_FORM_BUDGET = (1500.0, 3000.0)
+
+
+@dataclass
+class SpeculationStats:
+    """Counters for the speculative research pool"""
+
+    started: int = 0
+    already_cached: int = 0
+    completed: int = 0
+    cancelled: int = 0
+    failed: int = 0
+    joined: int = 0  # Plan requests that waited on a speculative run
+
+
+class SpeculativeResearch:
+    """Runs destination research ahead of plan requests"""
+
+    def __init__(self, workers: int = 1):
+        """
+        Args:
+            workers: Concurrent speculative research calls
+        """
+        self.stats = SpeculationStats()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculate")
+        self._lock = threading.RLock()  # Done callbacks can run while it's held
+        self._inflight: Dict[str, Future] = {}
+        self._interest: Dict[str, int] = {}  # Sessions waiting on each key
+
+    def start(self, destination: str, start_date: date, end_date: date, tenant: str = "") -> Optional[str]:
+        """
+        Start researching a destination unless it's cached or already running
+
+        Each call registers interest in the key; release it with cancel().
+
+        Args:
+            destination: Destination as typed
+            start_date: Trip start date
+            end_date: Trip end date
+            tenant: Session asking, for fair scheduling of the research call
+
+        Returns:
+            Speculation key (None if the input isn't a valid trip yet, or research
+            would depend on more than the form's first fields)
+        """
+        from src.planner import STAGE_CONTEXT, cached_stage, stage_cache_key
+
+        research_fields = STAGE_CONTEXT.get("research")
+        if research_fields is None or not FORM_FIELDS.issuperset(research_fields):
+            return None  # The placeholders below would end up in the prompt
+
+        try:
+            user_input = UserInput(
+                destination=destination,
+                start_date=start_date,
+                end_date=end_date,
+                budget_range=_FORM_BUDGET,
+                pace="moderate",
+                content_filter="family_friendly",
+            )
+        except ValueError:
+            return None
+
+        stage_key = stage_cache_key("research", user_input)
+        key = key_hash(stage_key)
+        with self._lock:
+            self._interest[key] = self._interest.get(key, 0) + 1
+            if key in self._inflight:
+                return key
+        if cached_stage(stage_key) is not None:
+            with self._lock:
+                self.stats.already_cached += 1
+            return key
+
+        with self._lock:
+            if key not in self._inflight:
+                self.stats.started += 1
+                future = self._executor.submit(self._run, user_input, tenant)
+                self._inflight[key] = future
+                future.add_done_callback(lambda _, key=key: self._finished(key))
+        return key
+
+    def cancel(self, key: str):
+        """Drop one session's interest; cancel the run if nobody else wants it and it hasn't started"""
+        with self._lock:
+            remaining = self._interest.get(key, 0) - 1
+            if remaining > 0:
+                self._interest[key] = remaining
+                return
+            self._interest.pop(key, None)
+            future = self._inflight.get(key)
+            if future is not None and future.cancel():
+                self.stats.cancelled += 1
+
+    def wait(self, stage_key: Dict, timeout: float) -> bool:
+        """
+        Wait for a speculative run of this research stage, if one is in flight
+
+        Args:
+            stage_key: Research stage cache key
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if a run was in flight and finished in time
+        """
+        with self._lock:
+            future = self._inflight.get(key_hash(stage_key))
+        if future is None or future.cancelled():
+            return False
+        try:
+            future.result(timeout=timeout)
+        except TimeoutError:
+            return False
+        except Exception:
+            return False  # Its failure is counted; the plan request researches itself
+        with self._lock:
+            self.stats.joined += 1
+        return True
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {**asdict(self.stats), "inflight": len(self._inflight)}
+
+    def _run(self, user_input: UserInput, tenant: str):
+        from src.planner import get_agents, get_swarm_client, run_specialist_stage
+
+        try:
+            with scheduling("speculative", tenant or "speculation"):
+                run_specialist_stage(get_swarm_client(), get_agents(), "research", user_input)
+        except Exception:
+            with self._lock:
+                self.stats.failed += 1
+            raise
+        with self._lock:
+            self.stats.completed += 1
+
+    def _finished(self, key: str):
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._interest.pop(key, None)
+
+
+_speculator: Optional[SpeculativeResearch] = None
+_speculator_lock = threading.Lock()
+
+
+def get_speculator() -> SpeculativeResearch:
+    """Process-wide speculative research pool (created on first use)"""
+    global _speculator
+    with _speculator_lock:
+        if _speculator is None:
+            _speculator = SpeculativeResearch(Config.SPECULATIVE_WORKERS)
+        return _speculator
+
+
+def join_speculative_research(stage_key: Dict, timeout: float) -> bool:
+    """Wait for speculative research of this stage key if this process started one"""
+    speculator = _speculator
+    return speculator.wait(stage_key, timeout) if speculator else False
@@ -0,0 +1,161 @@
+"""Plan validation against the supervisor's checklist
+
+The synthesis prompt asks for 3-5 hotels, 8-12 activities, airports with
+their IATA codes and every day of the trip in the itinerary, within the
+user's budget. validate_plan() checks those rules on the parsed plan and
+returns a defect list precise enough to drive a small corrective call ("add
+Day 4 and Day 5", "add 3 more attractions") instead of re-running the whole
+plan. Hotels whose nightly rate alone blows the budget are dropped.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from src.models import TravelPlan
+from src.plan_ir import SECTION_NAMES
+
+
+MIN_HOTELS = 3
+MIN_ACTIVITIES = 8
+MAX_ACTIVITIES = 12
+
+_AIRPORT = re.compile(r"\bairports?\b", re.IGNORECASE)
+
+# Rules a corrective call can fix by adding content; the others are fixed in code
+ADD_RULES = ("empty_section", "too_few_hotels", "too_few_activities", "missing_airport_codes", "missing_days")
+
+
+@dataclass(frozen=True, slots=True)
+class PlanDefect:
+    """A checklist rule the plan breaks"""
+
+    section: str
+    rule: str
+    message: str
+    count: int = 0  # Items missing (or extra)
+    days: Tuple[int, ...] = ()  # Itinerary day numbers missing (or extra)
+    names: Tuple[str, ...] = ()  # Items to drop (hotels over budget)
+
+
+def validate_plan(plan: TravelPlan, duration_days: int, max_budget: Optional[float] = None) -> List[PlanDefect]:
+    """
+    Check a plan against the checklist
+
+    Args:
+        plan: Parsed (and filtered) plan
+        duration_days: Trip length the itinerary must cover
+        max_budget: Upper end of the user's budget (None = no budget check)
+
+    Returns:
+        Defects, in section order (empty if the plan passes)
+    """
+    ir = plan.ir
+    defects: List[PlanDefect] = []
+    empty = set(ir.empty_sections())
+    for name in SECTION_NAMES:
+        if name in empty:
+            defects.append(PlanDefect(name, "empty_section", f"{name} section is empty"))
+
+    if "places_to_stay" not in empty:
+        nights = duration_days - 1
+        over = ir.hotels_over_budget(max_budget, nights) if max_budget else []
+        if over:
+            defects.append(PlanDefect(
+                "places_to_stay", "hotels_over_budget",
+                f"{', '.join(hotel.name for hotel in over)} cost more than the ${max_budget:,.0f} budget "
+                f"for {max(nights, 1)} night(s)",
+                count=len(over), names=tuple(hotel.name for hotel in over)
+            ))
+        # Hotels over budget are dropped, so they don't count towards the minimum
+        affordable = len(ir.hotels) - len(over)
+        if affordable < MIN_HOTELS:
+            defects.append(PlanDefect(
+                "places_to_stay", "too_few_hotels",
+                f"{affordable} hotels listed{' within budget' if max_budget else ''}, at least {MIN_HOTELS} required",
+                count=MIN_HOTELS - affordable
+            ))
+
+    if "activities" not in empty:
+        found = len(ir.attractions)
+        if found < MIN_ACTIVITIES:
+            defects.append(PlanDefect(
+                "activities", "too_few_activities",
+                f"{found} activities listed, {MIN_ACTIVITIES}-{MAX_ACTIVITIES} required", count=MIN_ACTIVITIES - found
+            ))
+        elif found > MAX_ACTIVITIES:
+            defects.append(PlanDefect(
+                "activities", "too_many_activities",
+                f"{found} activities listed, at most {MAX_ACTIVITIES}", count=found - MAX_ACTIVITIES
+            ))
+
+    if "transportation" not in empty and not ir.airport_codes():
+        defects.append(PlanDefect(
+            "transportation", "missing_airport_codes",
+            "no airport with an IATA code" + ("" if _AIRPORT.search(plan.transportation) else " (no airports at all)")
+        ))
+
+    if "itinerary" not in empty:
+        present = {day.number for day in ir.days}
+        missing = tuple(number for number in range(1, duration_days + 1) if number not in present)
+        extra = tuple(sorted(number for number in present if number > duration_days))
+        if missing:
+            defects.append(PlanDefect(
+                "itinerary", "missing_days",
+                f"itinerary is missing Day {', Day '.join(map(str, missing))} of {duration_days}",
+                count=len(missing), days=missing
+            ))
+        if extra:
+            defects.append(PlanDefect(
+                "itinerary", "extra_days",
+                f"itinerary has Day {', Day '.join(map(str, extra))} beyond the {duration_days}-day trip",
+                count=len(extra), days=extra
+            ))
+
+    return defects
+
+
+def build_correction_request(defect: PlanDefect, plan: TravelPlan, destination: str) -> str:
+    """
+    Build a prompt asking for only what a defect is missing
+
+    Args:
+        defect: Defect with a rule in ADD_RULES (other than empty_section)
+        plan: Current plan (existing names are listed so they aren't repeated)
+        destination: Trip destination
+
+    Returns:
+        Prompt text
+    """
+    ir = plan.ir
+    if defect.rule == "too_few_hotels":
+        existing = ", ".join(hotel.name for hotel in ir.hotels) or "none"
+        return (
+            f"The Places to Stay section lists only these hotels: {existing}.\n"
+            f"Write {defect.count} MORE hotel option(s) in {destination} within the trip's budget, different from those, "
+            "in the same numbered format (name, tier, location, price per night, why, amenities). "
+            "Output ONLY the new hotels."
+        )
+    if defect.rule == "too_few_activities":
+        existing = ", ".join(attraction.name for attraction in ir.attractions) or "none"
+        return (
+            f"The Activities section lists only these attractions: {existing}.\n"
+            f"Write {defect.count} MORE specific attractions or activities in {destination}, different from those, "
+            "in the same numbered format (name, description, duration, cost, best time). "
+            "No day numbers. Output ONLY the new attractions."
+        )
+    if defect.rule == "missing_airport_codes":
+        return (
+            f"Write a short \"Major Airports\" list for {destination}: one bullet per airport serving it, as "
+            "\"- **Airport Name (IATA code)**: distance from city center, best way into the city and its cost\". "
+            "Output ONLY the list."
+        )
+    if defect.rule == "missing_days":
+        days = ", ".join(f"Day {number}" for number in defect.days)
+        return (
+            f"The itinerary is missing {days}. Write ONLY those day(s), each starting with a \"### Day N\" heading "
+            "and Morning/Afternoon/Evening blocks, in the same format as the existing days. "
+            "Don't repeat activities already scheduled on other days."
+        )
+    raise ValueError(f"No correction request for rule: {defect.rule}")
+
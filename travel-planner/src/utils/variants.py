@@ -0,0 +1,45 @@
+"""Plan variants: the same trip at several budget tiers or paces
+
+Comparing a budget, mid-range and luxury version of a trip used to mean
+generating three complete plans. Research and recommendation prompts carry
+neither budget nor pace, so the variants pipeline
+(planner.create_plan_variants) runs them once, then costs each variant with
+the budget agent and writes it with a single synthesis call. This module
+defines what the variants of a request are.
+"""
+
+from typing import Dict
+
+from src.models import UserInput
+
+
+# Variant label to budget range multiplier (the request's own range is "Mid-range")
+BUDGET_TIERS = {"Budget": 0.5, "Mid-range": 1.0, "Luxury": 2.0}
+
+PACES = {"Relaxed": "relaxed", "Moderate": "moderate", "Packed": "packed"}
+
+DIMENSIONS = ("budget", "pace")
+
+
+def variant_inputs(user_input: UserInput, dimension: str) -> Dict[str, UserInput]:
+    """
+    The request's variants along one dimension
+
+    Args:
+        user_input: The request as entered
+        dimension: "budget" (budget range scaled per tier) or "pace"
+
+    Returns:
+        Variant label to request, in display order
+    """
+    if user_input.is_multi_city:
+        raise ValueError("Variants are planned for single-destination trips")
+    if dimension == "budget":
+        low, high = user_input.budget_range
+        return {
+            label: user_input.model_copy(update={"budget_range": (float(round(low * scale)), float(round(high * scale)))})
+            for label, scale in BUDGET_TIERS.items()
+        }
+    if dimension == "pace":
+        return {label: user_input.model_copy(update={"pace": pace}) for label, pace in PACES.items()}
+    raise ValueError(f"Unknown variant dimension: {dimension}")
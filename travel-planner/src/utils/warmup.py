@@ -0,0 +1,283 @@
+"""Cache warm-up for top destinations
+
+Pre-computes research, recommendation and full plan cache entries for the
+most requested destinations, across common parameter combinations (pace x
+content filter x typical trip length), by running the normal planner. Stage
+outputs and plans land in the plan store, so the app and job workers pick
+them up even though the warm-up runs as a separate process:
+
+    python -m src.utils.warmup data/top_destinations.txt --plans-per-minute 6 --max-calls 500
+"""
+
+import itertools
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from src.models import UserInput
+from src.utils.resilience import track_calls
+
+
+PACES = ("moderate", "relaxed", "packed")
+CONTENT_FILTERS = ("family_friendly", "adults_only")
+DURATIONS = (3, 5, 7)
+DEFAULT_BUDGET = (1000.0, 3000.0)
+CACHE_KINDS = ("research", "recommendation", "plan")
+
+
+def read_destinations(path: str) -> List[str]:
+    """
+    Read a ranked destination list (one per line, most popular first)
+
+    Blank lines and lines starting with # are ignored.
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+def build_requests(destinations: Sequence[str], start_date: date,
+                   paces: Sequence[str] = PACES,
+                   content_filters: Sequence[str] = CONTENT_FILTERS,
+                   durations: Sequence[int] = DURATIONS,
+                   budget_range=DEFAULT_BUDGET) -> List[UserInput]:
+    """
+    Requests to warm, most valuable first
+
+    Destinations are taken in rank order; within a destination the first
+    pace/filter/duration values (the most common ones) come first.
+
+    Args:
+        destinations: Ranked destination names
+        start_date: Trip start date to plan for
+        paces: Paces to cover
+        content_filters: Content filter modes to cover
+        durations: Trip lengths in days
+
+    Returns:
+        UserInput per combination
+    """
+    return [
+        UserInput(
+            destination=destination,
+            start_date=start_date,
+            end_date=start_date + timedelta(days=days - 1),
+            budget_range=budget_range,
+            pace=pace,
+            content_filter=content_filter,
+        )
+        for destination in destinations
+        for pace, content_filter, days in itertools.product(paces, content_filters, durations)
+    ]
+
+
+class RateBudget:
+    """
+    Spaces out plan generations and caps total LLM calls
+
+    The call cap is checked before each plan, so a run can overshoot it by
+    the calls of one plan.
+    """
+
+    def __init__(self, plans_per_minute: float, max_calls: Optional[int] = None):
+        """
+        Args:
+            plans_per_minute: Maximum plan generations started per minute
+            max_calls: Stop once this many LLM calls have been made (None = no cap)
+        """
+        self.interval = 60.0 / plans_per_minute if plans_per_minute > 0 else 0.0
+        self.max_calls = max_calls
+        self.calls = 0
+        self._next = 0.0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.max_calls is not None and self.calls >= self.max_calls
+
+    def wait(self):
+        """Block until the next plan may start"""
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+        self._next = max(now, self._next) + self.interval
+
+
+@dataclass
+class WarmupReport:
+    """Outcome of a warm-up run"""
+
+    requests: int = 0
+    generated: int = 0
+    already_cached: int = 0
+    failed: int = 0
+    llm_calls: int = 0
+    seconds: float = 0.0
+    stopped_early: bool = False
+    hit_rate_before: Dict[str, float] = field(default_factory=dict)
+    hit_rate_after: Dict[str, float] = field(default_factory=dict)
+    traffic_requests: int = 0
+    traffic_coverage: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def coverage(self) -> float:
+        """Fraction of warm-up combinations that now have a cached plan"""
+        return (self.generated + self.already_cached) / self.requests if self.requests else 0.0
+
+    def summary(self) -> str:
+        lines = [
+            f"Coverage: {self.coverage:.0%} of {self.requests} combinations "
+            f"({self.generated} generated, {self.already_cached} already cached, {self.failed} failed)",
+            f"LLM calls: {self.llm_calls} in {self.seconds:.0f}s" + (" (stopped at rate budget)" if self.stopped_early else ""),
+            "Hit rate on warm-up combinations:",
+        ]
+        for kind in CACHE_KINDS:
+            before = self.hit_rate_before.get(kind, 0.0)
+            after = self.hit_rate_after.get(kind, 0.0)
+            lines.append(f"  {kind:<15} {before:6.1%} -> {after:6.1%}  ({after - before:+.1%})")
+        if self.traffic_requests:
+            lines.append(f"Share of the last {self.traffic_requests} user requests a warm entry would serve:")
+            for kind in CACHE_KINDS:
+                lines.append(f"  {kind:<15} {self.traffic_coverage.get(kind, 0.0):6.1%}")
+        return "\n".join(lines)
+
+
+def hit_rates(requests: Iterable[UserInput]) -> Dict[str, float]:
+    """Fraction of requests that would hit each cache right now"""
+    from src.planner import cache_status
+
+    statuses = [cache_status(user_input) for user_input in requests]
+    if not statuses:
+        return {kind: 0.0 for kind in CACHE_KINDS}
+    return {kind: sum(status[kind] for status in statuses) / len(statuses) for kind in CACHE_KINDS}
+
+
+def recent_traffic(limit: int = 500) -> List[UserInput]:
+    """Recent user requests from plan history (warm-up plans excluded)"""
+    from src.utils.plan_store import get_plan_store
+
+    store = get_plan_store()
+    return [stored.user_input for stored in store.recent(limit, source="user")] if store else []
+
+
+def _traffic_keys(user_input: UserInput) -> Dict[str, tuple]:
+    """
+    What a request must share with a warmed one to reuse each cache entry
+
+    Mirrors planner.stage_cache_key and plan_cache_key: research is keyed on
+    destination and month, recommendations also on the traveller's tastes
+    (the research text is the same when the research key is), and plans on
+    the whole request.
+    """
+    destination = user_input.destination.strip().lower()
+    month = user_input.start_date.strftime("%Y-%m")
+    tastes = (user_input.content_filter, tuple(sorted(user_input.food_preferences)), tuple(sorted(user_input.activities)))
+    return {
+        "research": (destination, month),
+        "recommendation": (destination, month, *tastes),
+        "plan": (user_input.cache_key,),
+    }
+
+
+def traffic_coverage(traffic: Sequence[UserInput], warmed: Sequence[UserInput]) -> Dict[str, float]:
+    """
+    Share of past requests that warmed entries would have served
+
+    Uses the keys the caches really look up, so a past request only counts
+    as a plan hit if a warmed plan has its exact dates, budget and options.
+    """
+    if not traffic:
+        return {}
+    warm_keys = {kind: set() for kind in CACHE_KINDS}
+    for user_input in warmed:
+        for kind, key in _traffic_keys(user_input).items():
+            warm_keys[kind].add(key)
+    hits = {kind: 0 for kind in CACHE_KINDS}
+    for user_input in traffic:
+        for kind, key in _traffic_keys(user_input).items():
+            hits[kind] += key in warm_keys[kind]
+    return {kind: hits[kind] / len(traffic) for kind in CACHE_KINDS}
+
+
+def run_warmup(requests: Sequence[UserInput], budget: RateBudget,
+               traffic: Optional[Sequence[UserInput]] = None,
+               progress: Optional[Callable[[float, str], None]] = None) -> WarmupReport:
+    """
+    Generate plans for uncached requests through the normal planner
+
+    Args:
+        requests: Requests to warm, most valuable first
+        budget: Rate budget
+        traffic: Recent user requests, to estimate the hit-rate gain on real traffic
+        progress: Optional callback receiving (fraction, message) updates
+
+    Returns:
+        WarmupReport
+    """
+    from src.planner import cached_plan, create_travel_plan
+
+    report = WarmupReport(requests=len(requests))
+    report.hit_rate_before = hit_rates(requests)
+
+    warmed = []
+    started = time.perf_counter()
+    with track_calls() as stats:
+        for index, user_input in enumerate(requests):
+            if progress:
+                progress(index / max(len(requests), 1), f"Warming {user_input.destination} ({index + 1}/{len(requests)})")
+            if cached_plan(user_input) is not None:
+                report.already_cached += 1
+                warmed.append(user_input)
+                continue
+            budget.calls = stats.calls
+            if budget.exhausted:
+                report.stopped_early = True
+                break
+            budget.wait()
+            try:
+                create_travel_plan(user_input, source="warmup")
+            except Exception:
+                report.failed += 1
+                continue
+            report.generated += 1
+            warmed.append(user_input)
+        report.llm_calls = stats.calls
+
+    report.seconds = time.perf_counter() - started
+    report.hit_rate_after = hit_rates(requests)
+    if traffic:
+        report.traffic_requests = len(traffic)
+        report.traffic_coverage = traffic_coverage(traffic, warmed)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-compute plan caches for top destinations")
+    parser.add_argument("destinations", help="Ranked destination list, one per line")
+    parser.add_argument("--top", type=int, default=10, help="Number of destinations to warm")
+    parser.add_argument("--start-date", type=date.fromisoformat,
+                        default=date.today() + timedelta(days=30), help="Trip start date (default: in 30 days)")
+    parser.add_argument("--paces", nargs="+", default=list(PACES[:1]), choices=PACES)
+    parser.add_argument("--filters", nargs="+", default=list(CONTENT_FILTERS), choices=CONTENT_FILTERS)
+    parser.add_argument("--durations", nargs="+", type=int, default=list(DURATIONS))
+    parser.add_argument("--plans-per-minute", type=float, default=6)
+    parser.add_argument("--max-calls", type=int, default=None, help="Stop after this many LLM calls")
+    args = parser.parse_args()
+
+    warm = build_requests(
+        read_destinations(args.destinations)[:args.top],
+        args.start_date,
+        paces=args.paces,
+        content_filters=args.filters,
+        durations=args.durations,
+    )
+    print(f"Warming {len(warm)} combinations at <= {args.plans_per_minute:g} plans/min")
+    result = run_warmup(
+        warm,
+        RateBudget(args.plans_per_minute, args.max_calls),
+        recent_traffic(),
+        progress=lambda fraction, message: print(f"[{fraction:4.0%}] {message}"),
+    )
+    print(result.summary())
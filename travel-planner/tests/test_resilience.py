@@ -0,0 +1,116 @@
+"""Call policy against the fault-injecting stub server: timeouts, retries and hedging
+
+Run from travel-planner/:
+    python -m pytest tests
+"""
+
+import time
+
+import pytest
+from openai import OpenAI
+
+from benchmarks.stub_openai import StubOpenAIServer
+from src.utils.call_scheduler import CallScheduler
+from src.utils.resilience import CallPolicy, LatencyTracker, ResilientClient, call_label, track_calls
+
+MESSAGES = [
+    {"role": "system", "content": "You are a travel research specialist."},
+    {"role": "user", "content": "Destination: Paris\nTravel Dates: 2025-06-01 to 2025-06-05 (5 days)"},
+]
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**options) -> StubOpenAIServer:
+        server = StubOpenAIServer(**{"latency_ms": 20, "jitter": 0, **options}).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def make_client(server: StubOpenAIServer, scheduler=None, tracker=None, **policy) -> ResilientClient:
+    options = {"timeout": 5.0, "max_retries": 0, "backoff_base": 0.01, "backoff_max": 0.05, "hedge": False, **policy}
+    return ResilientClient(
+        OpenAI(base_url=server.url, api_key="test", max_retries=0),
+        policy=CallPolicy(**options),
+        tracker=tracker or LatencyTracker(),
+        scheduler=scheduler,
+    )
+
+
+def fast_tracker(label: str, seconds: float = 0.02, samples: int = 20) -> LatencyTracker:
+    """Tracker with enough fast samples for hedging to kick in"""
+    tracker = LatencyTracker()
+    for _ in range(samples):
+        tracker.record(label, seconds)
+    return tracker
+
+
+def test_retries_server_errors_and_rate_limits(stub):
+    server = stub(error_rate=0.2, rate_limit_rate=0.1, seed=1)
+    client = make_client(server, max_retries=10)
+    with track_calls() as stats, call_label("retry"):
+        for _ in range(20):
+            response = client.chat.completions.create(model="stub", messages=MESSAGES)
+            assert response.choices[0].message.content
+    assert stats.failures == 0
+    assert stats.retries == server.counts["errors"] + server.counts["rate_limited"] > 0
+
+
+def test_gives_up_after_max_retries(stub):
+    server = stub(error_rate=1.0)
+    client = make_client(server, max_retries=2)
+    with track_calls() as stats, pytest.raises(Exception):
+        client.chat.completions.create(model="stub", messages=MESSAGES)
+    assert stats.retries == 2
+    assert stats.failures == 1
+    assert server.counts["requests"] == 3
+
+
+def test_times_out_slow_calls(stub):
+    server = stub(latency_ms=1500)
+    client = make_client(server, timeout=0.3)
+    started = time.perf_counter()
+    with pytest.raises(Exception):
+        client.chat.completions.create(model="stub", messages=MESSAGES)
+    assert time.perf_counter() - started < 1.2
+
+
+def test_timed_out_call_keeps_its_scheduler_slot(stub):
+    server = stub(latency_ms=1000)
+    scheduler = CallScheduler(max_concurrency=1)
+    client = make_client(server, scheduler=scheduler, timeout=0.2)
+    with pytest.raises(TimeoutError):
+        client.chat.completions.create(model="stub", messages=MESSAGES)
+    # The caller gave up, but the request is still running against the server
+    assert scheduler.as_dict()["in_flight"] == 1
+    deadline = time.monotonic() + 5
+    while scheduler.as_dict()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert scheduler.as_dict()["in_flight"] == 0
+
+
+def test_hedges_slow_calls(stub):
+    server = stub(slow_rate=0.5, slow_factor=50, seed=3)
+    client = make_client(server, tracker=fast_tracker("hedge"), hedge=True, hedge_min_delay=0.1)
+    with track_calls() as stats, call_label("hedge"):
+        for _ in range(10):
+            client.chat.completions.create(model="stub", messages=MESSAGES)
+    assert stats.hedges > 0
+    assert stats.hedge_wins > 0
+    assert stats.failures == 0
+
+
+def test_hedge_needs_a_free_scheduler_slot(stub):
+    server = stub(slow_rate=1.0, slow_factor=15)
+    scheduler = CallScheduler(max_concurrency=1)
+    client = make_client(server, scheduler=scheduler, tracker=fast_tracker("full"), hedge=True, hedge_min_delay=0.05)
+    with track_calls() as stats, call_label("full"):
+        client.chat.completions.create(model="stub", messages=MESSAGES)
+    assert stats.hedges == 0
+    assert server.counts["max_in_flight"] == 1